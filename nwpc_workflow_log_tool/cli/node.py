@@ -1,11 +1,21 @@
 import datetime
+import typing
 
 import click
 
 from nwpc_workflow_log_tool.situation.analytics import (
     analytics_time_point_with_status,
     analytics_time_period,
+    analytics_nodes_time_point_with_status,
+    analytics_nodes_time_period,
+    analytics_subtree,
+    analytics_rolling_baseline,
+    watch_situations,
 )
+from nwpc_workflow_log_tool.situation import CycleWindow
+from nwpc_workflow_log_tool.situation.situation_store import DEFAULT_HORIZON_DAYS
+from nwpc_workflow_log_tool.log_file import build_index
+from nwpc_workflow_log_tool.exporter import OUTPUT_FORMATS
 from nwpc_workflow_model.node_status import NodeStatus
 
 
@@ -15,8 +25,17 @@ def node_cli():
 
 
 @node_cli.command("time-point")
-@click.option("-l", "--log-file", help="log file path")
-@click.option("-n", "--node-path", required=True, help="node path")
+@click.option(
+    "-l", "--log-file",
+    multiple=True,
+    help="log file path or glob pattern, can be used multiple times. .gz/.xz/.zst files are decompressed while reading",
+)
+@click.option("-n", "--node-path", multiple=True, help="node path, can be used multiple times")
+@click.option(
+    "--node-list",
+    default=None,
+    help="file of nodes, one node per line: node_path [node_type]. Node type defaults to --node-type",
+)
 @click.option(
     "-s", "--node-status",
     default=NodeStatus.submitted.value,
@@ -32,58 +51,514 @@ def node_cli():
 @click.option("--node-type", default="task", type=click.Choice(["task", "family"]), help="node type")
 @click.option("--start-date", default=None, help="start date, date range: [start_date, stop_date), YYYY-MM-dd")
 @click.option("--stop-date", default=None, help="stop date, date range: [start_date, stop_date), YYYY-MM-dd")
+@click.option("--record-cache", is_flag=True, default=False, help="use cache of parsed status records")
+@click.option("-j", "--jobs", default=1, type=int, help="number of processes to parse log file")
+@click.option(
+    "--executor",
+    default="serial",
+    type=click.Choice(["serial", "thread", "process"]),
+    help="how to evaluate DFA of each day, pool size is --jobs",
+)
+@click.option("--streaming", is_flag=True, default=False, help="process records day by day to reduce memory usage, only for a single node")
+@click.option("--situation-cache", is_flag=True, default=False, help="store situations of old days and only compute new days")
+@click.option(
+    "--cache-horizon",
+    default=DEFAULT_HORIZON_DAYS,
+    type=int,
+    help="days before the last record of log which are always recomputed when using --situation-cache",
+)
+@click.option(
+    "--cycle-start",
+    default=None,
+    help="start time of the records window of each day, HH:MM[:SS], for nodes which run over midnight",
+)
+@click.option(
+    "--cycle-duration",
+    default=None,
+    type=float,
+    help="hours of the records window of each day, "
+         "default is 48 minus hours of --cycle-start (0 if not set), i.e. until the end of the next day",
+)
+@click.option(
+    "--output",
+    default=None,
+    type=click.Choice(list(OUTPUT_FORMATS)),
+    help="export tables partitioned by node and month, parquet and arrow require pyarrow",
+)
+@click.option("--output-dir", default=".", help="directory of exported tables")
+@click.option(
+    "--sketch",
+    is_flag=True,
+    default=False,
+    help="calculate statistics with mergeable histograms (1 second bins) instead of all values",
+)
 @click.option("-v", "--verbose", count=True, help="verbose level")
 def analytics_time_point(
-        log_file: str,
-        node_path: str,
+        log_file: typing.Tuple[str],
+        node_path: typing.Tuple[str],
+        node_list: str,
         node_type: str,
         node_status: str,
         start_date: str,
         stop_date: str,
+        record_cache: bool,
+        jobs: int,
+        executor: str,
+        streaming: bool,
+        situation_cache: bool,
+        cache_horizon: int,
+        cycle_start: str,
+        cycle_duration: float,
+        output: str,
+        output_dir: str,
+        sketch: bool,
         verbose: int
 ):
     start_date = datetime.datetime.strptime(start_date, "%Y-%m-%d")
     stop_date = datetime.datetime.strptime(stop_date, "%Y-%m-%d")
     node_status = NodeStatus[node_status]
+    nodes = get_nodes(node_path, node_list, node_type)
+    cycle_window = get_cycle_window(cycle_start, cycle_duration)
+    check_streaming(streaming, nodes)
+
+    if len(nodes) > 1:
+        analytics_nodes_time_point_with_status(
+            nodes,
+            list(log_file),
+            node_status,
+            start_date,
+            stop_date,
+            verbose,
+            use_cache=record_cache,
+            jobs=jobs,
+            executor=executor,
+            situation_cache=situation_cache,
+            cache_horizon=cache_horizon,
+            cycle_window=cycle_window,
+            output=output,
+            output_dir=output_dir,
+            use_sketch=sketch,
+        )
+        return
 
+    node_path, node_type = nodes[0]
     analytics_time_point_with_status(
         node_type,
-        log_file,
+        list(log_file),
         node_path,
         node_status,
         start_date,
         stop_date,
         verbose,
+        use_cache=record_cache,
+        jobs=jobs,
+        streaming=streaming,
+        executor=executor,
+        situation_cache=situation_cache,
+        cache_horizon=cache_horizon,
+        cycle_window=cycle_window,
+        output=output,
+        output_dir=output_dir,
+        use_sketch=sketch,
     )
 
 
 @node_cli.command("time-period")
-@click.option("-l", "--log-file", help="log file path")
-@click.option("-n", "--node-path", required=True, help="node path")
+@click.option(
+    "-l", "--log-file",
+    multiple=True,
+    help="log file path or glob pattern, can be used multiple times. .gz/.xz/.zst files are decompressed while reading",
+)
+@click.option("-n", "--node-path", multiple=True, help="node path, can be used multiple times")
+@click.option(
+    "--node-list",
+    default=None,
+    help="file of nodes, one node per line: node_path [node_type]. Node type defaults to --node-type",
+)
 @click.option("--node-type", default="task", type=click.Choice(["task", "family"]), help="node type")
 @click.option("--start-date", default=None, help="start date, date range: [start_date, stop_date), YYYY-MM-dd")
 @click.option("--stop-date", default=None, help="stop date, date range: [start_date, stop_date), YYYY-MM-dd")
+@click.option("--record-cache", is_flag=True, default=False, help="use cache of parsed status records")
+@click.option("-j", "--jobs", default=1, type=int, help="number of processes to parse log file")
+@click.option(
+    "--executor",
+    default="serial",
+    type=click.Choice(["serial", "thread", "process"]),
+    help="how to evaluate DFA of each day, pool size is --jobs",
+)
+@click.option("--streaming", is_flag=True, default=False, help="process records day by day to reduce memory usage, only for a single node")
+@click.option("--situation-cache", is_flag=True, default=False, help="store situations of old days and only compute new days")
+@click.option(
+    "--cache-horizon",
+    default=DEFAULT_HORIZON_DAYS,
+    type=int,
+    help="days before the last record of log which are always recomputed when using --situation-cache",
+)
+@click.option(
+    "--cycle-start",
+    default=None,
+    help="start time of the records window of each day, HH:MM[:SS], for nodes which run over midnight",
+)
+@click.option(
+    "--cycle-duration",
+    default=None,
+    type=float,
+    help="hours of the records window of each day, "
+         "default is 48 minus hours of --cycle-start (0 if not set), i.e. until the end of the next day",
+)
+@click.option(
+    "--output",
+    default=None,
+    type=click.Choice(list(OUTPUT_FORMATS)),
+    help="export tables partitioned by node and month, parquet and arrow require pyarrow",
+)
+@click.option("--output-dir", default=".", help="directory of exported tables")
+@click.option(
+    "--sketch",
+    is_flag=True,
+    default=False,
+    help="calculate statistics with mergeable histograms (1 second bins) instead of all values",
+)
 @click.option("-v", "--verbose", count=True, help="verbose level")
 def analytics_time_point(
-        log_file: str,
-        node_path: str,
+        log_file: typing.Tuple[str],
+        node_path: typing.Tuple[str],
+        node_list: str,
         node_type: str,
         start_date: str,
         stop_date: str,
+        record_cache: bool,
+        jobs: int,
+        executor: str,
+        streaming: bool,
+        situation_cache: bool,
+        cache_horizon: int,
+        cycle_start: str,
+        cycle_duration: float,
+        output: str,
+        output_dir: str,
+        sketch: bool,
         verbose: int
 ):
     start_date = datetime.datetime.strptime(start_date, "%Y-%m-%d")
     stop_date = datetime.datetime.strptime(stop_date, "%Y-%m-%d")
+    nodes = get_nodes(node_path, node_list, node_type)
+    cycle_window = get_cycle_window(cycle_start, cycle_duration)
+    check_streaming(streaming, nodes)
+
+    if len(nodes) > 1:
+        analytics_nodes_time_period(
+            nodes,
+            list(log_file),
+            start_date,
+            stop_date,
+            verbose,
+            use_cache=record_cache,
+            jobs=jobs,
+            executor=executor,
+            situation_cache=situation_cache,
+            cache_horizon=cache_horizon,
+            cycle_window=cycle_window,
+            output=output,
+            output_dir=output_dir,
+            use_sketch=sketch,
+        )
+        return
 
+    node_path, node_type = nodes[0]
     analytics_time_period(
         node_type,
-        log_file,
+        list(log_file),
         node_path,
         start_date,
         stop_date,
         verbose,
+        use_cache=record_cache,
+        jobs=jobs,
+        streaming=streaming,
+        executor=executor,
+        situation_cache=situation_cache,
+        cache_horizon=cache_horizon,
+        cycle_window=cycle_window,
+        output=output,
+        output_dir=output_dir,
+        use_sketch=sketch,
+    )
+
+
+@node_cli.command("subtree")
+@click.option(
+    "-l", "--log-file",
+    multiple=True,
+    help="log file path or glob pattern, can be used multiple times. .gz/.xz/.zst files are decompressed while reading",
+)
+@click.option("-n", "--node-path", required=True, multiple=True, help="suite or family node path, can be used multiple times")
+@click.option("--start-date", default=None, help="start date, date range: [start_date, stop_date), YYYY-MM-dd")
+@click.option("--stop-date", default=None, help="stop date, date range: [start_date, stop_date), YYYY-MM-dd")
+@click.option("--record-cache", is_flag=True, default=False, help="use cache of parsed status records")
+@click.option("-j", "--jobs", default=1, type=int, help="number of processes to parse log file")
+@click.option(
+    "--executor",
+    default="serial",
+    type=click.Choice(["serial", "thread", "process"]),
+    help="how to evaluate DFA of each day, pool size is --jobs",
+)
+@click.option(
+    "--output",
+    default=None,
+    type=click.Choice(list(OUTPUT_FORMATS)),
+    help="export tables partitioned by node and month, parquet and arrow require pyarrow",
+)
+@click.option("--output-dir", default=".", help="directory of exported tables")
+@click.option(
+    "--sketch",
+    is_flag=True,
+    default=False,
+    help="calculate statistics with mergeable histograms (1 second bins) instead of all values",
+)
+@click.option("-v", "--verbose", count=True, help="verbose level")
+def analytics_subtree_command(
+        log_file: typing.Tuple[str],
+        node_path: typing.Tuple[str],
+        start_date: str,
+        stop_date: str,
+        record_cache: bool,
+        jobs: int,
+        executor: str,
+        output: str,
+        output_dir: str,
+        sketch: bool,
+        verbose: int
+):
+    start_date = datetime.datetime.strptime(start_date, "%Y-%m-%d")
+    stop_date = datetime.datetime.strptime(stop_date, "%Y-%m-%d")
+
+    analytics_subtree(
+        list(log_file),
+        list(node_path),
+        start_date,
+        stop_date,
+        verbose,
+        use_cache=record_cache,
+        jobs=jobs,
+        executor=executor,
+        output=output,
+        output_dir=output_dir,
+        use_sketch=sketch,
     )
 
 
+@node_cli.command("baseline")
+@click.option(
+    "-l", "--log-file",
+    multiple=True,
+    help="log file path or glob pattern, can be used multiple times. .gz/.xz/.zst files are decompressed while reading",
+)
+@click.option("-n", "--node-path", multiple=True, help="node path, can be used multiple times")
+@click.option(
+    "--node-list",
+    default=None,
+    help="file of nodes, one node per line: node_path [node_type]. Node type defaults to --node-type",
+)
+@click.option("--node-type", default="task", type=click.Choice(["task", "family"]), help="node type")
+@click.option("--start-date", default=None, help="start date, date range: [start_date, stop_date), YYYY-MM-dd")
+@click.option("--stop-date", default=None, help="stop date, date range: [start_date, stop_date), YYYY-MM-dd")
+@click.option(
+    "--metric",
+    default="end_clock",
+    type=click.Choice(["start_clock", "end_clock", "duration"]),
+    help="metric to compare with baseline",
+)
+@click.option("--window", default=30, type=int, help="days of baseline window before each day")
+@click.option("--min-periods", default=7, type=int, help="minimum complete days in window to calculate baseline")
+@click.option("--threshold", default=30.0, type=float, help="minutes later than baseline to mark a day as anomaly")
+@click.option("--show-all", is_flag=True, default=False, help="show all days instead of anomalies only")
+@click.option("--record-cache", is_flag=True, default=False, help="use cache of parsed status records")
+@click.option("-j", "--jobs", default=1, type=int, help="number of processes to parse log file")
+@click.option(
+    "--executor",
+    default="serial",
+    type=click.Choice(["serial", "thread", "process"]),
+    help="how to evaluate DFA of each day, pool size is --jobs",
+)
+@click.option("--situation-cache", is_flag=True, default=False, help="store situations of old days and only compute new days")
+@click.option(
+    "--cache-horizon",
+    default=DEFAULT_HORIZON_DAYS,
+    type=int,
+    help="days before the last record of log which are always recomputed when using --situation-cache",
+)
+@click.option(
+    "--cycle-start",
+    default=None,
+    help="start time of the records window of each day, HH:MM[:SS], for nodes which run over midnight",
+)
+@click.option(
+    "--cycle-duration",
+    default=None,
+    type=float,
+    help="hours of the records window of each day, "
+         "default is 48 minus hours of --cycle-start (0 if not set), i.e. until the end of the next day",
+)
+@click.option("-v", "--verbose", count=True, help="verbose level")
+def analytics_baseline(
+        log_file: typing.Tuple[str],
+        node_path: typing.Tuple[str],
+        node_list: str,
+        node_type: str,
+        start_date: str,
+        stop_date: str,
+        metric: str,
+        window: int,
+        min_periods: int,
+        threshold: float,
+        show_all: bool,
+        record_cache: bool,
+        jobs: int,
+        executor: str,
+        situation_cache: bool,
+        cache_horizon: int,
+        cycle_start: str,
+        cycle_duration: float,
+        verbose: int
+):
+    start_date = datetime.datetime.strptime(start_date, "%Y-%m-%d")
+    stop_date = datetime.datetime.strptime(stop_date, "%Y-%m-%d")
+    nodes = get_nodes(node_path, node_list, node_type)
+    cycle_window = get_cycle_window(cycle_start, cycle_duration)
+    if window < 1:
+        raise click.BadParameter(f"window should be positive: {window}", param_hint="--window")
+
+    analytics_rolling_baseline(
+        nodes,
+        list(log_file),
+        start_date,
+        stop_date,
+        verbose,
+        use_cache=record_cache,
+        jobs=jobs,
+        executor=executor,
+        situation_cache=situation_cache,
+        cache_horizon=cache_horizon,
+        cycle_window=cycle_window,
+        metric=metric,
+        window=window,
+        min_periods=min_periods,
+        threshold=datetime.timedelta(minutes=threshold),
+        show_all=show_all,
+    )
+
+
+@node_cli.command("watch")
+@click.option("-l", "--log-file", required=True, help="log file path, file is followed like tail -F")
+@click.option("-n", "--node-path", required=True, multiple=True, help="node path, can be used multiple times")
+@click.option("--node-type", default="task", type=click.Choice(["task", "family"]), help="node type")
+@click.option("--start-date", default=None, help="start date of records to be processed, default is today, YYYY-MM-dd")
+@click.option("--interval", default=5.0, type=float, help="polling interval in seconds")
+def watch_node(
+        log_file: str,
+        node_path: typing.Tuple[str],
+        node_type: str,
+        start_date: str,
+        interval: float,
+):
+    if start_date is not None:
+        start_date = datetime.datetime.strptime(start_date, "%Y-%m-%d")
+
+    watch_situations(
+        node_type,
+        log_file,
+        list(node_path),
+        start_date=start_date,
+        poll_interval=interval,
+    )
+
+
+@node_cli.group("index")
+def index_cli():
+    pass
+
+
+@index_cli.command("build")
+@click.option("-l", "--log-file", required=True, help="log file path")
+@click.option("--index-file", default=None, help="index file path, default is log file path with .index.json suffix")
+@click.option("--rebuild", is_flag=True, default=False, help="rebuild index instead of updating it incrementally")
+def build_log_index(
+        log_file: str,
+        index_file: str,
+        rebuild: bool,
+):
+    build_index(
+        log_file,
+        index_path=index_file,
+        rebuild=rebuild,
+    )
+
+
+def get_nodes(
+        node_paths: typing.Tuple[str],
+        node_list: str or None,
+        node_type: str,
+) -> typing.List[typing.Tuple[str, str]]:
+    """
+    合并 ``--node-path`` 和 ``--node-list`` 中的节点，返回 (节点路径, 节点类型) 列表。
+    """
+    nodes = [(node_path, node_type) for node_path in node_paths]
+    if node_list is not None:
+        with open(node_list) as f:
+            for line in f:
+                tokens = line.split("#", 1)[0].split()
+                if len(tokens) == 0:
+                    continue
+                if len(tokens) > 1 and tokens[1] not in ("task", "family"):
+                    raise click.BadParameter(f"node type is not supported: {tokens[1]}", param_hint="--node-list")
+                nodes.append((tokens[0], tokens[1] if len(tokens) > 1 else node_type))
+    if len(nodes) == 0:
+        raise click.UsageError("node path is required: use --node-path or --node-list")
+    return nodes
+
+
+def check_streaming(streaming: bool, nodes: typing.List[typing.Tuple[str, str]]):
+    """
+    ``--streaming`` 只支持单个节点，多个节点时报错，而不是忽略该选项读取全部日志条目。
+    """
+    if streaming and len(nodes) > 1:
+        raise click.UsageError("--streaming only supports a single node, remove it or use one --node-path")
+
+
+def get_cycle_window(
+        cycle_start: str or None,
+        cycle_duration: float or None,
+) -> CycleWindow or None:
+    """
+    根据 ``--cycle-start`` 和 ``--cycle-duration`` 创建每天的日志时间窗口，都未设置时返回 None。
+    未设置 ``--cycle-duration`` 时，时长为 48 小时减去 ``--cycle-start``，即时间窗口到下一天结束为止，
+    例如 ``--cycle-start 15:00`` 的时长为 33 小时。
+    """
+    if cycle_start is None and cycle_duration is None:
+        return None
+
+    start = datetime.timedelta(0)
+    if cycle_start is not None:
+        start_time = None
+        for time_format in ("%H:%M:%S", "%H:%M"):
+            try:
+                start_time = datetime.datetime.strptime(cycle_start, time_format).time()
+                break
+            except ValueError:
+                continue
+        if start_time is None:
+            raise click.BadParameter(f"time should be HH:MM[:SS]: {cycle_start}", param_hint="--cycle-start")
+        start = datetime.timedelta(hours=start_time.hour, minutes=start_time.minute, seconds=start_time.second)
+
+    if cycle_duration is None:
+        duration = datetime.timedelta(days=2) - start
+    else:
+        duration = datetime.timedelta(hours=cycle_duration)
+    if duration <= datetime.timedelta(0):
+        raise click.BadParameter(f"duration should be positive: {cycle_duration}", param_hint="--cycle-duration")
+    return CycleWindow(start=start, duration=duration)
+
+
 if __name__ == "__main__":
     node_cli()
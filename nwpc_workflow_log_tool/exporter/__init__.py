@@ -0,0 +1 @@
+from .table_exporter import TableExporter, OUTPUT_FORMATS, to_long_table
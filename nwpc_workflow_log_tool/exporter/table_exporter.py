@@ -0,0 +1,138 @@
+import os
+import typing
+import urllib.parse
+
+import numpy as np
+import pandas as pd
+from loguru import logger
+
+
+OUTPUT_FORMATS = ("parquet", "arrow", "csv", "jsonl")
+
+OUTPUT_SUFFIXES = {
+    "parquet": ".parquet",
+    "arrow": ".arrow",
+    "csv": ".csv",
+    "jsonl": ".jsonl",
+}
+
+
+class TableExporter(object):
+    """
+    将节点运行状态表格按节点和月份分区写入文件，供其它程序读取。
+
+    目录结构与 Hive 分区相同，节点路径经过 URL 编码：
+
+        {output_dir}/node_path=%2Fgrapes_meso_3km_v4_4%2F00%2Fmodel%2Ffcst/month=2020-06/data.parquet
+
+    文件中的列为 ``date`` 和 ``NodeTableProcessor`` 生成的各列，不包括分区列 ``node_path`` 和 ``month``。
+
+    - ``parquet``：保留列的类型，使用 Parquet 列式存储
+    - ``arrow``：Arrow IPC 文件（Feather V2），不压缩，可以通过内存映射零拷贝读取
+    - ``csv`` 和 ``jsonl``：文本格式，时间为 ISO 8601 格式，时间段长度为秒数
+
+    ``parquet`` 和 ``arrow`` 需要安装 ``pyarrow``。重复导出时覆盖同一分区的文件。
+
+    Attributes
+    ----------
+    output_dir: str
+        输出目录
+    output_format: str
+        输出格式，见 ``OUTPUT_FORMATS``
+    """
+    def __init__(
+            self,
+            output_dir: str,
+            output_format: str = "parquet",
+    ):
+        if output_format not in OUTPUT_FORMATS:
+            raise ValueError(f"output format is not supported: {output_format}")
+        self.output_dir = output_dir
+        self.output_format = output_format
+
+    def export(self, table_data: pd.DataFrame) -> typing.List[str]:
+        """
+        导出 ``NodesTableProcessor`` 生成的长格式表格，行索引为 (``node_path``, ``date``)。
+
+        Returns
+        -------
+        typing.List[str]
+            写入的文件路径
+        """
+        if len(table_data) == 0:
+            return []
+        table_data = table_data.reset_index()
+        months = table_data["date"].dt.strftime("%Y-%m")
+        file_paths = []
+        for (node_path, month), partition in table_data.groupby(
+                [table_data["node_path"].astype(str), months], sort=False):
+            partition = partition.drop(columns=["node_path"]).reset_index(drop=True)
+            file_path = os.path.join(
+                self.output_dir,
+                f"node_path={urllib.parse.quote(node_path, safe='')}",
+                f"month={month}",
+                "data" + OUTPUT_SUFFIXES[self.output_format],
+            )
+            os.makedirs(os.path.dirname(file_path), exist_ok=True)
+            self._write(partition, file_path)
+            file_paths.append(file_path)
+        logger.info("exported {} files to {}", len(file_paths), self.output_dir)
+        return file_paths
+
+    def export_node_tables(self, node_tables: typing.Dict[str, pd.DataFrame]) -> typing.List[str]:
+        """
+        导出 ``NodeTableProcessor`` 生成的多个单节点表格，见 ``to_long_table``。
+        """
+        return self.export(to_long_table(node_tables))
+
+    def _write(self, table_data: pd.DataFrame, file_path: str):
+        if self.output_format == "csv":
+            _to_text_table(table_data).to_csv(file_path, index=False)
+        elif self.output_format == "jsonl":
+            _to_text_table(table_data).to_json(file_path, orient="records", lines=True, date_format="iso")
+        else:
+            pa, pq, feather = _import_pyarrow()
+            table = pa.Table.from_pandas(table_data, preserve_index=False)
+            if self.output_format == "parquet":
+                pq.write_table(table, file_path)
+            else:
+                feather.write_feather(table, file_path, compression="uncompressed")
+
+
+def to_long_table(node_tables: typing.Dict[str, pd.DataFrame]) -> pd.DataFrame:
+    """
+    将 ``NodeTableProcessor`` 生成的单节点表格合并为与 ``NodesTableProcessor`` 相同的长格式表格。
+    """
+    node_paths = list(node_tables)
+    tables = [node_tables[node_path].set_index("start_time") for node_path in node_paths]
+    sizes = [len(table) for table in tables]
+    table_data = pd.concat(tables) if len(tables) > 0 else pd.DataFrame()
+    table_data.index = pd.MultiIndex.from_arrays(
+        [
+            pd.Categorical.from_codes(np.repeat(np.arange(len(node_paths)), sizes), categories=node_paths),
+            table_data.index,
+        ],
+        names=["node_path", "date"],
+    )
+    return table_data
+
+
+def _to_text_table(table_data: pd.DataFrame) -> pd.DataFrame:
+    """
+    文本格式中时间段长度使用秒数，避免下游程序解析 ``0 days 01:02:18`` 这样的字符串。
+    """
+    table_data = table_data.copy()
+    for name, column in table_data.items():
+        if pd.api.types.is_timedelta64_dtype(column):
+            table_data[name] = column.dt.total_seconds()
+    return table_data
+
+
+def _import_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+        import pyarrow.feather
+    except ImportError:
+        raise ImportError("pyarrow is required to export parquet and arrow files: pip install pyarrow")
+    return pyarrow, pyarrow.parquet, pyarrow.feather
@@ -0,0 +1,10 @@
+from .prefilter import NodePathFilter, scan_node_lines, scan_node_ranges
+from .date_seek import find_date_range_offsets
+from .log_index import LogIndex, build_index, load_index
+from .record_reader import iter_records, get_record_list
+from .parallel_reader import get_record_list_parallel, iter_records_parallel
+from .record_cache import RecordCache
+from .compressed import open_log_file
+from .record_locations import RecordLocations
+from .log_set import LogSet, expand_log_files, select_log_files
+from .log_follower import LogFollower, DEFAULT_POLL_INTERVAL
@@ -0,0 +1,144 @@
+import gzip
+import lzma
+import queue
+import typing
+import datetime
+import threading
+
+from .prefilter import NodePathFilter, iter_chunks, DEFAULT_CHUNK_SIZE
+from .timestamp import parse_line_date, to_date
+
+
+COMPRESSED_SUFFIXES = (".gz", ".xz", ".zst")
+# 后台解压线程预先读取的块数
+DEFAULT_PREFETCH = 4
+
+
+def is_compressed(file_path: str) -> bool:
+    return file_path.endswith(COMPRESSED_SUFFIXES)
+
+
+def open_log_file(file_path: str) -> typing.BinaryIO:
+    """
+    以二进制方式打开日志文件，根据后缀自动解压 gzip (.gz)、xz (.xz) 和 zstd (.zst) 文件。
+
+    读取 zstd 文件需要安装 ``zstandard``。
+    """
+    if file_path.endswith(".gz"):
+        return gzip.open(file_path, "rb")
+    if file_path.endswith(".xz"):
+        return lzma.open(file_path, "rb")
+    if file_path.endswith(".zst"):
+        try:
+            import zstandard
+        except ImportError:
+            raise ImportError("zstandard is required to read .zst log files: pip install zstandard")
+        return zstandard.ZstdDecompressor().stream_reader(open(file_path, "rb"), closefd=True)
+    return open(file_path, "rb")
+
+
+def iter_file_chunks(
+        file_path: str,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        start_offset: int = 0,
+        prefetch: int = DEFAULT_PREFETCH,
+) -> typing.Iterator[typing.Tuple[int, bytes]]:
+    """
+    读取日志文件中以换行符对齐的块，见 ``iter_chunks``。
+
+    压缩文件在后台线程中解压，最多预先解压 ``prefetch`` 个块，解析日志行时解压可以同时进行。
+    压缩文件无法定位，偏移是解压后数据中的偏移，``start_offset`` 之前的内容会被解压后丢弃。
+    """
+    if not is_compressed(file_path):
+        with open(file_path, "rb") as f:
+            f.seek(start_offset)
+            yield from iter_chunks(f, chunk_size=chunk_size, start_offset=start_offset)
+        return
+
+    for base_offset, chunk in _iter_chunks_in_background(file_path, chunk_size, prefetch):
+        chunk_end = base_offset + len(chunk)
+        if chunk_end <= start_offset:
+            continue
+        if base_offset < start_offset:
+            chunk = chunk[start_offset - base_offset:]
+            base_offset = start_offset
+        yield base_offset, chunk
+
+
+def _iter_chunks_in_background(
+        file_path: str,
+        chunk_size: int,
+        prefetch: int,
+) -> typing.Iterator[typing.Tuple[int, bytes]]:
+    chunk_queue = queue.Queue(maxsize=prefetch)
+    stop_event = threading.Event()
+    end_of_stream = object()
+
+    def put(item) -> bool:
+        while not stop_event.is_set():
+            try:
+                chunk_queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def read_chunks():
+        try:
+            with open_log_file(file_path) as f:
+                for item in iter_chunks(f, chunk_size=chunk_size):
+                    if not put(item):
+                        return
+        except Exception as e:
+            put(e)
+            return
+        put(end_of_stream)
+
+    reader = threading.Thread(target=read_chunks, daemon=True)
+    reader.start()
+    try:
+        while True:
+            item = chunk_queue.get()
+            if item is end_of_stream:
+                break
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    finally:
+        stop_event.set()
+        reader.join()
+
+
+def scan_node_stream(
+        file_path: str,
+        node_path: str,
+        start_date: datetime.datetime = None,
+        stop_date: datetime.datetime = None,
+        include_children: bool = False,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> typing.Iterator[typing.Tuple[int, bytes]]:
+    """
+    从压缩日志文件中提取包含节点路径的日志行，与 ``scan_node_lines`` 相同。
+
+    压缩文件无法二分查找，所以根据每块首尾日志行的日期跳过早于 ``start_date`` 的块，
+    并在某块第一行的日期不早于 ``stop_date`` 时停止读取。
+
+    Returns
+    -------
+    typing.Iterator[typing.Tuple[int, bytes]]
+        (行在解压后数据中的偏移, 不含换行符的行内容)
+    """
+    start_day = to_date(start_date)
+    stop_day = to_date(stop_date)
+    node_filter = NodePathFilter(node_path, include_children=include_children)
+    for base_offset, chunk in iter_file_chunks(file_path, chunk_size=chunk_size):
+        if stop_day is not None:
+            first_date = parse_line_date(chunk[:64])
+            if first_date is not None and first_date >= stop_day:
+                break
+        if start_day is not None:
+            last_line_start = chunk.rfind(b"\n", 0, len(chunk) - 1) + 1
+            last_date = parse_line_date(chunk[last_line_start:last_line_start + 64])
+            if last_date is not None and last_date < start_day:
+                continue
+        yield from node_filter.scan_buffer(chunk, base_offset)
@@ -0,0 +1,118 @@
+import os
+import typing
+import datetime
+
+from .timestamp import parse_line_date, to_date
+
+
+# 二分查找停止的区间长度
+DEFAULT_BLOCK_SIZE = 64 * 1024
+# 查找结果两侧额外读取的字节数，用于容忍查找位置附近少量时间乱序的日志行
+DEFAULT_MARGIN = 1024 * 1024
+# 查找有效时间戳时最多检查的行数
+MAX_PROBE_LINES = 1000
+
+
+def read_date_at(
+        f: typing.BinaryIO,
+        offset: int,
+) -> typing.Tuple[int, datetime.date or None]:
+    """
+    从 ``offset`` 之后的第一个行首开始，查找第一个带有时间戳的日志行。
+
+    Returns
+    -------
+    typing.Tuple[int, datetime.date or None]
+        (日志行偏移, 日志行日期)，如果到文件结尾都没有找到时间戳，日期为 None
+    """
+    line_start = align_to_line_start(f, offset)
+    for _ in range(MAX_PROBE_LINES):
+        line = f.readline()
+        if not line:
+            break
+        line_date = parse_line_date(line)
+        if line_date is not None:
+            return line_start, line_date
+        line_start += len(line)
+    return line_start, None
+
+
+def align_to_line_start(f: typing.BinaryIO, offset: int) -> int:
+    """
+    将文件定位到 ``offset`` 处或之后的第一个行首，返回该行首的偏移。
+    """
+    if offset <= 0:
+        f.seek(0)
+        return 0
+    f.seek(offset - 1)
+    skipped = f.readline()
+    return offset - 1 + len(skipped)
+
+
+def seek_date(
+        f: typing.BinaryIO,
+        target_date: datetime.date,
+        file_size: int,
+        block_size: int = DEFAULT_BLOCK_SIZE,
+) -> int:
+    """
+    二分查找按时间排序的日志文件，返回日期不早于 ``target_date`` 的大致位置。
+
+    返回值是二分查找区间的下界，位于目标日期第一行之前不超过 ``block_size`` 字节的位置，不一定是行首。
+    """
+    low = 0
+    high = file_size
+    while high - low > block_size:
+        middle = (low + high) // 2
+        _, line_date = read_date_at(f, middle)
+        if line_date is not None and line_date < target_date:
+            low = middle
+        else:
+            high = middle
+    return low
+
+
+def find_date_range_offsets(
+        file_path: str,
+        start_date: datetime.datetime or datetime.date = None,
+        stop_date: datetime.datetime or datetime.date = None,
+        margin: int = DEFAULT_MARGIN,
+) -> typing.Tuple[int, int or None]:
+    """
+    计算日志文件中与日期范围 [`start_date`, `stop_date`) 对应的字节范围。
+
+    ecFlow 日志文件只追加写入，基本按时间排序，所以可以通过二分查找行首的时间戳定位日期。
+    查找结果向两侧各扩展 ``margin`` 字节，以容忍查找位置附近少量乱序的日志行，
+    范围内不属于日期范围的日志行需要调用方根据日期过滤。
+
+    Parameters
+    ----------
+    file_path: str
+        日志文件路径
+    start_date: datetime.datetime or datetime.date
+        起始日期，为 None 时从文件开头读取
+    stop_date: datetime.datetime or datetime.date
+        结束日期，不包括在内，为 None 时读取到文件结尾
+    margin: int
+        向两侧扩展的字节数
+
+    Returns
+    -------
+    typing.Tuple[int, int or None]
+        (起始偏移, 结束偏移)，起始偏移位于行首，结束偏移为 None 表示读取到文件结尾
+    """
+    file_size = os.path.getsize(file_path)
+    start_offset = 0
+    stop_offset = None
+    with open(file_path, "rb") as f:
+        if start_date is not None:
+            start_day = to_date(start_date)
+            offset = seek_date(f, start_day, file_size)
+            start_offset = align_to_line_start(f, max(0, offset - margin))
+        if stop_date is not None:
+            stop_day = to_date(stop_date)
+            offset = seek_date(f, stop_day, file_size)
+            offset = min(file_size, offset + DEFAULT_BLOCK_SIZE + margin)
+            if offset < file_size:
+                stop_offset = align_to_line_start(f, offset)
+    return start_offset, stop_offset
@@ -0,0 +1,82 @@
+import os
+import time
+import typing
+
+from loguru import logger
+
+
+DEFAULT_POLL_INTERVAL = 5.0
+MAX_READ_SIZE = 64 * 1024 * 1024
+
+
+class LogFollower(object):
+    """
+    以轮询方式跟踪不断增长的日志文件，每次只读取新增的完整日志行，类似 ``tail -F``。
+
+    日志文件被轮转（inode 变化）或截断（文件变小）时，从新文件的开头重新读取。
+
+    Attributes
+    ----------
+    file_path: str
+        日志文件路径
+    offset: int
+        下一次读取的起始偏移，总是位于行首
+    """
+    def __init__(self, file_path: str, start_offset: int = 0):
+        self.file_path = file_path
+        self.offset = start_offset
+        self._inode = None
+
+    def read_new_lines(self) -> typing.List[typing.Tuple[int, bytes]]:
+        """
+        读取上次读取之后新增的完整日志行，最后一行没有换行符时留到下次读取。
+
+        Returns
+        -------
+        typing.List[typing.Tuple[int, bytes]]
+            (行在文件中的偏移, 不含换行符的行内容)
+        """
+        try:
+            stat = os.stat(self.file_path)
+        except FileNotFoundError:
+            return []
+
+        if self._inode is not None and stat.st_ino != self._inode:
+            logger.info("log file is rotated, read from beginning: {}", self.file_path)
+            self.offset = 0
+        elif stat.st_size < self.offset:
+            logger.info("log file is truncated, read from beginning: {}", self.file_path)
+            self.offset = 0
+        self._inode = stat.st_ino
+
+        if stat.st_size == self.offset:
+            return []
+
+        with open(self.file_path, "rb") as f:
+            f.seek(self.offset)
+            data = f.read(min(stat.st_size - self.offset, MAX_READ_SIZE))
+        last_line_end = data.rfind(b"\n")
+        if last_line_end == -1:
+            return []
+
+        lines = []
+        line_offset = self.offset
+        for line in data[:last_line_end + 1].splitlines(keepends=True):
+            lines.append((line_offset, line.rstrip(b"\r\n")))
+            line_offset += len(line)
+        self.offset = line_offset
+        return lines
+
+    def follow(
+            self,
+            poll_interval: float = DEFAULT_POLL_INTERVAL,
+    ) -> typing.Iterator[typing.List[typing.Tuple[int, bytes]]]:
+        """
+        持续跟踪日志文件，每当有新增日志行时返回一批日志行。没有新增内容时等待 ``poll_interval`` 秒。
+        """
+        while True:
+            lines = self.read_new_lines()
+            if len(lines) > 0:
+                yield lines
+            else:
+                time.sleep(poll_interval)
@@ -0,0 +1,408 @@
+import os
+import re
+import json
+import bisect
+import hashlib
+import typing
+import datetime
+
+from loguru import logger
+
+from .prefilter import iter_chunks
+from .compressed import is_compressed
+from .timestamp import to_date
+
+
+INDEX_VERSION = 1
+INDEX_SUFFIX = ".index.json"
+DEFAULT_INDEX_BLOCK_SIZE = 4 * 1024 * 1024
+HEAD_FINGERPRINT_SIZE = 4096
+
+NODE_PATH_PATTERN = re.compile(rb" (/[^\s:]*)")
+
+
+class LogFileFingerprint(object):
+    """
+    日志文件指纹，用于判断索引是否与日志文件对应。
+
+    Attributes
+    ----------
+    size: int
+        文件大小
+    mtime: float
+        文件修改时间
+    head: str
+        文件开头 ``HEAD_FINGERPRINT_SIZE`` 字节中第一行的 SHA1 值
+    """
+    def __init__(self, size: int, mtime: float, head: str):
+        self.size = size
+        self.mtime = mtime
+        self.head = head
+
+    @classmethod
+    def from_file(cls, file_path: str) -> "LogFileFingerprint":
+        stat = os.stat(file_path)
+        with open(file_path, "rb") as f:
+            head_line = f.read(HEAD_FINGERPRINT_SIZE).split(b"\n", 1)[0]
+        return cls(
+            size=stat.st_size,
+            mtime=stat.st_mtime,
+            head=hashlib.sha1(head_line).hexdigest(),
+        )
+
+    def to_dict(self) -> dict:
+        return {
+            "size": self.size,
+            "mtime": self.mtime,
+            "head": self.head,
+        }
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "LogFileFingerprint":
+        return cls(size=d["size"], mtime=d["mtime"], head=d["head"])
+
+
+class LogIndex(object):
+    """
+    日志文件的附属索引，记录每天和每个节点对应的字节范围。
+
+    日志文件被分成以换行符对齐的块，索引记录：
+
+    - 每天第一行的起始偏移和最后一行的结束偏移
+    - 每个节点路径（包括其所有祖先节点）出现在哪些块中，以连续块区间 ``[first, last]`` 的形式保存
+
+    日期范围包括所有日志行，节点只索引 ``LOG:`` 类型的日志行，即节点状态变化等记录，
+    所以只能用于读取节点状态变化日志条目（见 ``get_read_ranges``）。
+
+    Attributes
+    ----------
+    fingerprint: LogFileFingerprint
+        建立索引时日志文件的指纹
+    block_size: int
+        块大小
+    blocks: typing.List[int]
+        每个块的起始偏移，最后一个块结束于 ``fingerprint.size``
+    days: typing.Dict[str, typing.List[int]]
+        日期（YYYY-MM-DD）到字节范围 ``[start, end)`` 的映射
+    nodes: typing.Dict[str, typing.List[typing.List[int]]]
+        节点路径到块区间列表的映射
+    day_keys: typing.List[str]
+        排序后的日期，用于二分查找日期范围，``days`` 变化后需要调用 ``sort_days`` 更新
+    """
+    def __init__(
+            self,
+            fingerprint: LogFileFingerprint = None,
+            block_size: int = DEFAULT_INDEX_BLOCK_SIZE,
+            blocks: typing.List[int] = None,
+            days: typing.Dict[str, typing.List[int]] = None,
+            nodes: typing.Dict[str, typing.List[typing.List[int]]] = None,
+    ):
+        self.fingerprint = fingerprint
+        self.block_size = block_size
+        self.blocks = blocks if blocks is not None else []
+        self.days = days if days is not None else dict()
+        self.nodes = nodes if nodes is not None else dict()
+        self.day_keys = []
+        self.sort_days()
+
+    @property
+    def indexed_size(self) -> int:
+        if self.fingerprint is None:
+            return 0
+        return self.fingerprint.size
+
+    @property
+    def tail_offset(self) -> int:
+        """
+        最后一个块的起始偏移。最后一个块可能以不完整的行结尾，其后的内容需要直接扫描。
+        """
+        if len(self.blocks) == 0:
+            return 0
+        return self.blocks[-1]
+
+    def get_date_range_offsets(
+            self,
+            start_date: datetime.date = None,
+            stop_date: datetime.date = None,
+    ) -> typing.Tuple[int, int] or None:
+        """
+        返回日期范围 [`start_date`, `stop_date`) 在已索引部分中对应的字节范围，没有对应的日志行时返回 None。
+        """
+        # YYYY-MM-DD 格式的日期按字符串排序即按日期排序
+        start_day = to_date(start_date)
+        stop_day = to_date(stop_date)
+        first = 0 if start_day is None else bisect.bisect_left(self.day_keys, start_day.isoformat())
+        last = len(self.day_keys) if stop_day is None else bisect.bisect_left(self.day_keys, stop_day.isoformat())
+        start_offset = None
+        stop_offset = None
+        for day in self.day_keys[first:last]:
+            day_start, day_end = self.days[day]
+            if start_offset is None or day_start < start_offset:
+                start_offset = day_start
+            if stop_offset is None or day_end > stop_offset:
+                stop_offset = day_end
+        if start_offset is None:
+            return None
+        return start_offset, stop_offset
+
+    def sort_days(self):
+        self.day_keys = sorted(self.days)
+
+    def get_node_ranges(
+            self,
+            node_path: str,
+            start_offset: int = 0,
+            stop_offset: int = None,
+    ) -> typing.List[typing.Tuple[int, int]]:
+        """
+        返回 ``tail_offset`` 之前包含节点路径的字节范围，并裁剪到 [`start_offset`, `stop_offset`)。
+        """
+        if stop_offset is None:
+            stop_offset = self.tail_offset
+        stop_offset = min(stop_offset, self.tail_offset)
+        ranges = []
+        for first_block, last_block in self.nodes.get(node_path, []):
+            range_start = max(self.blocks[first_block], start_offset)
+            range_end = min(self._block_end(last_block), stop_offset)
+            if range_start < range_end:
+                ranges.append((range_start, range_end))
+        return ranges
+
+    def _block_end(self, block_id: int) -> int:
+        if block_id + 1 < len(self.blocks):
+            return self.blocks[block_id + 1]
+        return self.indexed_size
+
+    def to_dict(self) -> dict:
+        return {
+            "version": INDEX_VERSION,
+            "fingerprint": self.fingerprint.to_dict(),
+            "block_size": self.block_size,
+            "blocks": self.blocks,
+            "days": self.days,
+            "nodes": self.nodes,
+        }
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "LogIndex":
+        return cls(
+            fingerprint=LogFileFingerprint.from_dict(d["fingerprint"]),
+            block_size=d["block_size"],
+            blocks=d["blocks"],
+            days=d["days"],
+            nodes=d["nodes"],
+        )
+
+    def save(self, index_path: str):
+        temp_path = index_path + ".tmp"
+        with open(temp_path, "w") as f:
+            json.dump(self.to_dict(), f, separators=(",", ":"))
+        os.replace(temp_path, index_path)
+
+    @classmethod
+    def load(cls, index_path: str) -> "LogIndex" or None:
+        try:
+            with open(index_path) as f:
+                d = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if d.get("version") != INDEX_VERSION:
+            return None
+        return cls.from_dict(d)
+
+
+def get_index_path(file_path: str) -> str:
+    return file_path + INDEX_SUFFIX
+
+
+def is_index_valid(index: LogIndex, fingerprint: LogFileFingerprint) -> bool:
+    """
+    检查索引是否仍然适用于日志文件：文件开头相同，并且没有变小。
+    如果大小相同，修改时间也必须相同，否则认为文件已被改写。
+    """
+    indexed = index.fingerprint
+    if indexed is None or indexed.head != fingerprint.head:
+        return False
+    if fingerprint.size < indexed.size:
+        return False
+    if fingerprint.size == indexed.size and fingerprint.mtime != indexed.mtime:
+        return False
+    return True
+
+
+def load_index(file_path: str, index_path: str = None) -> LogIndex or None:
+    """
+    加载日志文件的索引，索引不存在或已失效时返回 None。
+
+    日志文件在建立索引后增长时索引仍然有效，``tail_offset`` 之后的部分需要调用方直接扫描。
+    """
+    if is_compressed(file_path):
+        return None
+    if index_path is None:
+        index_path = get_index_path(file_path)
+    if not os.path.exists(index_path):
+        return None
+    index = LogIndex.load(index_path)
+    if index is None:
+        return None
+    if not is_index_valid(index, LogFileFingerprint.from_file(file_path)):
+        logger.warning("index is out of date, ignore it: {}", index_path)
+        return None
+    return index
+
+
+def build_index(
+        file_path: str,
+        index_path: str = None,
+        block_size: int = DEFAULT_INDEX_BLOCK_SIZE,
+        rebuild: bool = False,
+) -> LogIndex:
+    """
+    建立或增量更新日志文件的附属索引，并保存到 ``index_path``。
+
+    如果已有索引仍然有效，只扫描最后一个未满的块和新增的部分。
+
+    Parameters
+    ----------
+    file_path: str
+        日志文件路径
+    index_path: str
+        索引文件路径，默认为日志文件路径加上 ``.index.json``
+    block_size: int
+        块大小，仅在新建索引时使用
+    rebuild: bool
+        是否忽略已有索引，重新建立
+
+    Returns
+    -------
+    LogIndex
+    """
+    if is_compressed(file_path):
+        raise ValueError(f"index is not supported for compressed log file: {file_path}")
+    if index_path is None:
+        index_path = get_index_path(file_path)
+    fingerprint = LogFileFingerprint.from_file(file_path)
+
+    index = None
+    if not rebuild and os.path.exists(index_path):
+        index = LogIndex.load(index_path)
+        if index is not None and not is_index_valid(index, fingerprint):
+            logger.info("index is out of date, rebuild: {}", index_path)
+            index = None
+
+    if index is None:
+        index = LogIndex(block_size=block_size)
+        start_offset = 0
+    elif index.fingerprint.size == fingerprint.size:
+        logger.info("index is up to date: {}", index_path)
+        return index
+    else:
+        start_offset = _drop_last_block(index)
+
+    logger.info("indexing {} from offset {}...", file_path, start_offset)
+    _scan_into_index(file_path, index, start_offset, fingerprint.size)
+    index.fingerprint = fingerprint
+    index.save(index_path)
+    logger.info("indexing {} from offset {}...Done, {} blocks", file_path, start_offset, len(index.blocks))
+    return index
+
+
+def _drop_last_block(index: LogIndex) -> int:
+    """
+    删除最后一个块，返回重新扫描的起始偏移。
+
+    最后一个块可能未满，也可能以不完整的行结尾，所以总是重新扫描。日期范围会在重新扫描时被合并，无需删除。
+    """
+    if len(index.blocks) == 0:
+        return 0
+    last_block_id = len(index.blocks) - 1
+    last_block_start = index.blocks.pop()
+    for node_path in list(index.nodes.keys()):
+        block_ranges = index.nodes[node_path]
+        first_block, last_block = block_ranges[-1]
+        if last_block != last_block_id:
+            continue
+        if first_block == last_block_id:
+            block_ranges.pop()
+        else:
+            block_ranges[-1] = [first_block, last_block_id - 1]
+        if len(block_ranges) == 0:
+            del index.nodes[node_path]
+    return last_block_start
+
+
+def _scan_into_index(file_path: str, index: LogIndex, start_offset: int, stop_offset: int):
+    day_cache = dict()
+    with open(file_path, "rb") as f:
+        f.seek(start_offset)
+        for base_offset, chunk in iter_chunks(
+            f,
+            chunk_size=index.block_size,
+            start_offset=start_offset,
+            stop_offset=stop_offset,
+        ):
+            block_id = len(index.blocks)
+            index.blocks.append(base_offset)
+            block_paths = _scan_block(chunk, base_offset, index.days, day_cache)
+            for node_path in _with_ancestors(block_paths):
+                block_ranges = index.nodes.setdefault(node_path, [])
+                if len(block_ranges) > 0 and block_ranges[-1][1] == block_id - 1:
+                    block_ranges[-1][1] = block_id
+                else:
+                    block_ranges.append([block_id, block_id])
+    index.sort_days()
+
+
+def _scan_block(
+        chunk: bytes,
+        base_offset: int,
+        days: typing.Dict[str, typing.List[int]],
+        day_cache: typing.Dict[bytes, str],
+) -> typing.Set[bytes]:
+    block_paths = set()
+    offset = base_offset
+    for line in chunk.splitlines(keepends=True):
+        line_start = offset
+        offset += len(line)
+
+        stamp_end = line.find(b"]", 0, 32)
+        if stamp_end == -1:
+            continue
+        date_start = line.find(b" ", 0, stamp_end)
+        if date_start == -1:
+            continue
+        date_bytes = line[date_start + 1:stamp_end]
+        day = day_cache.get(date_bytes)
+        if day is None:
+            try:
+                d, m, y = date_bytes.split(b".")
+                day = datetime.date(int(y), int(m), int(d)).isoformat()
+            except ValueError:
+                continue
+            day_cache[date_bytes] = day
+
+        day_range = days.get(day)
+        if day_range is None:
+            days[day] = [line_start, offset]
+        else:
+            if line_start < day_range[0]:
+                day_range[0] = line_start
+            if offset > day_range[1]:
+                day_range[1] = offset
+
+        if not line.startswith(b"LOG:"):
+            continue
+        match = NODE_PATH_PATTERN.search(line, stamp_end)
+        if match is not None:
+            block_paths.add(match.group(1))
+    return block_paths
+
+
+def _with_ancestors(paths: typing.Iterable[bytes]) -> typing.Set[str]:
+    result = set()
+    for path in paths:
+        node_path = path.decode("utf-8", errors="replace").rstrip("/")
+        while node_path and node_path not in result:
+            result.add(node_path)
+            node_path = node_path[:node_path.rfind("/")]
+    return result
@@ -0,0 +1,163 @@
+import os
+import glob
+import typing
+import hashlib
+import datetime
+
+from loguru import logger
+
+from .compressed import is_compressed, open_log_file
+from .log_index import INDEX_SUFFIX, LogFileFingerprint
+from .timestamp import parse_line_datetime, to_date
+
+
+# 查找第一个和最后一个时间戳时读取的字节数
+PROBE_SIZE = 64 * 1024
+
+
+class LogFileInfo(object):
+    """
+    日志文件的时间范围
+
+    Attributes
+    ----------
+    file_path: str
+        日志文件路径
+    first_time: datetime.datetime
+        第一条日志的时间，无法获取时为 None
+    last_time: datetime.datetime
+        最后一条日志的时间，无法获取时为 None。压缩文件需要解压整个文件才能获取，所以总是为 None
+    """
+    def __init__(
+            self,
+            file_path: str,
+            first_time: datetime.datetime = None,
+            last_time: datetime.datetime = None,
+    ):
+        self.file_path = file_path
+        self.first_time = first_time
+        self.last_time = last_time
+
+    @classmethod
+    def from_file(cls, file_path: str) -> "LogFileInfo":
+        with open_log_file(file_path) as f:
+            head = f.read(PROBE_SIZE)
+        first_time = None
+        for line in head.splitlines():
+            first_time = parse_line_datetime(line)
+            if first_time is not None:
+                break
+
+        last_time = None
+        if not is_compressed(file_path):
+            file_size = os.path.getsize(file_path)
+            with open(file_path, "rb") as f:
+                f.seek(max(0, file_size - PROBE_SIZE))
+                tail = f.read()
+            for line in reversed(tail.splitlines()):
+                last_time = parse_line_datetime(line)
+                if last_time is not None:
+                    break
+
+        return cls(file_path, first_time, last_time)
+
+
+class LogSet(object):
+    """
+    由多个日志文件组成的按时间排序的逻辑日志，例如正在写入的日志文件和之前轮转归档的日志文件。
+
+    每个文件只读取开头和结尾的少量内容获取时间范围，文件按第一条日志的时间排序。
+    最后一条日志的时间未知时（压缩文件），使用下一个文件第一条日志的时间作为上限，即假设轮转的压缩文件与下一个文件没有重叠。
+    最后一个文件的最后一条日志时间未知时，该文件不会因为起始日期被跳过。
+
+    Attributes
+    ----------
+    files: typing.List[LogFileInfo]
+        按时间排序的日志文件
+    """
+    def __init__(self, file_paths: typing.Iterable[str]):
+        files = [LogFileInfo.from_file(file_path) for file_path in file_paths]
+        self.files = sorted(
+            files,
+            key=lambda x: (x.first_time is None, x.first_time or datetime.datetime.min, x.file_path),
+        )
+
+    def select(
+            self,
+            start_date: datetime.datetime = None,
+            stop_date: datetime.datetime = None,
+    ) -> typing.List[str]:
+        """
+        返回与日期范围 [`start_date`, `stop_date`) 有交集的日志文件，按时间排序。
+        """
+        start_day = to_date(start_date)
+        stop_day = to_date(stop_date)
+        selected = []
+        for i, info in enumerate(self.files):
+            last_time = info.last_time
+            if last_time is None and i + 1 < len(self.files):
+                last_time = self.files[i + 1].first_time
+
+            if stop_day is not None and info.first_time is not None and info.first_time.date() >= stop_day:
+                logger.debug("skip log file after date range: {}", info.file_path)
+                continue
+            if start_day is not None and last_time is not None and last_time.date() < start_day:
+                logger.debug("skip log file before date range: {}", info.file_path)
+                continue
+            selected.append(info.file_path)
+        return selected
+
+    @property
+    def last_time(self) -> datetime.datetime or None:
+        """
+        最后一个日志文件中最后一条日志的时间，无法获取时为 None。
+        """
+        if len(self.files) == 0:
+            return None
+        return self.files[-1].last_time
+
+    def get_key(self) -> str:
+        """
+        由各日志文件的绝对路径和文件开头的指纹计算的标识。日志文件增长时保持不变，日志文件被轮转或替换后改变。
+        """
+        key = hashlib.sha1()
+        for info in self.files:
+            fingerprint = LogFileFingerprint.from_file(info.file_path)
+            key.update(f"{os.path.abspath(info.file_path)}:{fingerprint.head}\n".encode("utf-8"))
+        return key.hexdigest()
+
+
+def expand_log_files(file_paths: str or typing.Iterable[str]) -> typing.List[str]:
+    """
+    展开日志文件路径中的通配符，返回不重复的文件路径列表。没有匹配任何文件的路径会原样保留。
+    通配符匹配到的附属索引文件会被忽略。
+    """
+    if isinstance(file_paths, str):
+        file_paths = [file_paths]
+    result = []
+    for file_path in file_paths:
+        if glob.has_magic(file_path):
+            matched = [p for p in sorted(glob.glob(file_path)) if not p.endswith(INDEX_SUFFIX)]
+        else:
+            matched = [file_path]
+        if len(matched) == 0:
+            matched = [file_path]
+        for path in matched:
+            if path not in result:
+                result.append(path)
+    return result
+
+
+def select_log_files(
+        file_paths: str or typing.Iterable[str],
+        start_date: datetime.datetime = None,
+        stop_date: datetime.datetime = None,
+) -> typing.List[str]:
+    """
+    展开日志文件路径，并返回与日期范围 [`start_date`, `stop_date`) 有交集、按时间排序的日志文件。
+    只有一个日志文件时直接返回，不读取文件内容。
+    """
+    file_paths = expand_log_files(file_paths)
+    if len(file_paths) <= 1:
+        return file_paths
+    return LogSet(file_paths).select(start_date, stop_date)
@@ -0,0 +1,163 @@
+import os
+import typing
+import datetime
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from nwpc_workflow_log_model.log_record import LogRecord
+
+from .date_seek import align_to_line_start
+from .record_reader import get_read_ranges, parse_ranges, iter_records
+from .compressed import is_compressed
+
+
+# 每个任务至少处理的字节数，避免任务过小时进程间通信的开销超过解析时间
+MIN_SPLIT_SIZE = 4 * 1024 * 1024
+# 每个进程平均分到的任务数，任务数多于进程数可以平衡各部分解析速度的差异
+SPLITS_PER_JOB = 4
+
+
+def split_ranges(
+        file_path: str,
+        ranges: typing.List[typing.Tuple[int, int or None]],
+        count: int,
+        min_size: int = MIN_SPLIT_SIZE,
+) -> typing.List[typing.Tuple[int, int]]:
+    """
+    将字节范围列表拆分成大约 ``count`` 个以换行符对齐的子范围，保持原有顺序。
+    """
+    file_size = os.path.getsize(file_path)
+    ranges = [(start, file_size if stop is None else min(stop, file_size)) for start, stop in ranges]
+    total_size = sum(stop - start for start, stop in ranges if stop > start)
+    split_size = max(min_size, total_size // max(count, 1) + 1)
+
+    pieces = []
+    with open(file_path, "rb") as f:
+        for start, stop in ranges:
+            piece_start = start
+            while piece_start < stop:
+                piece_stop = piece_start + split_size
+                if piece_stop >= stop:
+                    piece_stop = stop
+                else:
+                    piece_stop = min(align_to_line_start(f, piece_stop), stop)
+                pieces.append((piece_start, piece_stop))
+                piece_start = piece_stop
+    return pieces
+
+
+def _parse_piece(args) -> typing.List[LogRecord]:
+    file_path, node_path, piece, start_date, stop_date, include_children, status_only = args
+    return list(parse_ranges(
+        file_path,
+        node_path,
+        [piece],
+        start_date=start_date,
+        stop_date=stop_date,
+        include_children=include_children,
+        status_only=status_only,
+    ))
+
+
+def get_record_list_parallel(
+        file_path: str,
+        node_path: str,
+        start_date: datetime.datetime = None,
+        stop_date: datetime.datetime = None,
+        include_children: bool = False,
+        jobs: int = None,
+        status_only: bool = False,
+) -> typing.List[LogRecord]:
+    """
+    使用多进程读取日志文件中与节点相关的日志条目，结果与 ``get_record_list`` 相同。
+
+    需要读取的字节范围（见 ``get_read_ranges``）被拆分成以换行符对齐的子范围，由进程池分别解析，
+    各部分的结果按子范围在文件中的顺序合并，所以同一节点的日志条目顺序与串行读取完全一致。
+
+    Parameters
+    ----------
+    file_path: str
+        日志文件路径
+    node_path: str
+        节点路径
+    start_date: datetime.datetime
+        起始日期，[`start_date`, `stop_date`)
+    stop_date: datetime.datetime
+        结束日期，不包括在内
+    include_children: bool
+        是否包含子节点的日志条目
+    jobs: int
+        进程数，默认为 CPU 核心数
+    status_only: bool
+        是否只返回节点状态变化日志条目，见 ``iter_records``
+
+    Returns
+    -------
+    typing.List[LogRecord]
+    """
+    return list(iter_records_parallel(
+        file_path,
+        node_path,
+        start_date=start_date,
+        stop_date=stop_date,
+        include_children=include_children,
+        jobs=jobs,
+        status_only=status_only,
+    ))
+
+
+def iter_records_parallel(
+        file_path: str,
+        node_path: str,
+        start_date: datetime.datetime = None,
+        stop_date: datetime.datetime = None,
+        include_children: bool = False,
+        jobs: int = None,
+        status_only: bool = False,
+) -> typing.Iterator[LogRecord]:
+    """
+    ``get_record_list_parallel`` 的流式版本，按文件顺序逐个返回日志条目。
+
+    同时提交的任务数不超过 ``jobs * SPLITS_PER_JOB``，所以未被取走的解析结果占用的内存是有限的。
+    压缩文件无法拆分，使用串行读取，解压在后台线程中进行。
+    """
+    if is_compressed(file_path):
+        yield from iter_records(
+            file_path,
+            node_path,
+            start_date=start_date,
+            stop_date=stop_date,
+            include_children=include_children,
+            status_only=status_only,
+        )
+        return
+
+    if jobs is None:
+        jobs = os.cpu_count()
+
+    ranges = get_read_ranges(
+        file_path,
+        node_path,
+        start_date=start_date,
+        stop_date=stop_date,
+        status_only=status_only,
+    )
+    pieces = split_ranges(file_path, ranges, jobs * SPLITS_PER_JOB)
+
+    tasks = [
+        (file_path, node_path, piece, start_date, stop_date, include_children, status_only)
+        for piece in pieces
+    ]
+    if jobs <= 1 or len(tasks) <= 1:
+        for task in tasks:
+            yield from _parse_piece(task)
+        return
+
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        futures = deque()
+        for task in tasks:
+            if len(futures) >= jobs * SPLITS_PER_JOB:
+                yield from futures.popleft().result()
+            futures.append(executor.submit(_parse_piece, task))
+        while futures:
+            yield from futures.popleft().result()
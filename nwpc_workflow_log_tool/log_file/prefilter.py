@@ -0,0 +1,204 @@
+import typing
+
+
+DEFAULT_CHUNK_SIZE = 16 * 1024 * 1024
+
+# 节点名称中可能出现的字符，用于判断节点路径的边界
+NODE_NAME_CHARS = frozenset(
+    b"abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789_."
+)
+PATH_SEPARATOR = ord("/")
+
+
+class NodePathFilter(object):
+    """
+    在字节层面判断日志行是否包含某个节点路径，不进行解码和解析。
+
+    与 ``grep -P "/path/to/node(?!_)"`` 类似，但同时检查路径前后的边界，
+    避免 ``/model/fcst`` 匹配到 ``/model/fcst_post`` 或 ``/other/model/fcst``。
+
+    Attributes
+    ----------
+    node_path: str
+        节点路径
+    include_children: bool
+        是否同时匹配子节点，即 ``node_path`` 后紧跟 ``/`` 的情况
+    """
+    def __init__(
+            self,
+            node_path: str,
+            include_children: bool = False,
+    ):
+        self.node_path = node_path
+        self.include_children = include_children
+        self.needle = node_path.encode("utf-8")
+
+    def is_bounded(self, buffer: bytes, position: int) -> bool:
+        """
+        检查 ``buffer`` 中从 ``position`` 开始的匹配是否是完整的节点路径。
+        """
+        if position > 0 and buffer[position - 1] in NODE_NAME_CHARS:
+            return False
+        end = position + len(self.needle)
+        if end >= len(buffer):
+            return True
+        next_char = buffer[end]
+        if next_char in NODE_NAME_CHARS:
+            return False
+        if next_char == PATH_SEPARATOR:
+            return self.include_children
+        return True
+
+    def match_line(self, line: bytes) -> bool:
+        position = line.find(self.needle)
+        while position != -1:
+            if self.is_bounded(line, position):
+                return True
+            position = line.find(self.needle, position + 1)
+        return False
+
+    def scan_buffer(
+            self,
+            buffer: bytes,
+            base_offset: int = 0,
+    ) -> typing.Iterator[typing.Tuple[int, bytes]]:
+        """
+        在以换行符结尾的缓冲区中查找匹配的日志行。
+
+        只在 ``needle`` 出现的位置向两侧查找行边界，其余字节不会被 Python 代码访问。
+
+        Returns
+        -------
+        typing.Iterator[typing.Tuple[int, bytes]]
+            (行在文件中的偏移, 不含换行符的行内容)
+        """
+        needle = self.needle
+        position = buffer.find(needle)
+        while position != -1:
+            line_start = buffer.rfind(b"\n", 0, position) + 1
+            line_end = buffer.find(b"\n", position)
+            if line_end == -1:
+                line_end = len(buffer)
+
+            line = buffer[line_start:line_end]
+            if self.match_line(line):
+                yield base_offset + line_start, line.rstrip(b"\r")
+            position = buffer.find(needle, line_end)
+
+
+def iter_chunks(
+        f: typing.BinaryIO,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        start_offset: int = 0,
+        stop_offset: int = None,
+) -> typing.Iterator[typing.Tuple[int, bytes]]:
+    """
+    以大块方式读取二进制文件，每块都在换行符处截断，不会将一行分割到两个块中。
+
+    Parameters
+    ----------
+    f: typing.BinaryIO
+        以二进制方式打开的文件，需已定位到 ``start_offset``
+    chunk_size: int
+        每次读取的字节数
+    start_offset: int
+        ``f`` 当前位置对应的文件偏移
+    stop_offset: int
+        停止读取的文件偏移，为 None 时读取到文件结尾
+
+    Returns
+    -------
+    typing.Iterator[typing.Tuple[int, bytes]]
+        (块在文件中的偏移, 块内容)
+    """
+    offset = start_offset
+    remain = b""
+    while True:
+        size = chunk_size
+        if stop_offset is not None:
+            size = min(size, stop_offset - offset - len(remain))
+            if size <= 0:
+                break
+        data = f.read(size)
+        if not data:
+            break
+        data = remain + data
+        last_line_end = data.rfind(b"\n")
+        if last_line_end == -1:
+            remain = data
+            continue
+        chunk = data[:last_line_end + 1]
+        remain = data[last_line_end + 1:]
+        yield offset, chunk
+        offset += len(chunk)
+
+    if remain:
+        yield offset, remain
+
+
+def scan_node_lines(
+        file_path: str,
+        node_path: str,
+        include_children: bool = False,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        start_offset: int = 0,
+        stop_offset: int = None,
+) -> typing.Iterator[typing.Tuple[int, bytes]]:
+    """
+    从日志文件中提取包含节点路径的日志行，相当于内置的 ``grep``。
+
+    Parameters
+    ----------
+    file_path: str
+        日志文件路径
+    node_path: str
+        节点路径
+    include_children: bool
+        是否同时返回子节点的日志行
+    chunk_size: int
+        每次读取的字节数
+    start_offset: int
+        起始偏移，必须位于行首
+    stop_offset: int
+        结束偏移，为 None 时读取到文件结尾
+
+    Returns
+    -------
+    typing.Iterator[typing.Tuple[int, bytes]]
+        (行在文件中的偏移, 不含换行符的行内容)
+    """
+    yield from scan_node_ranges(
+        file_path,
+        node_path,
+        [(start_offset, stop_offset)],
+        include_children=include_children,
+        chunk_size=chunk_size,
+    )
+
+
+def scan_node_ranges(
+        file_path: str,
+        node_path: str,
+        ranges: typing.Iterable[typing.Tuple[int, int or None]],
+        include_children: bool = False,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> typing.Iterator[typing.Tuple[int, bytes]]:
+    """
+    从日志文件的多个字节范围中提取包含节点路径的日志行，范围需按偏移排序且起始偏移位于行首。
+
+    Returns
+    -------
+    typing.Iterator[typing.Tuple[int, bytes]]
+        (行在文件中的偏移, 不含换行符的行内容)
+    """
+    node_filter = NodePathFilter(node_path, include_children=include_children)
+    with open(file_path, "rb") as f:
+        for start_offset, stop_offset in ranges:
+            f.seek(start_offset)
+            for base_offset, chunk in iter_chunks(
+                f,
+                chunk_size=chunk_size,
+                start_offset=start_offset,
+                stop_offset=stop_offset,
+            ):
+                yield from node_filter.scan_buffer(chunk, base_offset)
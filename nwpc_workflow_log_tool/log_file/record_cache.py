@@ -0,0 +1,333 @@
+import os
+import json
+import shutil
+import hashlib
+import typing
+import datetime
+
+import numpy as np
+from loguru import logger
+
+from nwpc_workflow_model.node_status import NodeStatus
+from nwpc_workflow_log_tool.log_record import StatusRecord, StatusLineParser, NodePathTable
+from nwpc_workflow_log_tool.util import get_cache_dir
+from .log_index import LogFileFingerprint
+from .prefilter import DEFAULT_CHUNK_SIZE
+from .compressed import is_compressed, iter_file_chunks
+from .timestamp import to_date, parse_day
+
+
+CACHE_VERSION = 2
+META_FILE_NAME = "meta.json"
+
+
+class RecordCache(object):
+    """
+    日志文件中节点状态变化日志条目的列式缓存，按天分区保存为 NumPy ``.npz`` 文件。
+
+    每个分区包含以下列：
+
+    - ``timestamp``: ``datetime64[s]``，日志时间
+    - ``node_id``: ``int32``，节点路径在节点路径表中的序号
+    - ``status``: ``int8``，节点状态在状态表中的序号
+    - ``line_offset``: ``int64``，日志行在日志文件中的偏移
+
+    缓存目录由日志文件的绝对路径和文件开头的指纹确定。
+    日志文件增长后，只解析新增的部分，并合并到对应日期的分区中。
+    压缩的日志文件不会增长，文件变化后重新建立缓存。日志文件变小，或者大小不变但修改时间变化时，也重新建立缓存。
+
+    未压缩日志文件最后没有换行符的一行可能还在写入，不会被缓存，读取时直接从日志文件中解析。
+    分区和元数据文件都先写入临时文件再替换，元数据在所有分区写入后最后写入，并记录每个分区的行数，
+    分区中超出该行数的部分（写入元数据之前中断时留下的）在读取和追加时被忽略，不会产生重复的日志条目。
+
+    Attributes
+    ----------
+    file_path: str
+        日志文件路径
+    cache_path: str
+        该日志文件的缓存目录
+    node_path_table: NodePathTable
+        节点路径表
+    statuses: typing.List[str]
+        状态表
+    parsed_offset: int
+        已解析部分的结束偏移，总是位于行首
+    fingerprint: LogFileFingerprint
+        上次更新缓存时日志文件的指纹
+    days: typing.Dict[str, int]
+        已缓存的日期（YYYY-MM-DD）到分区行数的映射
+    """
+    def __init__(
+            self,
+            file_path: str,
+            cache_dir: str = None,
+    ):
+        self.file_path = file_path
+        if cache_dir is None:
+            cache_dir = get_cache_dir("records")
+
+        fingerprint = LogFileFingerprint.from_file(file_path)
+        key = hashlib.sha1(
+            f"{os.path.abspath(file_path)}:{fingerprint.head}".encode("utf-8")
+        ).hexdigest()
+        self.cache_path = os.path.join(cache_dir, key)
+
+        self.node_path_table = NodePathTable()
+        self.statuses = [s.value for s in NodeStatus]
+        self.parsed_offset = 0
+        self.fingerprint = None
+        self.days = dict()
+
+        self._load_meta()
+
+    def update(self, chunk_size: int = DEFAULT_CHUNK_SIZE):
+        """
+        解析日志文件中尚未缓存的部分，更新缓存。
+        """
+        fingerprint = LogFileFingerprint.from_file(self.file_path)
+        if self.fingerprint is not None:
+            same_size = fingerprint.size == self.fingerprint.size
+            if same_size and fingerprint.mtime == self.fingerprint.mtime:
+                return
+            # 大小不变但修改时间变化说明文件被改写，与 ``is_index_valid`` 相同
+            if same_size or is_compressed(self.file_path) or fingerprint.size < self.fingerprint.size:
+                logger.info("log file is changed, clear cache: {}", self.cache_path)
+                self.clear()
+
+        logger.info("caching records from offset {}...", self.parsed_offset)
+        # 压缩文件不会继续写入，最后一行即使没有换行符也是完整的
+        compressed = is_compressed(self.file_path)
+        status_codes = {s: i for i, s in enumerate(self.statuses)}
+        day_columns = dict()
+        parser = StatusLineParser(self.node_path_table)
+        parsed_offset = self.parsed_offset
+        for base_offset, chunk in iter_file_chunks(
+            self.file_path,
+            chunk_size=chunk_size,
+            start_offset=self.parsed_offset,
+        ):
+            if not chunk.endswith(b"\n") and not compressed:
+                break
+            parsed_offset = base_offset + len(chunk)
+            line_offset = base_offset
+            for line in chunk.splitlines(keepends=True):
+                current_offset = line_offset
+                line_offset += len(line)
+                record = parser.parse(line, current_offset)
+                if record is None:
+                    continue
+                columns = day_columns.setdefault(record.date.isoformat(), ([], [], [], []))
+                columns[0].append(datetime.datetime.combine(record.date, record.time))
+                columns[1].append(self.node_path_table.get_id(record.node_path))
+                columns[2].append(status_codes[record.status.value])
+                columns[3].append(record.line_offset)
+
+        os.makedirs(self.cache_path, exist_ok=True)
+        for day, columns in day_columns.items():
+            self._append_partition(day, columns)
+        self.parsed_offset = parsed_offset
+        self.fingerprint = fingerprint
+        self._save_meta()
+        logger.info("caching records...Done, {} days updated", len(day_columns))
+
+    def load(
+            self,
+            start_date: datetime.datetime = None,
+            stop_date: datetime.datetime = None,
+            node_path: str = None,
+            include_children: bool = False,
+    ) -> typing.List[StatusRecord]:
+        """
+        从缓存中读取日期范围 [`start_date`, `stop_date`) 内的节点状态变化日志条目，参数见 ``iter_records``。
+        """
+        return list(self.iter_records(
+            start_date=start_date,
+            stop_date=stop_date,
+            node_path=node_path,
+            include_children=include_children,
+        ))
+
+    def iter_records(
+            self,
+            start_date: datetime.datetime = None,
+            stop_date: datetime.datetime = None,
+            node_path: str = None,
+            include_children: bool = False,
+    ) -> typing.Iterator[StatusRecord]:
+        """
+        逐天读取日期范围 [`start_date`, `stop_date`) 内的节点状态变化日志条目，只读取需要的日期分区。
+        最后直接解析日志文件中未缓存的最后一行。
+
+        Parameters
+        ----------
+        start_date: datetime.datetime
+            起始日期，为 None 时不限制
+        stop_date: datetime.datetime
+            结束日期，不包括在内，为 None 时不限制
+        node_path: str
+            节点路径，为 None 时返回所有节点
+        include_children: bool
+            是否包含子节点
+
+        Returns
+        -------
+        typing.Iterator[StatusRecord]
+        """
+        node_ids = None
+        if node_path is not None:
+            node_ids = np.array([
+                i for i, p in enumerate(self.node_path_table.paths)
+                if p == node_path or (include_children and p.startswith(node_path + "/"))
+            ], dtype=np.int32)
+
+        statuses = [NodeStatus(s) for s in self.statuses]
+        time_cache = dict()
+        for day in self.get_days(start_date, stop_date):
+            columns = self._load_partition(day)
+            if node_ids is not None:
+                mask = np.isin(columns["node_id"], node_ids)
+                columns = {name: column[mask] for name, column in columns.items()}
+
+            # 同一分区中的日志条目共用日期对象，时间对象按一天中的秒数共享
+            record_date = parse_day(day)
+            seconds_of_day = (columns["timestamp"] - np.datetime64(day, "s")).astype(np.int64)
+            for seconds, node_id, status, line_offset in zip(
+                    seconds_of_day.tolist(),
+                    columns["node_id"].tolist(),
+                    columns["status"].tolist(),
+                    columns["line_offset"].tolist(),
+            ):
+                record_time = time_cache.get(seconds)
+                if record_time is None:
+                    record_time = datetime.time(seconds // 3600, seconds // 60 % 60, seconds % 60)
+                    time_cache[seconds] = record_time
+                yield StatusRecord(
+                    date=record_date,
+                    time=record_time,
+                    node_path=self.node_path_table.paths[node_id],
+                    status=statuses[status],
+                    line_offset=line_offset,
+                    log_file=self.file_path,
+                )
+
+        yield from self._iter_tail_records(start_date, stop_date, node_path, include_children)
+
+    def get_days(
+            self,
+            start_date: datetime.datetime = None,
+            stop_date: datetime.datetime = None,
+    ) -> typing.List[str]:
+        start_day = to_date(start_date)
+        stop_day = to_date(stop_date)
+        days = []
+        for day in sorted(self.days):
+            current_day = parse_day(day)
+            if start_day is not None and current_day < start_day:
+                continue
+            if stop_day is not None and current_day >= stop_day:
+                continue
+            days.append(day)
+        return days
+
+    def clear(self):
+        shutil.rmtree(self.cache_path, ignore_errors=True)
+        self.node_path_table = NodePathTable()
+        self.parsed_offset = 0
+        self.fingerprint = None
+        self.days = dict()
+
+    def _iter_tail_records(
+            self,
+            start_date: datetime.datetime = None,
+            stop_date: datetime.datetime = None,
+            node_path: str = None,
+            include_children: bool = False,
+    ) -> typing.Iterator[StatusRecord]:
+        """
+        直接解析上次更新时日志文件中 ``parsed_offset`` 之后的部分，即没有换行符的最后一行。
+        """
+        if self.fingerprint is None or self.parsed_offset >= self.fingerprint.size:
+            return
+        if is_compressed(self.file_path):
+            return
+        with open(self.file_path, "rb") as f:
+            f.seek(self.parsed_offset)
+            tail = f.read(self.fingerprint.size - self.parsed_offset)
+
+        start_day = to_date(start_date)
+        stop_day = to_date(stop_date)
+        parser = StatusLineParser(log_file=self.file_path)
+        line_offset = self.parsed_offset
+        for line in tail.splitlines(keepends=True):
+            record = parser.parse(line, line_offset)
+            line_offset += len(line)
+            if record is None:
+                continue
+            if start_day is not None and record.date < start_day:
+                continue
+            if stop_day is not None and record.date >= stop_day:
+                continue
+            if node_path is not None and record.node_path != node_path and not (
+                    include_children and record.node_path.startswith(node_path + "/")):
+                continue
+            yield record
+
+    def _partition_path(self, day: str) -> str:
+        return os.path.join(self.cache_path, f"{day}.npz")
+
+    def _load_partition(self, day: str) -> typing.Dict[str, np.ndarray]:
+        rows = self.days[day]
+        with np.load(self._partition_path(day)) as data:
+            return {name: data[name][:rows] for name in data.files}
+
+    def _append_partition(self, day: str, columns: typing.Tuple[list, list, list, list]):
+        new_columns = {
+            "timestamp": np.array(columns[0], dtype="datetime64[s]"),
+            "node_id": np.array(columns[1], dtype=np.int32),
+            "status": np.array(columns[2], dtype=np.int8),
+            "line_offset": np.array(columns[3], dtype=np.int64),
+        }
+        if day in self.days:
+            old_columns = self._load_partition(day)
+            new_columns = {
+                name: np.concatenate([old_columns[name], column])
+                for name, column in new_columns.items()
+            }
+        partition_path = self._partition_path(day)
+        temp_path = partition_path + ".tmp"
+        with open(temp_path, "wb") as f:
+            np.savez(f, **new_columns)
+        os.replace(temp_path, partition_path)
+        self.days[day] = len(new_columns["timestamp"])
+
+    def _meta_path(self) -> str:
+        return os.path.join(self.cache_path, META_FILE_NAME)
+
+    def _load_meta(self):
+        meta_path = self._meta_path()
+        if not os.path.exists(meta_path):
+            return
+        with open(meta_path) as f:
+            meta = json.load(f)
+        if meta.get("version") != CACHE_VERSION:
+            self.clear()
+            return
+        self.node_path_table = NodePathTable(meta["node_paths"])
+        self.statuses = meta["statuses"]
+        self.parsed_offset = meta["parsed_offset"]
+        self.fingerprint = LogFileFingerprint.from_dict(meta["fingerprint"])
+        self.days = meta["days"]
+
+    def _save_meta(self):
+        meta = {
+            "version": CACHE_VERSION,
+            "fingerprint": self.fingerprint.to_dict(),
+            "parsed_offset": self.parsed_offset,
+            "node_paths": self.node_path_table.paths,
+            "statuses": self.statuses,
+            "days": dict(sorted(self.days.items())),
+        }
+        temp_path = self._meta_path() + ".tmp"
+        with open(temp_path, "w") as f:
+            json.dump(meta, f)
+        os.replace(temp_path, self._meta_path())
@@ -0,0 +1,94 @@
+import array
+import typing
+
+from nwpc_workflow_log_tool.log_record import StatusRecord, StatusLineParser
+from .compressed import is_compressed, open_log_file
+
+
+# 压缩文件中跳过内容时每次解压的字节数
+SKIP_SIZE = 1024 * 1024
+
+
+class RecordLocations(object):
+    """
+    一组日志条目在日志文件中的位置，用于代替日志条目列表，需要时再从日志文件中重新读取。
+
+    位置按日志文件分段保存，每段是 (日志文件路径, 行偏移数组)，顺序与原日志条目列表相同。
+    每个日志条目只占用 8 个字节。
+
+    Attributes
+    ----------
+    runs: typing.List[typing.Tuple[str, array.array]]
+        (日志文件路径, 行偏移数组) 列表
+    """
+    __slots__ = ("runs",)
+
+    def __init__(self, runs: typing.List[typing.Tuple[str, array.array]] = None):
+        if runs is None:
+            runs = []
+        self.runs = runs
+
+    @classmethod
+    def from_records(cls, records: typing.Iterable) -> "RecordLocations" or None:
+        """
+        从日志条目创建，存在没有位置（``log_file`` 和 ``line_offset``）的日志条目时返回 None。
+        """
+        runs = []
+        current_file = None
+        offsets = None
+        for record in records:
+            log_file = getattr(record, "log_file", None)
+            line_offset = getattr(record, "line_offset", None)
+            if log_file is None or line_offset is None:
+                return None
+            if log_file != current_file:
+                current_file = log_file
+                offsets = array.array("q")
+                runs.append((log_file, offsets))
+            offsets.append(line_offset)
+        return cls(runs)
+
+    def __len__(self) -> int:
+        return sum(len(offsets) for _, offsets in self.runs)
+
+    def read(self) -> typing.List[StatusRecord]:
+        """
+        从日志文件中重新读取日志条目。日志文件在记录位置之后被截断或改写时，结果不可靠。
+
+        每个日志文件按偏移顺序只向前读取一遍，见 ``_read_lines``。
+        """
+        records = []
+        for log_file, offsets in self.runs:
+            parser = StatusLineParser(log_file=log_file)
+            lines = _read_lines(log_file, offsets)
+            for line_offset in offsets:
+                record = parser.parse(lines[line_offset], line_offset)
+                if record is not None:
+                    records.append(record)
+        return records
+
+
+def _read_lines(log_file: str, offsets: typing.Iterable[int]) -> typing.Dict[int, bytes]:
+    """
+    读取日志文件中位于 ``offsets`` 的日志行，返回 {行偏移: 不含换行符的行内容}。
+
+    压缩文件无法定位，向前定位需要解压中间的内容，向后定位需要从头解压，
+    所以按偏移从小到大只读取一遍，跳过的内容分块解压后丢弃。
+    """
+    compressed = is_compressed(log_file)
+    lines = dict()
+    with open_log_file(log_file) as f:
+        position = 0
+        for line_offset in sorted(set(offsets)):
+            if compressed:
+                while position < line_offset:
+                    data = f.read(min(line_offset - position, SKIP_SIZE))
+                    if len(data) == 0:
+                        break
+                    position += len(data)
+            else:
+                f.seek(line_offset)
+            line = f.readline()
+            lines[line_offset] = line.rstrip(b"\r\n")
+            position = line_offset + len(line)
+    return lines
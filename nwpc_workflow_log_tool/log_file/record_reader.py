@@ -0,0 +1,189 @@
+import typing
+import datetime
+
+from nwpc_workflow_log_model.log_record import LogRecord
+from nwpc_workflow_log_model.log_record.ecflow import EcflowLogParser
+
+from nwpc_workflow_log_tool.log_record import StatusLineParser
+from .prefilter import scan_node_ranges, DEFAULT_CHUNK_SIZE
+from .compressed import is_compressed, scan_node_stream
+from .date_seek import find_date_range_offsets
+from .log_index import load_index
+from .timestamp import to_date
+
+
+def iter_records(
+        file_path: str,
+        node_path: str,
+        start_date: datetime.datetime = None,
+        stop_date: datetime.datetime = None,
+        include_children: bool = False,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        seek: bool = True,
+        use_index: bool = True,
+        status_only: bool = False,
+) -> typing.Iterator[LogRecord]:
+    """
+    从日志文件中读取与节点相关的日志条目。
+
+    只返回节点状态变化日志条目（``status_only``）时，如果日志文件存在有效的附属索引（见 ``build_index``），
+    只读取索引中包含该节点且属于日期范围的块；否则通过二分查找定位日期范围对应的字节范围。
+    在读取的范围内，先在字节层面过滤掉不包含 ``node_path`` 的行，
+    只有剩余的行才会被解码并交给 ``EcflowLogParser`` 解析。
+
+    支持 gzip (.gz)、xz (.xz) 和 zstd (.zst) 压缩的日志文件，压缩文件以流的方式读取，不使用索引和二分查找。
+
+    Parameters
+    ----------
+    file_path: str
+        日志文件路径
+    node_path: str
+        节点路径
+    start_date: datetime.datetime
+        起始日期，[`start_date`, `stop_date`)，为 None 时不限制
+    stop_date: datetime.datetime
+        结束日期，不包括在内，为 None 时不限制
+    include_children: bool
+        是否包含子节点的日志条目
+    chunk_size: int
+        每次读取的字节数
+    seek: bool
+        是否根据日期范围定位读取位置。日志文件不按时间排序时应设为 False
+    use_index: bool
+        是否使用附属索引
+    status_only: bool
+        是否只返回节点状态变化日志条目。为 True 时使用 ``StatusLineParser`` 解析，返回 ``StatusRecord``
+
+    Returns
+    -------
+    typing.Iterator[LogRecord]
+    """
+    ranges = get_read_ranges(
+        file_path,
+        node_path,
+        start_date=start_date,
+        stop_date=stop_date,
+        seek=seek,
+        use_index=use_index,
+        status_only=status_only,
+    )
+
+    yield from parse_ranges(
+        file_path,
+        node_path,
+        ranges,
+        start_date=start_date,
+        stop_date=stop_date,
+        include_children=include_children,
+        chunk_size=chunk_size,
+        status_only=status_only,
+    )
+
+
+def parse_ranges(
+        file_path: str,
+        node_path: str,
+        ranges: typing.Iterable[typing.Tuple[int, int or None]],
+        start_date: datetime.datetime = None,
+        stop_date: datetime.datetime = None,
+        include_children: bool = False,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        status_only: bool = False,
+) -> typing.Iterator[LogRecord]:
+    """
+    解析日志文件多个字节范围中与节点相关、且属于日期范围 [`start_date`, `stop_date`) 的日志条目。
+    压缩文件忽略 ``ranges``，以流的方式读取整个文件。
+    """
+    start_day = to_date(start_date)
+    stop_day = to_date(stop_date)
+
+    if is_compressed(file_path):
+        lines = scan_node_stream(
+            file_path,
+            node_path,
+            start_date=start_date,
+            stop_date=stop_date,
+            include_children=include_children,
+            chunk_size=chunk_size,
+        )
+    else:
+        lines = scan_node_ranges(
+            file_path,
+            node_path,
+            ranges,
+            include_children=include_children,
+            chunk_size=chunk_size,
+        )
+
+    parser = EcflowLogParser()
+    status_parser = StatusLineParser(log_file=file_path)
+    for offset, line in lines:
+        if status_only:
+            record = status_parser.parse(line, offset)
+            if record is None:
+                continue
+        else:
+            record = parser.parse(line.decode("utf-8", errors="replace"))
+        if record.date is None:
+            continue
+        if start_day is not None and record.date < start_day:
+            continue
+        if stop_day is not None and record.date >= stop_day:
+            continue
+        yield record
+
+
+def get_read_ranges(
+        file_path: str,
+        node_path: str,
+        start_date: datetime.datetime = None,
+        stop_date: datetime.datetime = None,
+        seek: bool = True,
+        use_index: bool = True,
+        status_only: bool = False,
+) -> typing.List[typing.Tuple[int, int or None]]:
+    """
+    计算需要读取的字节范围列表，结束偏移为 None 表示读取到文件结尾。压缩文件总是从头读取。
+
+    附属索引只记录 ``LOG:`` 日志行中的节点，所以只在 ``status_only`` 为 True 时使用，
+    否则使用二分查找，以免漏掉 ``MSG:`` 等其它日志行。
+    """
+    if is_compressed(file_path):
+        return [(0, None)]
+
+    if use_index and status_only:
+        index = load_index(file_path)
+        if index is not None:
+            ranges = []
+            date_range = index.get_date_range_offsets(start_date, stop_date)
+            if date_range is not None:
+                ranges.extend(index.get_node_ranges(node_path, *date_range))
+            ranges.append((index.tail_offset, None))
+            return ranges
+
+    if seek and (start_date is not None or stop_date is not None):
+        return [find_date_range_offsets(file_path, start_date, stop_date)]
+
+    return [(0, None)]
+
+
+def get_record_list(
+        file_path: str,
+        node_path: str,
+        start_date: datetime.datetime = None,
+        stop_date: datetime.datetime = None,
+        include_children: bool = False,
+        status_only: bool = False,
+) -> typing.List[LogRecord]:
+    """
+    与 ``nwpc_workflow_log_collector.ecflow.log_file_util.get_record_list`` 接口相同，
+    无需预先使用 ``grep`` 提取日志条目。
+    """
+    return list(iter_records(
+        file_path,
+        node_path,
+        start_date=start_date,
+        stop_date=stop_date,
+        include_children=include_children,
+        status_only=status_only,
+    ))
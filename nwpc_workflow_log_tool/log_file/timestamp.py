@@ -0,0 +1,68 @@
+import datetime
+
+
+def parse_line_date(line: bytes) -> datetime.date or None:
+    """
+    从日志行的时间戳 ``[HH:MM:SS d.m.YYYY]`` 中解析日期，不解码整行。
+
+    Returns
+    -------
+    datetime.date or None
+        无法解析时返回 None
+    """
+    start = line.find(b"[")
+    if start == -1 or start > 8:
+        return None
+    end = line.find(b"]", start)
+    if end == -1:
+        return None
+    space = line.find(b" ", start, end)
+    if space == -1:
+        return None
+    try:
+        day, month, year = line[space + 1:end].split(b".")
+        return datetime.date(int(year), int(month), int(day))
+    except ValueError:
+        return None
+
+
+def parse_line_datetime(line: bytes) -> datetime.datetime or None:
+    """
+    从日志行的时间戳 ``[HH:MM:SS d.m.YYYY]`` 中解析日期和时间，不解码整行。
+
+    Returns
+    -------
+    datetime.datetime or None
+        无法解析时返回 None
+    """
+    start = line.find(b"[")
+    if start == -1 or start > 8:
+        return None
+    end = line.find(b"]", start)
+    if end == -1:
+        return None
+    space = line.find(b" ", start, end)
+    if space == -1:
+        return None
+    try:
+        hour, minute, second = line[start + 1:space].split(b":")
+        day, month, year = line[space + 1:end].split(b".")
+        return datetime.datetime(
+            int(year), int(month), int(day),
+            int(hour), int(minute), int(second),
+        )
+    except ValueError:
+        return None
+
+
+def to_date(d: datetime.datetime or datetime.date or None) -> datetime.date or None:
+    if isinstance(d, datetime.datetime):
+        return d.date()
+    return d
+
+
+def parse_day(day: str) -> datetime.date:
+    """
+    解析 ``YYYY-MM-DD`` 格式的日期。``datetime.date.fromisoformat`` 需要 Python 3.7。
+    """
+    return datetime.datetime.strptime(day, "%Y-%m-%d").date()
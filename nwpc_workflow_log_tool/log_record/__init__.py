@@ -0,0 +1,4 @@
+from .node_path_table import NodePathTable
+from .status_record import StatusRecord
+from .status_parser import StatusLineParser
+from .node_path_trie import NodePathTrie
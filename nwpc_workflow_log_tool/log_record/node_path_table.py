@@ -0,0 +1,57 @@
+import sys
+import typing
+
+
+class NodePathTable(object):
+    """
+    节点路径表，为每个节点路径分配一个序号，并保证相同的节点路径只保存一个字符串对象。
+
+    Attributes
+    ----------
+    paths: typing.List[str]
+        按序号排列的节点路径
+    """
+    def __init__(self, paths: typing.Iterable[str] = None):
+        self.paths = []
+        self._ids = dict()
+        self._bytes_cache = dict()
+        if paths is not None:
+            for path in paths:
+                self.get_id(path)
+
+    def __len__(self) -> int:
+        return len(self.paths)
+
+    def __contains__(self, node_path: str) -> bool:
+        return node_path in self._ids
+
+    def get_id(self, node_path: str) -> int:
+        """
+        返回节点路径的序号，不存在时添加到表中。
+        """
+        node_id = self._ids.get(node_path)
+        if node_id is None:
+            node_id = len(self.paths)
+            node_path = sys.intern(node_path)
+            self.paths.append(node_path)
+            self._ids[node_path] = node_id
+        return node_id
+
+    def get_path(self, node_id: int) -> str:
+        return self.paths[node_id]
+
+    def intern(self, node_path: str) -> str:
+        """
+        返回表中与 ``node_path`` 相同的字符串对象。
+        """
+        return self.paths[self.get_id(node_path)]
+
+    def intern_bytes(self, node_path: bytes) -> str:
+        """
+        与 ``intern`` 相同，但参数为字节串，已出现过的节点路径无需再次解码。
+        """
+        path = self._bytes_cache.get(node_path)
+        if path is None:
+            path = self.intern(node_path.decode("utf-8", errors="replace"))
+            self._bytes_cache[node_path] = path
+        return path
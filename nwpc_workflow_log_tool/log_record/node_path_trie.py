@@ -0,0 +1,100 @@
+import typing
+
+
+class _TrieNode(object):
+    __slots__ = ("children", "is_path")
+
+    def __init__(self):
+        self.children = dict()
+        self.is_path = False
+
+
+class NodePathTrie(object):
+    """
+    按节点名称逐级组织的节点路径前缀树。
+
+    查找某个节点路径是否位于某个已添加路径之下，或者某个节点是否有子节点，代价只与路径深度有关，与路径数量无关。
+
+    Examples
+    --------
+    >>> trie = NodePathTrie(["/grapes_meso_3km_v4_4/00"])
+    >>> trie.find_ancestor("/grapes_meso_3km_v4_4/00/model/fcst")
+    '/grapes_meso_3km_v4_4/00'
+    >>> trie.find_ancestor("/grapes_meso_3km_v4_4/12/model/fcst") is None
+    True
+    """
+    def __init__(self, paths: typing.Iterable[str] = None):
+        self._root = _TrieNode()
+        self._size = 0
+        if paths is not None:
+            for path in paths:
+                self.add(path)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __contains__(self, node_path: str) -> bool:
+        node = self._find(node_path)
+        return node is not None and node.is_path
+
+    def add(self, node_path: str):
+        node = self._root
+        for name in _split(node_path):
+            child = node.children.get(name)
+            if child is None:
+                child = _TrieNode()
+                node.children[name] = child
+            node = child
+        if not node.is_path:
+            node.is_path = True
+            self._size += 1
+
+    def find_ancestor(self, node_path: str) -> str or None:
+        """
+        返回已添加路径中 ``node_path`` 最近的祖先路径（包括 ``node_path`` 本身），不存在时返回 None。
+        """
+        node = self._root
+        names = _split(node_path)
+        found = None
+        for i, name in enumerate(names):
+            node = node.children.get(name)
+            if node is None:
+                break
+            if node.is_path:
+                found = i + 1
+        if found is None:
+            return None
+        return "/" + "/".join(names[:found])
+
+    def has_children(self, node_path: str) -> bool:
+        node = self._find(node_path)
+        return node is not None and len(node.children) > 0
+
+    def iter_paths(self) -> typing.Iterator[typing.Tuple[str, bool]]:
+        """
+        按深度优先顺序返回所有已添加的路径，同一层级按名称排序。
+
+        Returns
+        -------
+        typing.Iterator[typing.Tuple[str, bool]]
+            (节点路径, 是否有子节点)
+        """
+        stack = [("", self._root)]
+        while stack:
+            path, node = stack.pop()
+            if node.is_path:
+                yield path, len(node.children) > 0
+            for name in sorted(node.children, reverse=True):
+                stack.append((f"{path}/{name}", node.children[name]))
+
+    def _find(self, node_path: str) -> _TrieNode or None:
+        node = self._root
+        for name in _split(node_path):
+            node = node.children.get(name)
+            if node is None:
+                return None
+        return node
+
+
+def _split(node_path: str) -> typing.List[str]:
+    return [name for name in node_path.split("/") if name != ""]
@@ -0,0 +1,103 @@
+import datetime
+
+from nwpc_workflow_model.node_status import NodeStatus
+
+from .status_record import StatusRecord
+from .node_path_table import NodePathTable
+
+
+STATUS_LINE_PREFIX = b"LOG:["
+COLON = ord(":")
+ZERO = ord("0")
+
+STATUS_NAMES = {s.value.encode("utf-8"): s for s in NodeStatus}
+
+
+class StatusLineParser(object):
+    """
+    节点状态变化日志行的快速解析器，只解析 ``LOG:`` 类型中的节点状态变化日志行，例如：
+
+        LOG:[04:36:51 1.6.2020]  submitted: /grapes_meso_3km_v4_4/00/model/fcst
+
+    与 ``EcflowLogParser`` 相比：
+
+    - 直接处理字节串，根据行首前缀排除 ``MSG``、``ERR``、``WAR``、``DBG`` 等日志行
+    - 缓存日期字符串到 ``datetime.date`` 的转换结果，相邻日志行通常属于同一天
+    - 按固定位置计算 ``HH:MM:SS``，不使用 ``strptime``
+    - 通过节点路径表共享节点路径字符串，相同节点的日志条目共用同一个字符串对象
+
+    解析结果 ``StatusRecord`` 提供与 ``StatusLogRecord`` 相同的 ``date``、``time``、``node_path`` 和 ``status``。
+
+    Attributes
+    ----------
+    node_path_table: NodePathTable
+        节点路径表，可以在多个解析器之间共享
+    log_file: str
+        日志文件路径，保存到解析结果的 ``StatusRecord.log_file`` 中
+    """
+    def __init__(self, node_path_table: NodePathTable = None, log_file: str = None):
+        if node_path_table is None:
+            node_path_table = NodePathTable()
+        self.node_path_table = node_path_table
+        self.log_file = log_file
+        self._date_cache = dict()
+        self._time_cache = dict()
+
+    def parse(self, line: bytes, line_offset: int = None) -> StatusRecord or None:
+        """
+        解析一行日志，不是节点状态变化日志行时返回 None。
+        """
+        if not line.startswith(STATUS_LINE_PREFIX):
+            return None
+        stamp_end = line.find(b"]", 13, 32)
+        if stamp_end == -1 or line[7] != COLON or line[10] != COLON:
+            return None
+
+        seconds = (
+            ((line[5] - ZERO) * 10 + line[6] - ZERO) * 3600
+            + ((line[8] - ZERO) * 10 + line[9] - ZERO) * 60
+            + (line[11] - ZERO) * 10 + line[12] - ZERO
+        )
+        record_time = self._time_cache.get(seconds)
+        if record_time is None:
+            try:
+                record_time = datetime.time(seconds // 3600, seconds // 60 % 60, seconds % 60)
+            except ValueError:
+                return None
+            self._time_cache[seconds] = record_time
+
+        date_bytes = line[14:stamp_end]
+        record_date = self._date_cache.get(date_bytes)
+        if record_date is None:
+            try:
+                day, month, year = date_bytes.split(b".")
+                record_date = datetime.date(int(year), int(month), int(day))
+            except ValueError:
+                return None
+            self._date_cache[date_bytes] = record_date
+
+        status_end = line.find(b":", stamp_end)
+        if status_end == -1:
+            return None
+        status = STATUS_NAMES.get(line[stamp_end + 1:status_end].strip())
+        if status is None:
+            return None
+
+        path_start = line.find(b"/", status_end)
+        if path_start == -1:
+            return None
+        path_end = line.find(b" ", path_start)
+        if path_end == -1:
+            path_bytes = line[path_start:].rstrip()
+        else:
+            path_bytes = line[path_start:path_end]
+        node_path = self.node_path_table.intern_bytes(path_bytes)
+
+        return StatusRecord(
+            date=record_date,
+            time=record_time,
+            node_path=node_path,
+            status=status,
+            line_offset=line_offset,
+            log_file=self.log_file,
+        )
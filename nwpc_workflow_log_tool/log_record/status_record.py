@@ -0,0 +1,53 @@
+import datetime
+
+from nwpc_workflow_model.node_status import NodeStatus
+
+
+class StatusRecord(object):
+    """
+    节点状态变化日志条目的紧凑表示，不保存原始日志行。
+
+    提供与 ``StatusLogRecord`` 相同的属性供 ``SituationCalculator`` 使用，
+    可以从缓存中直接创建，无需再次使用 ``EcflowLogParser`` 解析日志行。
+
+    使用 ``__slots__`` 保存属性，每个对象只占用几十字节。
+    ``date``、``time`` 和 ``node_path`` 应该在多个对象之间共享，
+    例如 ``StatusLineParser`` 缓存日期和时间对象，并通过 ``NodePathTable`` 共享节点路径字符串。
+
+    Attributes
+    ----------
+    date: datetime.date
+        日期
+    time: datetime.time
+        时间
+    node_path: str
+        节点路径
+    status: NodeStatus
+        节点状态
+    line_offset: int
+        日志行在日志文件中的偏移，压缩文件为解压后数据中的偏移
+    log_file: str
+        日志文件路径，与 ``line_offset`` 一起确定日志行的位置，见 ``RecordLocations``
+    """
+    __slots__ = ("date", "time", "node_path", "status", "line_offset", "log_file")
+
+    def __init__(
+            self,
+            date: datetime.date,
+            time: datetime.time,
+            node_path: str,
+            status: NodeStatus,
+            line_offset: int = None,
+            log_file: str = None,
+    ):
+        self.date = date
+        self.time = time
+        self.node_path = node_path
+        self.status = status
+        self.line_offset = line_offset
+        self.log_file = log_file
+
+    @property
+    def log_record(self) -> str:
+        return f"LOG:[{self.time.strftime('%H:%M:%S')} {self.date.day}.{self.date.month}.{self.date.year}]" \
+               f"  {self.status.value}: {self.node_path}"
@@ -1,2 +1,4 @@
 from .time_point_presenter import TimePointPresenter
 from .time_period_presenter import TimePeriodPresenter
+from .node_summary_presenter import NodeSummaryPresenter
+from .rolling_baseline_presenter import RollingBaselinePresenter
@@ -0,0 +1,103 @@
+import typing
+
+import pandas as pd
+from scipy import stats
+
+from nwpc_workflow_log_tool.statistics import NodeStatistics, get_clock_table
+
+from .presenter import Presenter
+
+
+class NodeSummaryPresenter(Presenter):
+    """
+    输出多个节点的汇总表，每个节点一行，包括正常结束的天数以及开始时间、结束时间和运行时长的切尾均值
+
+    默认使用全部数据精确计算统计量。``use_sketch`` 为 True 时使用 ``NodeStatistics`` 的直方图计算，
+    也可以直接输出多个进程或多批数据合并后的统计结果，见 ``present_statistics``。
+
+    Attributes
+    ----------
+    ratio: float
+        切尾均值两侧各去掉的比例
+    statistic: str
+        统计量，默认为切尾均值 ``trim_mean``，也可以是 ``mean``，``p50``，``p90``，``p99``
+    use_sketch: bool
+        是否使用直方图（``HistogramSketch``）计算统计量
+    """
+    def __init__(self, ratio: float = 0.25, statistic: str = "trim_mean", use_sketch: bool = False):
+        super(NodeSummaryPresenter, self).__init__()
+        self.ratio = ratio
+        self.statistic = statistic
+        self.use_sketch = use_sketch
+
+    def present(
+            self,
+            table_data: pd.DataFrame,
+            node_types: typing.Dict[str, str] = None,
+    ):
+        """
+        Parameters
+        ----------
+        table_data: pd.DataFrame
+            ``NodesTableProcessor`` 生成的长格式表格，行索引为 (``node_path``, ``date``)
+        node_types: typing.Dict[str, str]
+            节点路径 => 节点类型
+        """
+        if self.use_sketch:
+            statistics = NodeStatistics()
+            statistics.update(table_data)
+            self.present_statistics(statistics, node_types)
+            return
+
+        table_data = table_data[table_data["time_period_in_all"].notna()]
+        clocks = get_clock_table(table_data)
+        clocks.index = table_data.index.get_level_values("node_path")
+
+        groups = clocks.groupby(level="node_path", sort=False, observed=False)
+        summary = groups.agg(self._aggregate)
+        summary.insert(0, "complete", groups.size())
+        summary.index = summary.index.astype(str)
+        self._print_summary(summary, node_types)
+
+    def present_statistics(
+            self,
+            statistics: NodeStatistics,
+            node_types: typing.Dict[str, str] = None,
+    ):
+        """
+        Parameters
+        ----------
+        statistics: NodeStatistics
+            节点运行时间统计
+        node_types: typing.Dict[str, str]
+            节点路径 => 节点类型
+        """
+        summary = statistics.get_summary(self.statistic, self.ratio)
+        for name in summary.columns[1:]:
+            summary[name] = summary[name].dt.round("s")
+        self._print_summary(summary, node_types)
+
+    def _print_summary(self, summary: pd.DataFrame, node_types: typing.Dict[str, str] or None):
+        if node_types is None:
+            node_types = dict()
+        summary.insert(0, "node_type", [node_types.get(node_path) for node_path in summary.index])
+
+        with pd.option_context("display.max_rows", None, "display.max_columns", None, "display.width", None):
+            print(summary)
+
+        print()
+        if self.statistic == "trim_mean":
+            print(f"Trimmed Mean ({self.ratio}) for days in complete state")
+        else:
+            print(f"{self.statistic} for days in complete state")
+
+    def _aggregate(self, series: pd.Series) -> pd.Timedelta:
+        if len(series) == 0:
+            return pd.NaT
+        if self.statistic == "trim_mean":
+            value = pd.to_timedelta(stats.trim_mean(series.values, self.ratio))
+        elif self.statistic == "mean":
+            value = series.mean()
+        else:
+            value = series.quantile(float(self.statistic[1:]) / 100)
+        return value.round("s")
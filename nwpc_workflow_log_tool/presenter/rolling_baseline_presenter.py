@@ -0,0 +1,80 @@
+import datetime
+
+import pandas as pd
+
+from nwpc_workflow_log_tool.statistics import get_rolling_baseline
+
+from .presenter import Presenter
+
+
+class RollingBaselinePresenter(Presenter):
+    """
+    计算每个节点每天之前 ``window`` 天的滚动基线（切尾均值和四分位距），输出比基线晚超过 ``threshold`` 的天。
+
+    与只计算一次切尾均值相比，滚动基线可以跟随业务调整逐渐变化，适合检查较长时间内每天的异常。
+
+    Attributes
+    ----------
+    metric: str
+        指标名称：``start_clock``，``end_clock`` 或 ``duration``
+    window: int
+        窗口天数
+    ratio: float
+        切尾均值两侧各去掉的比例
+    min_periods: int
+        窗口内正常结束的天数少于该值时不计算基线
+    threshold: pd.Timedelta or datetime.timedelta
+        与基线的差超过该值的天被标记为异常
+    show_all: bool
+        是否输出每一天，默认只输出异常的天
+    """
+    def __init__(
+            self,
+            metric: str = "end_clock",
+            window: int = 30,
+            ratio: float = 0.25,
+            min_periods: int = 7,
+            threshold: pd.Timedelta or datetime.timedelta = pd.Timedelta(minutes=30),
+            show_all: bool = False,
+    ):
+        super(RollingBaselinePresenter, self).__init__()
+        self.metric = metric
+        self.window = window
+        self.ratio = ratio
+        self.min_periods = min_periods
+        self.threshold = pd.Timedelta(threshold)
+        self.show_all = show_all
+
+    def present(self, table_data: pd.DataFrame):
+        """
+        Parameters
+        ----------
+        table_data: pd.DataFrame
+            ``NodesTableProcessor`` 生成的长格式表格，行索引为 (``node_path``, ``date``)
+        """
+        baseline = get_rolling_baseline(
+            table_data,
+            metric=self.metric,
+            window=self.window,
+            ratio=self.ratio,
+            min_periods=self.min_periods,
+        )
+        anomaly = baseline["deviation"] > self.threshold
+
+        if self.show_all:
+            baseline.insert(len(baseline.columns), "anomaly", anomaly)
+            rows = baseline
+        else:
+            rows = baseline[anomaly]
+
+        rows = rows.rename(columns={"trim_mean": "baseline"})
+        columns = [self.metric, "baseline", "iqr", "deviation"] + (["count", "anomaly"] if self.show_all else [])
+        with pd.option_context("display.max_rows", None, "display.max_columns", None, "display.width", None):
+            print(rows[columns])
+
+        print()
+        print(
+            f"Baseline: Trimmed Mean ({self.ratio}) of {self.metric} "
+            f"in previous {self.window} days (at least {self.min_periods} days in complete state)"
+        )
+        print(f"{anomaly.sum()} days are later than baseline by more than {self.threshold}")
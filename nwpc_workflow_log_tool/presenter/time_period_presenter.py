@@ -6,12 +6,14 @@ from nwpc_workflow_log_model.analytics.situation_type import (
     TaskSituationType
 )
 
+from nwpc_workflow_log_tool.statistics import HistogramSketch, get_quantile_names, to_timedelta
+
 from .presenter import Presenter
 
 
 class TimePeriodPresenter(Presenter):
     """
-    输出时间段内给定的节点状态（NodeStatus）时间段，并计算开始时间和结束时间的切尾均值（0.25）
+    输出时间段内给定的节点状态（NodeStatus）时间段，并计算开始时间和结束时间的切尾均值（0.25）和分位数（p50，p90，p99）
 
     Attributes
     ----------
@@ -19,13 +21,21 @@ class TimePeriodPresenter(Presenter):
         节点运行状态，只计算符合该状态的节点。一般只关心正常结束的节点，所以常用值为
             - `TaskSituationType.Complete`
             - `FamilySituationType.Complete`
+    use_sketch: bool
+        是否使用直方图（``HistogramSketch``）计算统计量，默认使用全部数据精确计算
+    node_path: str
+        节点路径，输出多个节点时设置，在表格之前输出
     """
     def __init__(
             self,
-            target_state: FamilySituationType or TaskSituationType
+            target_state: FamilySituationType or TaskSituationType,
+            use_sketch: bool = False,
+            node_path: str = None,
     ):
         super(TimePeriodPresenter, self).__init__()
         self.target_state = target_state
+        self.use_sketch = use_sketch
+        self.node_path = node_path
 
     def present(self, table_data: pd.DataFrame):
         if "time_period_in_all" not in table_data:
@@ -38,17 +48,30 @@ class TimePeriodPresenter(Presenter):
             "time_period_in_all": "duration"
         }, inplace=True)
 
+        if self.node_path is not None:
+            print()
+            print(self.node_path)
+
         with pd.option_context("display.max_rows", None, "display.max_columns", None):
             print(table_data[["start_time", "start_clock", "end_clock", "duration"]])
 
         ratio = 0.25
-
-        time_series_trim_mean = stats.trim_mean(table_data["start_clock"].values, ratio)
-        print()
-        print(f"Trimmed Mean for start time ({ratio}):")
-        print(pd.to_timedelta(time_series_trim_mean))
-
-        time_series_trim_mean = stats.trim_mean(table_data["end_clock"].values, ratio)
-        print()
-        print(f"Trimmed Mean for end time ({ratio}):")
-        print(pd.to_timedelta(time_series_trim_mean))
+        quantiles = [0.5, 0.9, 0.99]
+        for name, label in (("start_clock", "start time"), ("end_clock", "end time")):
+            if self.use_sketch:
+                sketch = HistogramSketch()
+                sketch.update(table_data[name].values)
+                time_series_trim_mean = to_timedelta(sketch.trim_mean(ratio))
+                quantile_values = [to_timedelta(value) for value in sketch.quantile(quantiles)]
+            else:
+                time_series_trim_mean = pd.to_timedelta(stats.trim_mean(table_data[name].values, ratio))
+                quantile_values = [table_data[name].quantile(q) for q in quantiles]
+            print()
+            print(f"Trimmed Mean for {label} ({ratio}):")
+            print(time_series_trim_mean)
+            print(f"Quantiles for {label}:")
+            print(pd.Series(
+                quantile_values,
+                index=get_quantile_names(quantiles),
+                dtype="timedelta64[ns]",
+            ).to_string())
@@ -9,12 +9,14 @@ from nwpc_workflow_log_model.analytics.situation_type import (
     TaskSituationType
 )
 
+from nwpc_workflow_log_tool.statistics import HistogramSketch, get_quantile_names, to_timedelta
+
 from .presenter import Presenter
 
 
 class TimePointPresenter(Presenter):
     """
-    输出时间段内给定的节点状态（NodeStatus）时间点，并计算均值和切尾均值（0.25）
+    输出时间段内给定的节点状态（NodeStatus）时间点，并计算均值、切尾均值（0.25）和分位数（p50，p90，p99）
 
     Notes
     -----
@@ -31,15 +33,24 @@ class TimePointPresenter(Presenter):
         节点运行状态，只计算符合该状态的节点。一般只关心正常结束的节点，所以常用值为
             - `TaskSituationType.Complete`
             - `FamilySituationType.Complete`
+
+    use_sketch: bool
+        是否使用直方图（``HistogramSketch``）计算统计量，默认使用全部数据精确计算
+    node_path: str
+        节点路径，输出多个节点时设置，在表格之前输出
     """
     def __init__(
             self,
             target_node_status: NodeStatus,
-            target_state: FamilySituationType or TaskSituationType
+            target_state: FamilySituationType or TaskSituationType,
+            use_sketch: bool = False,
+            node_path: str = None,
     ):
         super(TimePointPresenter, self).__init__()
         self.target_node_status = target_node_status
         self.target_state = target_state
+        self.use_sketch = use_sketch
+        self.node_path = node_path
 
     def present(self, table_data: pd.DataFrame):
         key = f"time_point_{self.target_node_status.name}"
@@ -47,17 +58,39 @@ class TimePointPresenter(Presenter):
             raise ValueError(f"{key} is not in table data")
 
         time_series = table_data[key] - table_data.start_time
-        time_series_mean = time_series.mean()
+
+        if self.node_path is not None:
+            print()
+            print(self.node_path)
 
         with pd.option_context("display.max_rows", None, "display.max_columns", None):
             print(time_series)
 
+        ratio = 0.25
+        quantiles = [0.5, 0.9, 0.99]
+        if self.use_sketch:
+            sketch = HistogramSketch()
+            sketch.update(time_series.values)
+            time_series_mean = to_timedelta(sketch.mean())
+            time_series_trim_mean = to_timedelta(sketch.trim_mean(ratio))
+            quantile_values = [to_timedelta(value) for value in sketch.quantile(quantiles)]
+        else:
+            time_series_mean = time_series.mean()
+            time_series_trim_mean = pd.to_timedelta(stats.trim_mean(time_series.values, ratio))
+            quantile_values = [time_series.quantile(q) for q in quantiles]
+
         print()
         print("Mean:")
         print(time_series_mean)
 
-        ratio = 0.25
-        time_series_trim_mean = stats.trim_mean(time_series.values, ratio)
         print()
         print(f"Trim Mean ({ratio}):")
-        print(pd.to_timedelta(time_series_trim_mean))
+        print(time_series_trim_mean)
+
+        print()
+        print("Quantiles:")
+        print(pd.Series(
+            quantile_values,
+            index=get_quantile_names(quantiles),
+            dtype="timedelta64[ns]",
+        ).to_string())
@@ -1 +1,2 @@
 from .node_table_processor import NodeTableProcessor
+from .nodes_table_processor import NodesTableProcessor
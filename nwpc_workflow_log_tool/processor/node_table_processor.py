@@ -1,6 +1,8 @@
 import typing
-from collections import defaultdict
+import datetime
+import functools
 
+import numpy as np
 import pandas as pd
 from loguru import logger
 
@@ -12,6 +14,25 @@ from nwpc_workflow_log_model.analytics.situation_type import (
 from .processor import Processor, SituationRecord
 
 
+NODE_TABLE_COLUMNS = [
+    "start_time",
+    "situation",
+    "time_point_submitted",
+    "time_point_active",
+    "time_point_complete",
+    "time_point_aborted",
+    "time_period_in_all",
+    "time_period_in_all_start",
+    "time_period_in_all_end",
+    "time_period_in_submitted",
+    "time_period_in_submitted_start",
+    "time_period_in_submitted_end",
+    "time_period_in_active",
+    "time_period_in_active_start",
+    "time_period_in_active_end",
+]
+
+
 class NodeTableProcessor(Processor):
     """
     将节点运行状态转成 ``pandas.DataFrame`` 表格数据
@@ -33,63 +54,169 @@ class NodeTableProcessor(Processor):
         super(NodeTableProcessor, self).__init__()
         self.node_path = node_path
         self.target_state = target_state
-        self.columns = [
-            "start_time",
-            "situation",
-            "time_point_submitted",
-            "time_point_active",
-            "time_point_complete",
-            "time_point_aborted",
-            "time_period_in_all",
-            "time_period_in_all_start",
-            "time_period_in_all_end",
-            "time_period_in_submitted",
-            "time_period_in_submitted_start",
-            "time_period_in_submitted_end",
-            "time_period_in_active",
-            "time_period_in_active_start",
-            "time_period_in_active_end",
-        ]
+        self.columns = list(NODE_TABLE_COLUMNS)
 
     def process(self, situations: typing.Iterable[SituationRecord]) -> pd.DataFrame:
-        df = pd.DataFrame(columns=self.columns)
-        for a_situation in situations:
-            current_date = a_situation.date
-            current_columns = defaultdict(list)
-            current_columns["start_time"] = [current_date]
-            current_columns["situation"] = [a_situation.state.name]
-            if a_situation.state is self.target_state:
-                node_situation = a_situation.node_situation
-                time_points = node_situation.time_points
-                for time_point in time_points:
-                    status = time_point.status.name
-                    key = f"time_point_{status.lower()}"
-                    if key in self.columns:
-                        current_columns[key] = [time_point.time]
-
-                for time_period in node_situation.time_periods:
-                    period_name = time_period.period_type.value
-                    key = f"time_period_{period_name}"
-                    if key in self.columns:
-                        current_columns[key] = [pd.Timedelta(time_period.end_time - time_period.start_time)]
-                        current_columns[key + "_start"] = [pd.Timestamp(time_period.start_time)]
-                        current_columns[key + "_end"] = [pd.Timestamp(time_period.end_time)]
-
-                current_df = pd.DataFrame(
-                    current_columns,
-                    columns=self.columns,
-                    index=[f"{current_date.strftime('%Y%m%d%H')}"]
-                )
-                df = df.append(current_df)
-            else:
-                current_df = pd.DataFrame(
-                    current_columns,
-                    columns=self.columns,
-                    index=[f"{current_date.strftime('%Y%m%d%H')}"]
-                )
-                df = df.append(current_df)
-                logger.warning("[{}] skip: DFA is not in complete", current_date.strftime("%Y-%m-%d"))
+        situations = list(situations)
+        builder = NodeTableBuilder(
+            columns=self.columns,
+            size=len(situations),
+            situation_categories=[s.name for s in type(self.target_state)],
+        )
+        for row, a_situation in enumerate(situations):
+            if not builder.set_situation(row, a_situation, self.target_state):
+                logger.warning("[{}] skip: DFA is not in complete", a_situation.date.strftime("%Y-%m-%d"))
                 # print_records(a_situation.records)
 
+        df = builder.build()
         df.sort_index(inplace=True)
         return df
+
+
+class NodeTableBuilder(object):
+    """
+    按列构建节点运行状态表格，最后一次性创建 ``pandas.DataFrame``。
+
+    每列预先分配为固定类型的数组，未填充的值为 ``NaT``：
+
+    - ``situation``：分类类型，类别为运行状态名称
+    - ``time_period_*``（时间段长度）：``timedelta64[ns]``，由时间段的结束时间减去开始时间得到
+    - 其它列（日期和时间点）：``datetime64[ns]``
+
+    填充的值先按列收集，创建表格时每列一次性转换为微秒数并写入数组，比逐个创建 ``numpy.datetime64`` 快很多。
+
+    Attributes
+    ----------
+    columns: typing.List[str]
+        表格列名称
+    size: int
+        行数
+    situation_categories: typing.List[str]
+        ``situation`` 列的类别
+    """
+    def __init__(
+            self,
+            columns: typing.List[str],
+            size: int,
+            situation_categories: typing.List[str],
+    ):
+        self.columns = columns
+        self.size = size
+        self.situation_categories = situation_categories
+        self._category_codes = {name: i for i, name in enumerate(situation_categories)}
+        self._situation_codes = np.full(size, -1, dtype=np.int16)
+        self._values = {
+            name: ([], [])
+            for name in columns
+            if name != "situation" and not _is_duration_column(name)
+        }
+
+    def set_situation(
+            self,
+            row: int,
+            situation: SituationRecord,
+            target_state: TaskSituationType or FamilySituationType,
+    ) -> bool:
+        """
+        用一天的运行状态填充一行。只有运行状态为 ``target_state`` 时才填充时间点和时间段，此时返回 True。
+        """
+        self.set_row(row, situation.date, situation.state.name)
+        if situation.state is not target_state:
+            return False
+
+        values = self._values
+        for time_point in situation.node_situation.time_points:
+            column = values.get(_get_time_point_column(time_point.status))
+            if column is not None and time_point.time is not None:
+                column[0].append(row)
+                column[1].append(time_point.time)
+
+        for time_period in situation.node_situation.time_periods:
+            start_name, end_name = _get_time_period_columns(time_period.period_type)
+            self.set_value(row, start_name, time_period.start_time)
+            self.set_value(row, end_name, time_period.end_time)
+        return True
+
+    def set_row(self, row: int, current_date: pd.Timestamp, situation: str):
+        """
+        设置一行的日期和运行状态。
+        """
+        self.set_value(row, "start_time", current_date)
+        self._situation_codes[row] = self._category_codes.get(situation, -1)
+
+    def set_value(self, row: int, name: str, value: datetime.datetime or None):
+        """
+        设置日期或时间点列的值，不在表格中的列和 None 被忽略。
+        """
+        column = self._values.get(name)
+        if column is None or value is None:
+            return
+        column[0].append(row)
+        column[1].append(value)
+
+    def get_columns(self) -> typing.Dict[str, typing.Any]:
+        """
+        返回列名称到列数据的字典，按 ``columns`` 的顺序。
+        """
+        arrays = dict()
+        for name, (rows, values) in self._values.items():
+            array = np.full(self.size, np.datetime64("NaT", "ns"), dtype="datetime64[ns]")
+            if len(rows) > 0:
+                array[rows] = _to_datetime64(values)
+            arrays[name] = array
+
+        data = dict()
+        for name in self.columns:
+            if name == "situation":
+                data[name] = pd.Categorical.from_codes(self._situation_codes, categories=self.situation_categories)
+            elif _is_duration_column(name):
+                start, end = arrays.get(name + "_start"), arrays.get(name + "_end")
+                if start is None or end is None:
+                    data[name] = np.full(self.size, np.timedelta64("NaT", "ns"), dtype="timedelta64[ns]")
+                else:
+                    data[name] = end - start
+            else:
+                data[name] = arrays[name]
+        return data
+
+    def build(self) -> pd.DataFrame:
+        """
+        创建表格，行索引为日期的 ``%Y%m%d%H`` 格式字符串。
+        """
+        data = self.get_columns()
+        index = pd.DatetimeIndex(data["start_time"]).strftime("%Y%m%d%H")
+        return pd.DataFrame(data, columns=self.columns, index=list(index))
+
+
+EPOCH = datetime.datetime(1970, 1, 1)
+ONE_MICROSECOND = datetime.timedelta(microseconds=1)
+
+
+def _to_datetime64(values: typing.List[datetime.datetime]) -> np.ndarray:
+    return np.fromiter(
+        (_to_microseconds(value) for value in values),
+        dtype=np.int64,
+        count=len(values),
+    ).view("datetime64[us]")
+
+
+def _to_microseconds(value: datetime.datetime) -> int:
+    # 减法对 pandas.Timestamp 很慢，直接使用纳秒数
+    if isinstance(value, pd.Timestamp):
+        return value.value // 1000
+    return (value - EPOCH) // ONE_MICROSECOND
+
+
+@functools.lru_cache(maxsize=None)
+def _get_time_point_column(status) -> str:
+    return f"time_point_{status.name.lower()}"
+
+
+@functools.lru_cache(maxsize=None)
+def _get_time_period_columns(period_type) -> typing.Tuple[str, str]:
+    key = f"time_period_{period_type.value}"
+    return key + "_start", key + "_end"
+
+
+def _is_duration_column(name: str) -> bool:
+    return name.startswith("time_period_") and not name.endswith(("_start", "_end"))
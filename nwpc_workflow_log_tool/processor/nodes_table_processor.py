@@ -0,0 +1,90 @@
+import typing
+
+import numpy as np
+import pandas as pd
+from loguru import logger
+
+from nwpc_workflow_log_model.analytics.situation_type import (
+    FamilySituationType,
+    TaskSituationType
+)
+
+from .processor import Processor, SituationRecord
+from .node_table_processor import NODE_TABLE_COLUMNS, NodeTableBuilder
+
+
+# 运行状态名称，包括 task 和 family 的所有运行状态
+SITUATION_CATEGORIES = list(dict.fromkeys(
+    [s.name for s in TaskSituationType] + [s.name for s in FamilySituationType]
+))
+
+
+class NodesTableProcessor(Processor):
+    """
+    将多个节点的运行状态转成一个长格式的 ``pandas.DataFrame`` 表格，每个节点每天一行。
+
+    行索引为 (``node_path``, ``date``) 的 ``MultiIndex``，其中 ``node_path`` 为分类类型。
+    列与 ``NodeTableProcessor`` 相同（``start_time`` 即索引中的 ``date``），
+    ``situation`` 为分类类型，时间点和时间段分别为 ``datetime64[ns]`` 和 ``timedelta64[ns]``，没有 object 类型的列。
+
+    所有节点的数据写入同一组预先分配的数组，不需要合并多个表格，
+    跨节点的统计可以直接使用 ``groupby(level="node_path")``。
+
+    Attributes
+    ----------
+    target_states: typing.Dict[str, TaskSituationType or FamilySituationType]
+        节点路径 => 有效记录对应的运行状态
+    columns:
+        表格列名称
+    """
+    def __init__(
+            self,
+            target_states: typing.Dict[str, TaskSituationType or FamilySituationType],
+    ):
+        super(NodesTableProcessor, self).__init__()
+        self.target_states = target_states
+        self.columns = [c for c in NODE_TABLE_COLUMNS if c != "start_time"]
+
+    def process(self, node_situations: typing.Dict[str, typing.Iterable[SituationRecord]]) -> pd.DataFrame:
+        """
+        Parameters
+        ----------
+        node_situations: typing.Dict[str, typing.Iterable[SituationRecord]]
+            节点路径 => 节点每天的运行状态
+
+        Returns
+        -------
+        pd.DataFrame
+        """
+        node_situations = {node_path: list(situations) for node_path, situations in node_situations.items()}
+        node_paths = list(node_situations)
+        sizes = [len(node_situations[node_path]) for node_path in node_paths]
+
+        builder = NodeTableBuilder(
+            columns=NODE_TABLE_COLUMNS,
+            size=sum(sizes),
+            situation_categories=SITUATION_CATEGORIES,
+        )
+        row = 0
+        skip_count = 0
+        for node_path in node_paths:
+            target_state = self.target_states[node_path]
+            for a_situation in node_situations[node_path]:
+                if not builder.set_situation(row, a_situation, target_state):
+                    skip_count += 1
+                row += 1
+        if skip_count > 0:
+            logger.warning("skip {} of {} days: DFA is not in complete", skip_count, row)
+
+        data = builder.get_columns()
+        index = pd.MultiIndex.from_arrays(
+            [
+                pd.Categorical.from_codes(
+                    np.repeat(np.arange(len(node_paths)), sizes),
+                    categories=node_paths,
+                ),
+                data.pop("start_time"),
+            ],
+            names=["node_path", "date"],
+        )
+        return pd.DataFrame(data, columns=self.columns, index=index)
@@ -1,2 +1,8 @@
 from .situation_record import SituationRecord
 from .situation_calculator import SituationCalculator
+from .situation_watcher import SituationWatcher, SituationChange
+from .batch_calculator import BatchSituationCalculator, group_subtree_records, infer_node_types
+from .vector_task_engine import VectorTaskSituationCalculator
+from .table_dfa import TableTaskStatusChangeDFA, TableFamilyStatusChangeDFA
+from .situation_store import SituationStore
+from .cycle_window import CycleWindow
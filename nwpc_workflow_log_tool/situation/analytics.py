@@ -1,4 +1,6 @@
 import datetime
+import typing
+import itertools
 
 from loguru import logger
 
@@ -6,24 +8,56 @@ from nwpc_workflow_model.node_status import NodeStatus
 from nwpc_workflow_log_model.analytics.situation_type import FamilySituationType, TaskSituationType
 from nwpc_workflow_log_model.analytics.task_status_change_dfa import TaskStatusChangeDFA
 from nwpc_workflow_log_model.analytics.family_status_change_dfa import FamilyStatusChangeDFA
-from nwpc_workflow_log_collector.ecflow.log_file_util import get_record_list
 
 from nwpc_workflow_log_tool.presenter import (
     TimePointPresenter,
     TimePeriodPresenter,
+    NodeSummaryPresenter,
+    RollingBaselinePresenter,
+)
+from nwpc_workflow_log_tool.situation import (
+    SituationCalculator,
+    SituationRecord,
+    SituationWatcher,
+    BatchSituationCalculator,
+    SituationStore,
+    CycleWindow,
+    group_subtree_records,
+    infer_node_types,
+)
+from nwpc_workflow_log_tool.situation.situation_store import DEFAULT_HORIZON_DAYS
+from nwpc_workflow_log_tool.situation.cycle_window import get_read_date_range
+from nwpc_workflow_log_tool.processor import NodeTableProcessor, NodesTableProcessor
+from nwpc_workflow_log_tool.exporter import TableExporter
+from nwpc_workflow_log_tool.log_file import (
+    iter_records,
+    iter_records_parallel,
+    select_log_files,
+    expand_log_files,
+    LogSet,
+    RecordCache,
+    DEFAULT_POLL_INTERVAL,
 )
-from nwpc_workflow_log_tool.situation import SituationCalculator
-from nwpc_workflow_log_tool.processor import NodeTableProcessor
 
 
 def analytics_time_point_with_status(
         node_type: str,
-        file_path: str,
+        file_path: str or typing.List[str],
         node_path: str,
         node_status: NodeStatus,
         start_date: datetime.datetime,
         stop_date: datetime.datetime,
         verbose: int = 1,
+        use_cache: bool = False,
+        jobs: int = 1,
+        streaming: bool = False,
+        executor: str = "serial",
+        situation_cache: bool = False,
+        cache_horizon: int = DEFAULT_HORIZON_DAYS,
+        cycle_window: CycleWindow = None,
+        output: str = None,
+        output_dir: str = ".",
+        use_sketch: bool = False,
 ):
     """
     从日志文件中获取一定时间范围([`start_date`, `stop_date`))内某节点进入某状态(`NodeStatus`)的时间点，
@@ -35,8 +69,10 @@ def analytics_time_point_with_status(
         节点类型。
         - `family`: 容器节点
         - `task`: 任务节点
-    file_path: str
-        日志文件路径。推荐预先使用`grep`等工具从日志文件中提取与节点路径相关的日志条目，节省解析文件时间。
+    file_path: str or typing.List[str]
+        日志文件路径。读取时会在字节层面过滤掉与节点路径无关的日志行，无需预先使用`grep`提取日志条目。
+        可以是多个文件路径或通配符，例如当前日志文件和轮转归档的日志文件，按时间顺序作为一个日志读取，
+        与日期范围没有交集的文件会被跳过。
     node_path: str
         节点路径
     node_status: NodeStatus
@@ -47,6 +83,28 @@ def analytics_time_point_with_status(
         结束日期，不包括在内 ,[`start_date`, `stop_date`)
     verbose: int
         输出级别，尚未实装
+    use_cache: bool
+        是否使用解析结果缓存（``RecordCache``）。首次使用时会解析整个日志文件。
+    jobs: int
+        解析日志文件的进程数，大于 1 时使用多进程解析
+    streaming: bool
+        是否使用流式处理，日志条目逐天读取和计算，内存占用只与一天的日志条目数量有关
+    executor: str
+        计算每天DFA的方式：``serial``、``thread`` 或 ``process``，线程池和进程池的大小为 ``jobs``。流式处理时不使用
+    situation_cache: bool
+        是否使用运行状态缓存（``SituationStore``），早于日志最后一天 ``cache_horizon`` 天的结果会被保存，之后直接读取
+    cache_horizon: int
+        日志最后一条日志之前多少天内的结果可能改变，总是重新计算
+    cycle_window: CycleWindow
+        每天使用的日志时间窗口，用于跨越午夜运行的节点，例如从当天 15:00 开始持续 30 小时。
+        默认使用当天和下一天的日志条目
+    output: str
+        导出表格的格式：``parquet``、``arrow``、``csv`` 或 ``jsonl``，按节点和月份分区写入 ``output_dir``，
+        见 ``TableExporter``。为 None 时不导出
+    output_dir: str
+        导出目录
+    use_sketch: bool
+        是否使用直方图（``HistogramSketch``）计算统计量，默认使用全部数据精确计算
 
     Returns
     -------
@@ -83,41 +141,20 @@ def analytics_time_point_with_status(
     logger.info(f"\tstart_date: {start_date}")
     logger.info(f"\tstop_date: {stop_date}")
 
-    if node_type == "family":
-        dfa_engine = FamilyStatusChangeDFA
-        stop_states = (
-            FamilySituationType.Complete,
-            FamilySituationType.Error,
-        )
-        dfa_kwargs = {
-            "ignore_aborted": True
-        }
-        target_state = FamilySituationType.Complete
-    elif node_type == "task":
-        dfa_engine = TaskStatusChangeDFA
-        stop_states = (
-            TaskSituationType.Complete,
-        )
-        dfa_kwargs = None
-        target_state = TaskSituationType.Complete
-    else:
-        raise NotImplemented(f"node type is not supported: {node_type}")
-
-    logger.info(f"Getting log lines...")
-    records = get_record_list(file_path, node_path, start_date, stop_date)
-    logger.info(f"Getting log lines...Done, {len(records)} lines")
-
-    calculator = SituationCalculator(
-        dfa_engine=dfa_engine,
-        stop_states=stop_states,
-        dfa_kwargs=dfa_kwargs,
-    )
+    calculator, target_state = create_situation_calculator(node_type, executor=executor, max_workers=jobs)
 
-    situations = calculator.get_situations(
-        records=records,
-        node_path=node_path,
-        start_date=start_date,
-        end_date=stop_date,
+    situations = calculate_situations(
+        calculator,
+        file_path,
+        node_path,
+        start_date,
+        stop_date,
+        use_cache=use_cache,
+        jobs=jobs,
+        streaming=streaming,
+        store=SituationStore(horizon_days=cache_horizon) if situation_cache else None,
+        node_type=node_type,
+        window=cycle_window,
     )
 
     processor = NodeTableProcessor(
@@ -125,27 +162,400 @@ def analytics_time_point_with_status(
         target_state=target_state,
     )
     table_data = processor.process(situations)
+    if output is not None:
+        TableExporter(output_dir, output).export_node_tables({node_path: table_data})
 
     presenter = TimePointPresenter(
         target_node_status=node_status,
         target_state=target_state,
+        use_sketch=use_sketch,
     )
     presenter.present(table_data)
 
 
 def analytics_time_period(
         node_type: str,
-        file_path: str,
+        file_path: str or typing.List[str],
         node_path: str,
         start_date: datetime.datetime,
         stop_date: datetime.datetime,
         verbose: int = 1,
+        use_cache: bool = False,
+        jobs: int = 1,
+        streaming: bool = False,
+        executor: str = "serial",
+        situation_cache: bool = False,
+        cache_horizon: int = DEFAULT_HORIZON_DAYS,
+        cycle_window: CycleWindow = None,
+        output: str = None,
+        output_dir: str = ".",
+        use_sketch: bool = False,
 ):
     logger.info(f"Analytic time peroid for {node_type} node")
     logger.info(f"\tnode_path: {node_path}")
     logger.info(f"\tstart_date: {start_date}")
     logger.info(f"\tstop_date: {stop_date}")
 
+    calculator, target_state = create_situation_calculator(node_type, executor=executor, max_workers=jobs)
+
+    situations = calculate_situations(
+        calculator,
+        file_path,
+        node_path,
+        start_date,
+        stop_date,
+        use_cache=use_cache,
+        jobs=jobs,
+        streaming=streaming,
+        store=SituationStore(horizon_days=cache_horizon) if situation_cache else None,
+        node_type=node_type,
+        window=cycle_window,
+    )
+
+    processor = NodeTableProcessor(
+        node_path=node_path,
+        target_state=target_state,
+    )
+    table_data = processor.process(situations)
+    if output is not None:
+        TableExporter(output_dir, output).export_node_tables({node_path: table_data})
+
+    presenter = TimePeriodPresenter(
+        target_state=target_state,
+        use_sketch=use_sketch,
+    )
+    presenter.present(table_data)
+
+
+def analytics_nodes_time_point_with_status(
+        nodes: typing.List[typing.Tuple[str, str]],
+        file_path: str or typing.List[str],
+        node_status: NodeStatus,
+        start_date: datetime.datetime,
+        stop_date: datetime.datetime,
+        verbose: int = 1,
+        use_cache: bool = False,
+        jobs: int = 1,
+        executor: str = "serial",
+        situation_cache: bool = False,
+        cache_horizon: int = DEFAULT_HORIZON_DAYS,
+        cycle_window: CycleWindow = None,
+        output: str = None,
+        output_dir: str = ".",
+        use_sketch: bool = False,
+):
+    """
+    与 ``analytics_time_point_with_status`` 相同，但同时计算多个节点，日志文件只读取一次。
+
+    Parameters
+    ----------
+    nodes: typing.List[typing.Tuple[str, str]]
+        (节点路径, 节点类型) 列表，节点类型为 `task` 或 `family`
+    """
+    logger.info(f"Analytic time points for {len(nodes)} nodes")
+    logger.info(f"\tnode_status: {node_status}")
+    logger.info(f"\tstart_date: {start_date}")
+    logger.info(f"\tstop_date: {stop_date}")
+
+    calculator, target_states = create_batch_situation_calculator(nodes, executor=executor, max_workers=jobs)
+    node_situations = calculate_node_situations(
+        calculator,
+        file_path,
+        start_date,
+        stop_date,
+        use_cache=use_cache,
+        jobs=jobs,
+        store=SituationStore(horizon_days=cache_horizon) if situation_cache else None,
+        node_types=dict(nodes),
+        window=cycle_window,
+    )
+
+    for node_path, situations in node_situations.items():
+        target_state = target_states[node_path]
+        processor = NodeTableProcessor(
+            node_path=node_path,
+            target_state=target_state,
+        )
+        table_data = processor.process(situations)
+        if output is not None:
+            TableExporter(output_dir, output).export_node_tables({node_path: table_data})
+
+        presenter = TimePointPresenter(
+            target_node_status=node_status,
+            target_state=target_state,
+            use_sketch=use_sketch,
+            node_path=node_path,
+        )
+        presenter.present(table_data)
+
+
+def analytics_nodes_time_period(
+        nodes: typing.List[typing.Tuple[str, str]],
+        file_path: str or typing.List[str],
+        start_date: datetime.datetime,
+        stop_date: datetime.datetime,
+        verbose: int = 1,
+        use_cache: bool = False,
+        jobs: int = 1,
+        executor: str = "serial",
+        situation_cache: bool = False,
+        cache_horizon: int = DEFAULT_HORIZON_DAYS,
+        cycle_window: CycleWindow = None,
+        output: str = None,
+        output_dir: str = ".",
+        use_sketch: bool = False,
+):
+    """
+    与 ``analytics_time_period`` 相同，但同时计算多个节点，日志文件只读取一次。
+
+    Parameters
+    ----------
+    nodes: typing.List[typing.Tuple[str, str]]
+        (节点路径, 节点类型) 列表，节点类型为 `task` 或 `family`
+    """
+    logger.info(f"Analytic time peroid for {len(nodes)} nodes")
+    logger.info(f"\tstart_date: {start_date}")
+    logger.info(f"\tstop_date: {stop_date}")
+
+    calculator, target_states = create_batch_situation_calculator(nodes, executor=executor, max_workers=jobs)
+    node_situations = calculate_node_situations(
+        calculator,
+        file_path,
+        start_date,
+        stop_date,
+        use_cache=use_cache,
+        jobs=jobs,
+        store=SituationStore(horizon_days=cache_horizon) if situation_cache else None,
+        node_types=dict(nodes),
+        window=cycle_window,
+    )
+
+    for node_path, situations in node_situations.items():
+        target_state = target_states[node_path]
+        processor = NodeTableProcessor(
+            node_path=node_path,
+            target_state=target_state,
+        )
+        table_data = processor.process(situations)
+        if output is not None:
+            TableExporter(output_dir, output).export_node_tables({node_path: table_data})
+
+        presenter = TimePeriodPresenter(
+            target_state=target_state,
+            use_sketch=use_sketch,
+            node_path=node_path,
+        )
+        presenter.present(table_data)
+
+
+def analytics_subtree(
+        file_path: str or typing.List[str],
+        node_paths: typing.List[str],
+        start_date: datetime.datetime,
+        stop_date: datetime.datetime,
+        verbose: int = 1,
+        use_cache: bool = False,
+        jobs: int = 1,
+        executor: str = "serial",
+        output: str = None,
+        output_dir: str = ".",
+        use_sketch: bool = False,
+):
+    """
+    计算 suite 或 family 下所有节点（包括其本身）的运行状态，输出每个节点的汇总表。
+
+    节点类型根据日志中出现的节点路径推断：有子节点的是 family，否则是 task。
+
+    Parameters
+    ----------
+    file_path: str or typing.List[str]
+        日志文件路径，见 ``analytics_time_point_with_status``
+    node_paths: typing.List[str]
+        suite 或 family 节点路径
+    start_date: datetime.datetime
+        起始时间，[`start_date`, `stop_date`)
+    stop_date: datetime.datetime
+        结束日期，不包括在内
+    verbose: int
+        输出级别，尚未实装
+    use_cache: bool
+        是否使用解析结果缓存
+    jobs: int
+        解析日志文件的进程数
+    executor: str
+        计算DFA的方式，见 ``analytics_time_point_with_status``
+    output: str
+        导出所有节点表格的格式，见 ``analytics_time_point_with_status``
+    output_dir: str
+        导出目录
+    use_sketch: bool
+        是否使用直方图计算统计量，见 ``analytics_time_point_with_status``
+    """
+    logger.info(f"Analytic subtree")
+    for node_path in node_paths:
+        logger.info(f"\tnode_path: {node_path}")
+    logger.info(f"\tstart_date: {start_date}")
+    logger.info(f"\tstop_date: {stop_date}")
+
+    node_types, node_situations = calculate_subtree_situations(
+        file_path,
+        node_paths,
+        start_date,
+        stop_date,
+        use_cache=use_cache,
+        jobs=jobs,
+        executor=executor,
+    )
+
+    processor = NodesTableProcessor(
+        target_states={
+            node_path: create_situation_calculator(node_type)[1]
+            for node_path, node_type in node_types.items()
+        },
+    )
+    table_data = processor.process(node_situations)
+    if output is not None:
+        TableExporter(output_dir, output).export(table_data)
+
+    presenter = NodeSummaryPresenter(use_sketch=use_sketch)
+    presenter.present(table_data, node_types)
+
+
+def analytics_rolling_baseline(
+        nodes: typing.List[typing.Tuple[str, str]],
+        file_path: str or typing.List[str],
+        start_date: datetime.datetime,
+        stop_date: datetime.datetime,
+        verbose: int = 1,
+        use_cache: bool = False,
+        jobs: int = 1,
+        executor: str = "serial",
+        situation_cache: bool = False,
+        cache_horizon: int = DEFAULT_HORIZON_DAYS,
+        cycle_window: CycleWindow = None,
+        metric: str = "end_clock",
+        window: int = 30,
+        min_periods: int = 7,
+        threshold: datetime.timedelta = datetime.timedelta(minutes=30),
+        show_all: bool = False,
+):
+    """
+    计算多个节点每天的滚动基线，输出比基线晚超过 ``threshold`` 的天，日志文件只读取一次。
+
+    前 ``window`` 天的基线只使用 ``start_date`` 之后的数据，需要完整基线时请提前 ``start_date``。
+
+    Parameters
+    ----------
+    nodes: typing.List[typing.Tuple[str, str]]
+        (节点路径, 节点类型) 列表，节点类型为 `task` 或 `family`
+    metric: str
+        指标名称：``start_clock``，``end_clock`` 或 ``duration``
+    window: int
+        基线的窗口天数，不包括当天
+    min_periods: int
+        窗口内正常结束的天数少于该值时不计算基线
+    threshold: datetime.timedelta
+        与基线的差超过该值的天被标记为异常
+    show_all: bool
+        是否输出每一天
+
+    其余参数见 ``analytics_nodes_time_period``
+    """
+    logger.info(f"Analytic rolling baseline for {len(nodes)} nodes")
+    logger.info(f"\tmetric: {metric}")
+    logger.info(f"\twindow: {window}")
+    logger.info(f"\tstart_date: {start_date}")
+    logger.info(f"\tstop_date: {stop_date}")
+
+    calculator, target_states = create_batch_situation_calculator(nodes, executor=executor, max_workers=jobs)
+    node_situations = calculate_node_situations(
+        calculator,
+        file_path,
+        start_date,
+        stop_date,
+        use_cache=use_cache,
+        jobs=jobs,
+        store=SituationStore(horizon_days=cache_horizon) if situation_cache else None,
+        node_types=dict(nodes),
+        window=cycle_window,
+    )
+
+    processor = NodesTableProcessor(target_states=target_states)
+    table_data = processor.process(node_situations)
+
+    presenter = RollingBaselinePresenter(
+        metric=metric,
+        window=window,
+        min_periods=min_periods,
+        threshold=threshold,
+        show_all=show_all,
+    )
+    presenter.present(table_data)
+
+
+def watch_situations(
+        node_type: str,
+        file_path: str,
+        node_paths: typing.List[str],
+        start_date: datetime.datetime = None,
+        poll_interval: float = DEFAULT_POLL_INTERVAL,
+):
+    """
+    跟踪正在写入的日志文件，输出节点运行状态的变化，直到被中断。
+
+    Parameters
+    ----------
+    node_type: str
+        节点类型，所有节点使用相同的类型。
+    file_path: str
+        日志文件路径，不支持压缩文件
+    node_paths: typing.List[str]
+        节点路径列表
+    start_date: datetime.datetime
+        从该日期的日志开始计算，默认为今天
+    poll_interval: float
+        没有新增日志时的等待时间，单位秒
+    """
+    logger.info(f"Watch situations for {node_type} node")
+    for node_path in node_paths:
+        logger.info(f"\tnode_path: {node_path}")
+    logger.info(f"\tstart_date: {start_date}")
+
+    watcher = SituationWatcher({
+        node_path: create_situation_calculator(node_type)[0] for node_path in node_paths
+    })
+    for change in watcher.watch(file_path, start_date=start_date, poll_interval=poll_interval):
+        record = change.record
+        logger.info(
+            f"[{change.date.strftime('%Y-%m-%d')}] {change.node_path}: "
+            f"{change.previous_state.name} -> {change.state.name} "
+            f"({record.date} {record.time} {record.status.value})"
+        )
+
+
+def create_situation_calculator(
+        node_type: str,
+        executor: str = "serial",
+        max_workers: int = None,
+) -> typing.Tuple[SituationCalculator, FamilySituationType or TaskSituationType]:
+    """
+    根据节点类型创建 ``SituationCalculator``，并返回需要统计的目标运行状态。
+
+    Parameters
+    ----------
+    node_type: str
+        节点类型。
+        - `family`: 容器节点
+        - `task`: 任务节点
+    executor: str
+        计算每天DFA的方式，见 ``SituationCalculator``
+    max_workers: int
+        线程池或进程池的大小
+
+    Returns
+    -------
+    typing.Tuple[SituationCalculator, FamilySituationType or TaskSituationType]
+    """
     if node_type == "family":
         dfa_engine = FamilyStatusChangeDFA
         stop_states = (
@@ -164,32 +574,248 @@ def analytics_time_period(
         dfa_kwargs = None
         target_state = TaskSituationType.Complete
     else:
-        raise NotImplemented(f"node type is not supported: {node_type}")
-
-    logger.info(f"Getting log lines...")
-    records = get_record_list(file_path, node_path, start_date, stop_date)
-    logger.info(f"Getting log lines...Done, {len(records)} lines")
+        raise NotImplementedError(f"node type is not supported: {node_type}")
 
     calculator = SituationCalculator(
         dfa_engine=dfa_engine,
         stop_states=stop_states,
         dfa_kwargs=dfa_kwargs,
+        executor=executor,
+        max_workers=max_workers,
     )
+    return calculator, target_state
 
-    situations = calculator.get_situations(
-        records=records,
-        node_path=node_path,
+
+def create_batch_situation_calculator(
+        nodes: typing.List[typing.Tuple[str, str]],
+        executor: str = "serial",
+        max_workers: int = None,
+) -> typing.Tuple[BatchSituationCalculator, typing.Dict[str, FamilySituationType or TaskSituationType]]:
+    """
+    根据 (节点路径, 节点类型) 列表创建 ``BatchSituationCalculator``，并返回每个节点需要统计的目标运行状态。
+    所有节点每天的DFA一起由 ``executor`` 计算。
+    """
+    calculators = dict()
+    target_states = dict()
+    for node_path, node_type in nodes:
+        calculators[node_path], target_states[node_path] = create_situation_calculator(node_type)
+    calculator = BatchSituationCalculator(
+        calculators,
+        executor=executor,
+        max_workers=max_workers,
+    )
+    return calculator, target_states
+
+
+def calculate_node_situations(
+        calculator: BatchSituationCalculator,
+        file_path: str or typing.List[str],
+        start_date: datetime.datetime,
+        stop_date: datetime.datetime,
+        use_cache: bool = False,
+        jobs: int = 1,
+        store: SituationStore = None,
+        node_types: typing.Dict[str, str] = None,
+        window: CycleWindow = None,
+) -> typing.Dict[str, typing.List[SituationRecord]]:
+    """
+    一次读取所有节点的日志条目，计算每个节点的运行状态。
+
+    日志文件按节点的公共祖先节点过滤，每个 suite 只读取一次，见 ``get_common_node_paths``。
+    设置 ``store`` 时，已保存的日期从 ``SituationStore`` 中读取，只读取其余日期的日志条目，此时需要提供 ``node_types``。
+    读取所有日期的时间窗口（未设置 ``window`` 时为当天和下一天）覆盖的日志条目，见 ``get_read_date_range``。
+    """
+    node_paths = list(calculator.calculators)
+
+    def get_records(current_start_date, current_stop_date):
+        return itertools.chain.from_iterable(
+            iter_log_records(
+                file_path,
+                common_node_path,
+                current_start_date,
+                current_stop_date,
+                use_cache=use_cache,
+                jobs=jobs,
+                include_children=True,
+            )
+            for common_node_path in get_common_node_paths(node_paths)
+        )
+
+    if store is not None:
+        log_set = LogSet(expand_log_files(file_path))
+        return store.get_node_situations(
+            calculator,
+            node_types,
+            start_date,
+            stop_date,
+            log_key=log_set.get_key(),
+            last_time=log_set.last_time,
+            get_records=get_records,
+            window=window,
+        )
+
+    read_start_date, read_stop_date = get_read_date_range(start_date, stop_date, window=window)
+    return calculator.get_situations(
+        records=get_records(read_start_date, read_stop_date),
         start_date=start_date,
         end_date=stop_date,
+        window=window,
     )
 
-    processor = NodeTableProcessor(
-        node_path=node_path,
-        target_state=target_state,
+
+def calculate_subtree_situations(
+        file_path: str or typing.List[str],
+        node_paths: typing.List[str],
+        start_date: datetime.datetime,
+        stop_date: datetime.datetime,
+        use_cache: bool = False,
+        jobs: int = 1,
+        executor: str = "serial",
+) -> typing.Tuple[typing.Dict[str, str], typing.Dict[str, typing.List[SituationRecord]]]:
+    """
+    一次读取 ``node_paths`` 下所有节点的日志条目，推断节点类型并计算每个节点的运行状态。
+
+    Returns
+    -------
+    typing.Tuple[typing.Dict[str, str], typing.Dict[str, typing.List[SituationRecord]]]
+        节点路径 => 节点类型，节点路径 => 运行状态列表，均按节点树的深度优先顺序排列
+    """
+    records = itertools.chain.from_iterable(
+        iter_log_records(
+            file_path,
+            common_node_path,
+            start_date,
+            stop_date,
+            use_cache=use_cache,
+            jobs=jobs,
+            include_children=True,
+        )
+        for common_node_path in get_common_node_paths(node_paths)
     )
-    table_data = processor.process(situations)
+    node_records = group_subtree_records(records, node_paths)
+    node_types = infer_node_types(node_records.keys())
+    logger.info("Found {} nodes", len(node_types))
 
-    presenter = TimePeriodPresenter(
-        target_state=target_state,
+    calculator, _ = create_batch_situation_calculator(
+        list(node_types.items()),
+        executor=executor,
+        max_workers=jobs,
     )
-    presenter.present(table_data)
+    node_situations = calculator.get_node_situations(
+        node_records,
+        start_date=start_date,
+        end_date=stop_date,
+    )
+    return node_types, node_situations
+
+
+def get_common_node_paths(node_paths: typing.Iterable[str]) -> typing.List[str]:
+    """
+    按 suite 分组，返回每组节点路径最近的公共祖先节点路径（可以是节点本身）。
+
+    Examples
+    --------
+    >>> get_common_node_paths(["/a/00/model/fcst", "/a/00/post/plot", "/b/12/fcst"])
+    ['/a/00', '/b/12/fcst']
+    """
+    groups = dict()
+    for node_path in node_paths:
+        names = node_path.strip("/").split("/")
+        common_names = groups.get(names[0])
+        if common_names is None:
+            groups[names[0]] = names
+            continue
+        i = 0
+        while i < min(len(common_names), len(names)) and common_names[i] == names[i]:
+            i += 1
+        groups[names[0]] = common_names[:i]
+    return ["/" + "/".join(names) for names in groups.values()]
+
+
+def calculate_situations(
+        calculator: SituationCalculator,
+        file_path: str or typing.List[str],
+        node_path: str,
+        start_date: datetime.datetime,
+        stop_date: datetime.datetime,
+        use_cache: bool = False,
+        jobs: int = 1,
+        streaming: bool = False,
+        store: SituationStore = None,
+        node_type: str = None,
+        window: CycleWindow = None,
+) -> typing.Iterable[SituationRecord]:
+    """
+    读取日志条目并计算节点每天的运行状态。
+
+    设置 ``store`` 时，已保存的日期从 ``SituationStore`` 中读取，只读取其余日期的日志条目，此时需要提供 ``node_type``，
+    并且不使用流式处理。
+    读取所有日期的时间窗口（未设置 ``window`` 时为当天和下一天）覆盖的日志条目，见 ``get_read_date_range``。
+    """
+    if store is not None:
+        log_set = LogSet(expand_log_files(file_path))
+        return store.get_situations(
+            calculator,
+            node_path,
+            node_type,
+            start_date,
+            stop_date,
+            log_key=log_set.get_key(),
+            last_time=log_set.last_time,
+            get_records=lambda current_start_date, current_stop_date: iter_log_records(
+                file_path, node_path, current_start_date, current_stop_date, use_cache, jobs),
+            window=window,
+        )
+
+    read_start_date, read_stop_date = get_read_date_range(start_date, stop_date, window=window)
+    if streaming:
+        records = iter_log_records(file_path, node_path, read_start_date, read_stop_date, use_cache, jobs)
+        return calculator.iter_situations(
+            records=records,
+            node_path=node_path,
+            start_date=start_date,
+            end_date=stop_date,
+            window=window,
+        )
+
+    logger.info(f"Getting log lines...")
+    records = list(iter_log_records(file_path, node_path, read_start_date, read_stop_date, use_cache, jobs))
+    logger.info(f"Getting log lines...Done, {len(records)} lines")
+
+    return calculator.get_situations(
+        records=records,
+        node_path=node_path,
+        start_date=start_date,
+        end_date=stop_date,
+        window=window,
+    )
+
+
+def iter_log_records(
+        file_path: str or typing.List[str],
+        node_path: str,
+        start_date: datetime.datetime,
+        stop_date: datetime.datetime,
+        use_cache: bool = False,
+        jobs: int = 1,
+        include_children: bool = False,
+) -> typing.Iterator:
+    """
+    按时间顺序读取一个或多个日志文件中节点的状态变化日志条目，跳过与日期范围没有交集的文件。
+    ``include_children`` 为 True 时同时读取子节点的日志条目。
+    """
+    for log_file in select_log_files(file_path, start_date, stop_date):
+        logger.info("Reading log file: {}", log_file)
+        if use_cache:
+            cache = RecordCache(log_file)
+            cache.update()
+            yield from cache.iter_records(
+                start_date, stop_date, node_path=node_path, include_children=include_children)
+        elif jobs > 1:
+            yield from iter_records_parallel(
+                log_file, node_path, start_date, stop_date,
+                include_children=include_children, jobs=jobs, status_only=True)
+        else:
+            yield from iter_records(
+                log_file, node_path, start_date, stop_date,
+                include_children=include_children, status_only=True)
@@ -0,0 +1,172 @@
+import typing
+import datetime
+from collections import defaultdict
+
+from loguru import logger
+
+from nwpc_workflow_log_model.log_record.ecflow import StatusLogRecord
+
+from nwpc_workflow_log_tool.log_record import StatusRecord, NodePathTrie
+from .situation_calculator import SituationCalculator, get_date_list
+from .executor import evaluate_situations, DEFAULT_CHUNK_SIZE
+from .cycle_window import CycleWindow
+from .situation_record import SituationRecord
+
+
+class BatchSituationCalculator(object):
+    """
+    Calculate situations for many nodes with one pass over the records.
+
+    Each record is routed to the record list of its node, then situations of each node
+    are calculated by the node's ``SituationCalculator``.
+
+    DFAs of all nodes and days are evaluated together by ``executor``, see ``evaluate_situations``.
+
+    Attributes
+    ----------
+    calculators: typing.Dict[str, SituationCalculator]
+        node path => calculator of the node, nodes of different types use different calculators.
+    executor: str
+        ``serial``, ``thread`` or ``process``
+    max_workers: int
+        max workers of the pool
+    chunk_size: int
+        number of (node, day) DFAs sent to a worker at once
+    """
+    def __init__(
+            self,
+            calculators: typing.Dict[str, SituationCalculator],
+            executor: str = "serial",
+            max_workers: int = None,
+            chunk_size: int = DEFAULT_CHUNK_SIZE,
+    ):
+        self.calculators = calculators
+        self.executor = executor
+        self.max_workers = max_workers
+        self.chunk_size = chunk_size
+
+    def get_situations(
+            self,
+            records: typing.Iterable,
+            start_date: datetime.datetime,
+            end_date: datetime.datetime,
+            earliest_time: datetime.time = None,
+            include_next_day: bool = True,
+            window: CycleWindow = None,
+    ) -> typing.Dict[str, typing.List[SituationRecord]]:
+        """
+        Get situations for all nodes in date range [start_date, end_date).
+
+        Parameters
+        ----------
+        records
+            records of all nodes, records of other nodes are ignored.
+        start_date
+        end_date
+        earliest_time: datetime.time
+            See ``SituationCalculator.get_situations``.
+        include_next_day: bool
+            See ``SituationCalculator.get_situations``.
+        window: CycleWindow
+            See ``SituationCalculator.get_situations``.
+
+        Returns
+        -------
+        typing.Dict[str, typing.List[SituationRecord]]
+            node path => situations of the node, in the same order as ``calculators``.
+        """
+        logger.info("Routing StatusLogRecord for {} nodes", len(self.calculators))
+        node_records = defaultdict(list)
+        for record in records:
+            if record.node_path in self.calculators and isinstance(record, (StatusLogRecord, StatusRecord)):
+                node_records[record.node_path].append(record)
+
+        return self.get_node_situations(
+            node_records,
+            start_date=start_date,
+            end_date=end_date,
+            earliest_time=earliest_time,
+            include_next_day=include_next_day,
+            window=window,
+        )
+
+    def get_node_situations(
+            self,
+            node_records: typing.Dict[str, typing.List],
+            start_date: datetime.datetime,
+            end_date: datetime.datetime,
+            earliest_time: datetime.time = None,
+            include_next_day: bool = True,
+            window: CycleWindow = None,
+    ) -> typing.Dict[str, typing.List[SituationRecord]]:
+        """
+        Same as ``get_situations``, but records are already grouped by node path.
+        """
+        tasks = []
+        for node_path, calculator in self.calculators.items():
+            tasks.extend(calculator.get_day_tasks(
+                records=node_records.get(node_path, []),
+                node_path=node_path,
+                start_date=start_date,
+                end_date=end_date,
+                earliest_time=earliest_time,
+                include_next_day=include_next_day,
+                window=window,
+            ))
+
+        logger.info("Calculating node status change using DFA for {} nodes...", len(self.calculators))
+        situations = evaluate_situations(
+            tasks,
+            executor=self.executor,
+            max_workers=self.max_workers,
+            chunk_size=self.chunk_size,
+        )
+        logger.info("Calculating node status change using DFA for {} nodes...Done", len(self.calculators))
+
+        day_count = len(get_date_list(start_date, end_date))
+        return {
+            node_path: situations[i * day_count:(i + 1) * day_count]
+            for i, node_path in enumerate(self.calculators)
+        }
+
+
+def group_subtree_records(
+        records: typing.Iterable,
+        node_paths: typing.Iterable[str],
+) -> typing.Dict[str, typing.List]:
+    """
+    Group status records of all nodes under ``node_paths`` (including themselves) by node path.
+
+    Each node path is matched against a ``NodePathTrie`` of ``node_paths`` only the first time it appears.
+    """
+    roots = NodePathTrie(node_paths)
+    matched = dict()
+    node_records = defaultdict(list)
+    for record in records:
+        if not isinstance(record, (StatusLogRecord, StatusRecord)):
+            continue
+        node_path = record.node_path
+        is_matched = matched.get(node_path)
+        if is_matched is None:
+            is_matched = roots.find_ancestor(node_path) is not None
+            matched[node_path] = is_matched
+        if is_matched:
+            node_records[node_path].append(record)
+    return node_records
+
+
+def infer_node_types(node_paths: typing.Iterable[str]) -> typing.Dict[str, str]:
+    """
+    Infer node types from observed node paths: a node with observed children is a ``family``,
+    otherwise it is a ``task``.
+
+    Returns
+    -------
+    typing.Dict[str, str]
+        node path => node type, in depth first order.
+    """
+    trie = NodePathTrie(node_paths)
+    return {
+        node_path: "family" if has_children else "task"
+        for node_path, has_children in trie.iter_paths()
+    }
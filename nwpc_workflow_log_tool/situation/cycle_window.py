@@ -0,0 +1,106 @@
+import typing
+import datetime
+
+import pandas as pd
+
+from .record_bucket import SECONDS_PER_DAY
+
+
+class CycleWindow(object):
+    """
+    Time window of records used to calculate the situation of one cycle (one date).
+
+    The window of date ``D`` is [D 00:00 + start, D 00:00 + start + duration).
+    Windows of adjacent dates overlap when ``duration`` is longer than one day.
+    For example, ``CycleWindow(start=timedelta(hours=15), duration=timedelta(hours=30))``
+    uses records from D 15:00 to D+1 21:00 for an 18 UTC cycle which runs over midnight.
+
+    The default window [D 00:00, D+2 00:00) is the same as ``include_next_day=True``.
+
+    Attributes
+    ----------
+    start: datetime.timedelta
+        start of the window from 00:00 of the date, can be negative.
+    duration: datetime.timedelta
+        length of the window.
+    """
+    def __init__(
+            self,
+            start: datetime.timedelta = datetime.timedelta(0),
+            duration: datetime.timedelta = datetime.timedelta(days=2),
+    ):
+        if duration <= datetime.timedelta(0):
+            raise ValueError(f"duration of cycle window must be positive: {duration}")
+        self.start = start
+        self.duration = duration
+        self._start_seconds = int(start.total_seconds())
+        self._stop_seconds = self._start_seconds + int(duration.total_seconds())
+
+    @classmethod
+    def from_options(
+            cls,
+            include_next_day: bool = True,
+            earliest_time: datetime.time = None,
+    ) -> "CycleWindow":
+        """
+        Create the window used by ``include_next_day`` and ``earliest_time`` options of ``SituationCalculator``.
+        """
+        start = datetime.timedelta(0)
+        if earliest_time is not None:
+            start = datetime.timedelta(
+                hours=earliest_time.hour,
+                minutes=earliest_time.minute,
+                seconds=earliest_time.second,
+            )
+        stop = datetime.timedelta(days=2 if include_next_day else 1)
+        return cls(start=start, duration=stop - start)
+
+    def get_range(self, current_date: datetime.date) -> typing.Tuple[int, int]:
+        """
+        Get [start, stop) of the window of ``current_date`` in seconds since ``datetime.date.min``,
+        the same as ``DayBuckets``.
+        """
+        day_start = current_date.toordinal() * SECONDS_PER_DAY
+        return day_start + self._start_seconds, day_start + self._stop_seconds
+
+    def get_date_range(
+            self,
+            start_date: datetime.datetime,
+            end_date: datetime.datetime,
+    ) -> typing.Tuple[datetime.datetime, datetime.datetime]:
+        """
+        Get date range [start, stop) of records needed by windows of all dates in [start_date, end_date).
+        """
+        start_date = pd.Timestamp(start_date)
+        end_date = pd.Timestamp(end_date)
+        read_start = (start_date + self.start).floor("D")
+        read_stop = (end_date - pd.Timedelta(days=1) + self.start + self.duration).ceil("D")
+        return read_start.to_pydatetime(), read_stop.to_pydatetime()
+
+    def to_dict(self) -> dict:
+        return {
+            "start": self._start_seconds,
+            "duration": self._stop_seconds - self._start_seconds,
+        }
+
+    def __repr__(self):
+        return f"CycleWindow(start={self.start}, duration={self.duration})"
+
+
+def get_read_date_range(
+        start_date: datetime.datetime,
+        end_date: datetime.datetime,
+        include_next_day: bool = True,
+        window: CycleWindow = None,
+) -> typing.Tuple[datetime.datetime, datetime.datetime]:
+    """
+    Get date range [start, stop) of records read to calculate situations of all dates in [start_date, end_date).
+
+    Without ``window``, the window of ``include_next_day`` is used (see ``CycleWindow.from_options``),
+    so the last date also reads records of the next day by default.
+    Situations calculated from this range do not depend on the queried date range,
+    which ``SituationStore`` relies on to store them.
+    """
+    if window is None:
+        window = CycleWindow.from_options(include_next_day=include_next_day)
+    return window.get_date_range(start_date, end_date)
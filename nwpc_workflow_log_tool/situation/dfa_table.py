@@ -0,0 +1,99 @@
+import typing
+import datetime
+
+from nwpc_workflow_model.node_status import NodeStatus
+from nwpc_workflow_log_model.analytics.situation_type import (
+    FamilySituationType,
+    TaskSituationType
+)
+from nwpc_workflow_log_model.analytics.node_situation import (
+    SituationPeriodType,
+    TimePeriod,
+    TimePoint,
+)
+
+
+# What to do with the time points when a status is consumed.
+ACTION_NONE = 0
+ACTION_APPEND = 1
+ACTION_RESET = 2
+
+
+def build_transition_table(
+        situation_type: typing.Type[TaskSituationType] or typing.Type[FamilySituationType],
+        ignore_aborted: bool = False,
+) -> typing.Dict[typing.Tuple, typing.Tuple]:
+    """
+    Encode transitions of ``TaskStatusChangeDFA`` and ``FamilyStatusChangeDFA`` as a table.
+
+    - ``aborted`` moves any state to Error and is recorded, unless ``ignore_aborted`` is set.
+    - ``queued`` reruns the node from a running state: back to Initial and time points are dropped.
+    - submitted -> active -> complete is the normal path, each step is recorded.
+    - Any other status in a running state moves to Unknown.
+    - Complete, Error and Unknown keep their state.
+
+    Returns
+    -------
+    typing.Dict[typing.Tuple, typing.Tuple]
+        (state, NodeStatus) => (next state, action)
+    """
+    normal_path = {
+        (situation_type.Initial, NodeStatus.submitted): situation_type.Submit,
+        (situation_type.Submit, NodeStatus.active): situation_type.Active,
+        (situation_type.Active, NodeStatus.complete): situation_type.Complete,
+    }
+    running_states = (situation_type.Initial, situation_type.Submit, situation_type.Active)
+    table = dict()
+    for state in situation_type:
+        for status in NodeStatus:
+            if status is NodeStatus.aborted:
+                if ignore_aborted:
+                    table[(state, status)] = (state, ACTION_NONE)
+                else:
+                    table[(state, status)] = (situation_type.Error, ACTION_APPEND)
+            elif state not in running_states:
+                table[(state, status)] = (state, ACTION_NONE)
+            elif status is NodeStatus.queued:
+                table[(state, status)] = (situation_type.Initial, ACTION_RESET)
+            elif (state, status) in normal_path:
+                table[(state, status)] = (normal_path[(state, status)], ACTION_APPEND)
+            else:
+                table[(state, status)] = (situation_type.Unknown, ACTION_NONE)
+    return table
+
+
+def get_time_periods(time_points: typing.List[TimePoint]) -> typing.List[TimePeriod]:
+    """
+    Get time periods of a complete run from the last submitted, active and complete time points.
+    """
+    last_times = {p.status: p.time for p in time_points}
+    submitted_time = last_times.get(NodeStatus.submitted)
+    active_time = last_times.get(NodeStatus.active)
+    complete_time = last_times.get(NodeStatus.complete)
+    return [
+        TimePeriod(
+            period_type=SituationPeriodType.InAll,
+            start_time=submitted_time,
+            end_time=complete_time,
+        ),
+        TimePeriod(
+            period_type=SituationPeriodType.InSubmitted,
+            start_time=submitted_time,
+            end_time=active_time,
+        ),
+        TimePeriod(
+            period_type=SituationPeriodType.InActive,
+            start_time=active_time,
+            end_time=complete_time,
+        ),
+    ]
+
+
+def get_record_time(node_data) -> datetime.datetime:
+    """
+    Get time of a ``StatusChangeEntry`` or a status record.
+    """
+    date_time = getattr(node_data, "date_time", None)
+    if date_time is None:
+        date_time = datetime.datetime.combine(node_data.date, node_data.time)
+    return date_time
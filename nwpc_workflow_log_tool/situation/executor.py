@@ -0,0 +1,97 @@
+import typing
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+import pandas as pd
+
+from nwpc_workflow_log_tool.log_record import StatusRecord
+from .situation_record import SituationRecord
+
+
+EXECUTORS = ("serial", "thread", "process")
+# Number of (node, day) DFAs evaluated by one task of thread or process pool
+DEFAULT_CHUNK_SIZE = 32
+
+
+def evaluate_situations(
+        tasks: typing.List[typing.Tuple[typing.Any, pd.Timestamp, typing.List]],
+        executor: str = "serial",
+        max_workers: int = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> typing.List[SituationRecord]:
+    """
+    Evaluate DFA of each (calculator, date, records) task, and return situations in the same order as ``tasks``.
+
+    Parameters
+    ----------
+    tasks
+        (``SituationCalculator``, date, records of the date)
+    executor: str
+        - ``serial``: evaluate in current thread.
+        - ``thread``: evaluate chunks of tasks in a thread pool.
+        - ``process``: evaluate chunks of tasks in a process pool. Only compact record tuples are sent to workers,
+          and ``SituationRecord.records`` is set back to the original records after evaluation.
+    max_workers: int
+        max workers of the pool, default is the number of CPUs.
+    chunk_size: int
+        number of tasks sent to a worker at once.
+
+    Returns
+    -------
+    typing.List[SituationRecord]
+    """
+    if executor not in EXECUTORS:
+        raise ValueError(f"executor is not supported: {executor}")
+
+    if executor == "serial" or len(tasks) <= 1:
+        return [calculator._calculate_situation(current_date, records) for calculator, current_date, records in tasks]
+
+    chunks = [tasks[i:i + chunk_size] for i in range(0, len(tasks), chunk_size)]
+    situations = []
+    if executor == "thread":
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            for chunk_situations in pool.map(_evaluate_chunk, chunks):
+                situations.extend(chunk_situations)
+        return situations
+
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        for chunk, chunk_situations in zip(chunks, pool.map(_evaluate_packed_chunk, [_pack_chunk(c) for c in chunks])):
+            for (_, _, records), situation in zip(chunk, chunk_situations):
+                situation.records = records
+                situations.append(situation)
+    return situations
+
+
+def _evaluate_chunk(chunk) -> typing.List[SituationRecord]:
+    return [calculator._calculate_situation(current_date, records) for calculator, current_date, records in chunk]
+
+
+def _pack_chunk(chunk) -> typing.List[typing.Tuple]:
+    """
+    Pack tasks into tuples of plain values. Records are packed as (date, time, node path, status).
+    """
+    return [
+        (
+            calculator._dfa_engine,
+            calculator._stop_states,
+            calculator._dfa_kwargs,
+            current_date,
+            [(r.date, r.time, r.node_path, r.status) for r in records],
+        )
+        for calculator, current_date, records in chunk
+    ]
+
+
+def _evaluate_packed_chunk(packed_chunk) -> typing.List[SituationRecord]:
+    from .situation_calculator import SituationCalculator
+
+    situations = []
+    for dfa_engine, stop_states, dfa_kwargs, current_date, packed_records in packed_chunk:
+        calculator = SituationCalculator(dfa_engine, stop_states, dfa_kwargs)
+        records = [
+            StatusRecord(date=date, time=time, node_path=node_path, status=status)
+            for date, time, node_path, status in packed_records
+        ]
+        situation = calculator._calculate_situation(current_date, records)
+        situation.records = None
+        situations.append(situation)
+    return situations
@@ -0,0 +1,81 @@
+import typing
+import datetime
+
+import numpy as np
+
+
+SECONDS_PER_DAY = 24 * 60 * 60
+
+
+class DayBuckets(object):
+    """
+    Group records by day once, so records of each day can be taken as a slice
+    instead of filtering the whole record list for every day.
+
+    Records are indexed by seconds since ``datetime.date.min``, sorted with a stable sort.
+    Records returned for a day keep their original order.
+
+    Attributes
+    ----------
+    records: typing.List
+        records with ``date`` and ``time``
+    """
+    def __init__(self, records: typing.List):
+        self.records = records
+        seconds = np.fromiter(
+            (get_record_seconds(r) for r in records),
+            dtype=np.int64,
+            count=len(records),
+        )
+        self._order = np.argsort(seconds, kind="stable")
+        self._seconds = seconds[self._order]
+
+    def get_records(
+            self,
+            current_date: datetime.date,
+            include_next_day: bool = True,
+            earliest_time: datetime.time = None,
+    ) -> typing.List:
+        """
+        Get records for ``current_date``.
+
+        Parameters
+        ----------
+        current_date: datetime.date
+        include_next_day: bool
+            If True, records of the next day are also returned, the same as ``generate_in_date_range``
+            which includes records on ``end_date``. Records on the boundary day then belong to two days.
+        earliest_time: datetime.time
+            If set, only records later than ``earliest_time`` of ``current_date`` are returned.
+
+        Returns
+        -------
+        typing.List
+        """
+        day_start = current_date.toordinal() * SECONDS_PER_DAY
+        if earliest_time is not None:
+            start = day_start + earliest_time.hour * 3600 + earliest_time.minute * 60 + earliest_time.second
+        else:
+            start = day_start
+        stop = day_start + (2 if include_next_day else 1) * SECONDS_PER_DAY
+
+        return self.get_range_records(start, stop)
+
+    def get_range_records(self, start: int, stop: int) -> typing.List:
+        """
+        Get records in [start, stop), in seconds since ``datetime.date.min``. See ``CycleWindow.get_range``.
+        """
+        lo, hi = np.searchsorted(self._seconds, [start, stop], side="left")
+        indexes = np.sort(self._order[lo:hi])
+        return [self.records[i] for i in indexes]
+
+
+def get_record_seconds(record) -> int:
+    """
+    Get seconds since ``datetime.date.min`` of a record with ``date`` and ``time``.
+    """
+    record_time = record.time
+    return (
+        record.date.toordinal() * SECONDS_PER_DAY
+        + record_time.hour * 3600 + record_time.minute * 60 + record_time.second
+    )
@@ -7,8 +7,12 @@ import pandas as pd
 from nwpc_workflow_log_model.log_record.ecflow import StatusLogRecord
 from nwpc_workflow_log_model.log_record.ecflow.status_record import StatusChangeEntry
 
-from nwpc_workflow_log_tool.util import generate_in_date_range, generate_later_than_time, print_records
+from nwpc_workflow_log_tool.log_record import StatusRecord
+from nwpc_workflow_log_tool.util import print_records
 from .situation_record import SituationRecord
+from .record_bucket import DayBuckets, get_record_seconds
+from .cycle_window import CycleWindow
+from .executor import evaluate_situations, DEFAULT_CHUNK_SIZE
 
 
 class SituationCalculator(object):
@@ -18,23 +22,35 @@ class SituationCalculator(object):
     Attributes
     ----------
     _dfa_engine:
-        用于计算节点运行状态的DFA类
+        用于计算节点运行状态的DFA类，例如 ``TaskStatusChangeDFA`` 或表驱动的 ``TableTaskStatusChangeDFA``
     _stop_states: typing.Tuple
         停止计算DFA的运行状态
     _dfa_kwargs: dict
         创建DFA时的附加参数
+    executor: str
+        计算每天DFA的方式，见 ``evaluate_situations``：``serial``、``thread`` 或 ``process``
+    max_workers: int
+        线程池或进程池的大小，默认为 CPU 核心数
+    chunk_size: int
+        每次发送给线程池或进程池的天数
     """
     def __init__(
             self,
             dfa_engine,
             stop_states: typing.Tuple,
             dfa_kwargs: dict = None,
+            executor: str = "serial",
+            max_workers: int = None,
+            chunk_size: int = DEFAULT_CHUNK_SIZE,
     ):
         self._dfa_engine = dfa_engine
         self._stop_states = stop_states
         self._dfa_kwargs = dfa_kwargs
         if self._dfa_kwargs is None:
             self._dfa_kwargs = dict()
+        self.executor = executor
+        self.max_workers = max_workers
+        self.chunk_size = chunk_size
 
     def get_situations(
             self,
@@ -43,10 +59,15 @@ class SituationCalculator(object):
             start_date: datetime.datetime,
             end_date: datetime.datetime,
             earliest_time: datetime.time = None,
+            include_next_day: bool = True,
+            window: CycleWindow = None,
     ) -> typing.List[SituationRecord]:
         """
         Get situations for some node in date range [start_date, end_date).
 
+        Records are grouped by day once with ``DayBuckets``, and each DFA gets its slice of records.
+        DFAs of all days are evaluated by ``executor``.
+
         Parameters
         ----------
         records
@@ -56,6 +77,14 @@ class SituationCalculator(object):
         earliest_time: datetime.time
             If ``earliest_time`` is set, only records after earliest_time for some date is used.
             This options is mainly for nodes which run over midnight.
+        include_next_day: bool
+            If True (default), each day uses records of the day and the next day,
+            so records of the next day are used by two days.
+            If False, each day only uses records of the day.
+        window: CycleWindow
+            If set, each day uses records in its cycle window, and ``earliest_time`` and ``include_next_day``
+            are ignored. Windows are cut from records sorted once by binary search.
+            This options is for nodes which run over midnight, such as a cycle starting at 15:00 and lasting 30 hours.
 
         Returns
         -------
@@ -63,41 +92,174 @@ class SituationCalculator(object):
 
         """
         logger.info("Finding StatusLogRecord for {}", node_path)
-        record_list = []
-        for record in records:
-            if record.node_path == node_path and isinstance(record, StatusLogRecord):
-                record_list.append(record)
+        tasks = self.get_day_tasks(
+            records,
+            node_path,
+            start_date,
+            end_date,
+            earliest_time=earliest_time,
+            include_next_day=include_next_day,
+            window=window,
+        )
 
         logger.info("Calculating node status change using DFA...")
-        situations = []
-        for current_date in pd.date_range(start=start_date, end=end_date, closed="left"):
-            filter_function = generate_in_date_range(current_date, current_date + pd.Timedelta(days=1))
-            current_records = list(filter(lambda x: filter_function(x), record_list))
-            if earliest_time is not None:
-                filter_function = generate_later_than_time(current_date, earliest_time)
-                current_records = list(filter(lambda x: filter_function(x), current_records))
+        situations = evaluate_situations(
+            tasks,
+            executor=self.executor,
+            max_workers=self.max_workers,
+            chunk_size=self.chunk_size,
+        )
+        logger.info("Calculating node status change using DFA...Done")
+        return situations
+
+    def get_day_tasks(
+            self,
+            records: typing.List,
+            node_path: str,
+            start_date: datetime.datetime,
+            end_date: datetime.datetime,
+            earliest_time: datetime.time = None,
+            include_next_day: bool = True,
+            window: CycleWindow = None,
+    ) -> typing.List[typing.Tuple["SituationCalculator", pd.Timestamp, typing.List]]:
+        """
+        Split records into (calculator, date, records of the date) tasks for ``evaluate_situations``.
+        Parameters are the same as ``get_situations``.
+        """
+        if window is None:
+            window = CycleWindow.from_options(include_next_day=include_next_day, earliest_time=earliest_time)
+        record_list = list(filter_status_records(records, node_path))
+        buckets = DayBuckets(record_list)
+        return [
+            (
+                self,
+                current_date,
+                buckets.get_range_records(*window.get_range(current_date.date())),
+            )
+            for current_date in get_date_list(start_date, end_date)
+        ]
 
+    def iter_situations(
+            self,
+            records: typing.Iterable,
+            node_path: str,
+            start_date: datetime.datetime,
+            end_date: datetime.datetime,
+            earliest_time: datetime.time = None,
+            keep_records: bool = False,
+            include_next_day: bool = True,
+            window: CycleWindow = None,
+    ) -> typing.Iterator[SituationRecord]:
+        """
+        Streaming version of ``get_situations``. Records are consumed from an iterator
+        and situations are yielded day by day, so only records of the current day and the next day
+        are held in memory.
+
+        Records must be in time order, as they appear in an ecFlow log file.
+        Each day uses records of its cycle window, the same as ``get_situations``.
+        Records before the window of the current day are dropped.
+
+        Parameters
+        ----------
+        records
+        node_path
+        start_date
+        end_date
+        earliest_time: datetime.time
+            See ``get_situations``.
+        keep_records: bool
+            If ``keep_records`` is False, ``SituationRecord.records`` is set to None to release records.
+        include_next_day: bool
+            See ``get_situations``.
+        window: CycleWindow
+            See ``get_situations``.
+
+        Returns
+        -------
+        typing.Iterator[SituationRecord]
+        """
+        if window is None:
+            window = CycleWindow.from_options(include_next_day=include_next_day, earliest_time=earliest_time)
+        one_day = pd.Timedelta(days=1)
+        current_date = pd.Timestamp(start_date)
+        end_date = pd.Timestamp(end_date)
+        window_start, window_stop = window.get_range(current_date.date())
+        pending = []
+
+        def next_situation():
+            current_records = [r for s, r in pending if window_start <= s < window_stop]
+            situation = self._calculate_situation(current_date, current_records)
+            if not keep_records:
+                situation.records = None
+            next_start, _ = window.get_range((current_date + one_day).date())
+            pending[:] = [(s, r) for s, r in pending if s >= next_start]
+            return situation
+
+        for record in filter_status_records(records, node_path):
+            if current_date >= end_date:
+                break
+            seconds = get_record_seconds(record)
+            while current_date < end_date and seconds >= window_stop:
+                yield next_situation()
+                current_date += one_day
+                window_start, window_stop = window.get_range(current_date.date())
+            if seconds >= window_start:
+                pending.append((seconds, record))
+
+        while current_date < end_date:
+            yield next_situation()
+            current_date += one_day
+            window_start, window_stop = window.get_range(current_date.date())
+
+    def create_dfa(self, current_date: pd.Timestamp):
+        """
+        Create a DFA instance for some date.
+        """
+        return self._dfa_engine(
+            name=current_date,
+            **self._dfa_kwargs,
+        )
+
+    def is_stopped(self, dfa) -> bool:
+        return dfa.state in self._stop_states
+
+    def _calculate_situation(
+            self,
+            current_date: pd.Timestamp,
+            current_records: typing.List,
+    ) -> SituationRecord:
+        if getattr(self._dfa_engine, "accepts_records", False):
+            status_changes = current_records
+        else:
             status_changes = [StatusChangeEntry(r) for r in current_records]
 
-            dfa = self._dfa_engine(
-                name=current_date,
-                **self._dfa_kwargs,
+        dfa = self.create_dfa(current_date)
+
+        for s in status_changes:
+            dfa.trigger(
+                s.status.value,
+                node_data=s,
             )
+            if self.is_stopped(dfa):
+                break
 
-            for s in status_changes:
-                dfa.trigger(
-                    s.status.value,
-                    node_data=s,
-                )
-                if dfa.state in self._stop_states:
-                    break
-
-            situations.append(SituationRecord(
-                date=current_date,
-                state=dfa.state,
-                node_situation=dfa.node_situation,
-                records=current_records,
-            ))
+        return SituationRecord(
+            date=current_date,
+            state=dfa.state,
+            node_situation=dfa.node_situation,
+            records=current_records,
+        )
 
-        logger.info("Calculating node status change using DFA...Done")
-        return situations
+
+def filter_status_records(records: typing.Iterable, node_path: str) -> typing.Iterator:
+    for record in records:
+        if record.node_path == node_path and isinstance(record, (StatusLogRecord, StatusRecord)):
+            yield record
+
+
+def get_date_list(start_date: datetime.datetime, end_date: datetime.datetime) -> pd.DatetimeIndex:
+    """
+    Get days in date range [start_date, end_date).
+    """
+    dates = pd.date_range(start=start_date, end=end_date, freq="D")
+    return dates[dates < pd.Timestamp(end_date)]
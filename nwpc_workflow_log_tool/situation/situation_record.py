@@ -7,16 +7,55 @@ from nwpc_workflow_log_model.analytics.situation_type import (
 )
 from nwpc_workflow_log_model.analytics.node_situation import NodeSituation
 
+from nwpc_workflow_log_tool.log_record import StatusRecord
+from nwpc_workflow_log_tool.log_file import RecordLocations
+
 
 class SituationRecord(object):
+    """
+    Situation of a node in one day.
+
+    Records of the day are not kept in memory if all of them have locations in log files
+    (``StatusRecord.log_file`` and ``StatusRecord.line_offset``).
+    Only ``RecordLocations`` is stored, and ``records`` are read again from log files when accessed.
+    Other records, such as ``LogRecord`` from ``EcflowLogParser``, are kept as they are.
+
+    Attributes
+    ----------
+    date
+    state: TaskSituationType or FamilySituationType
+    node_situation: NodeSituation
+    records: typing.List[LogRecord or StatusRecord] or None
+        records used to calculate the situation, None if they are released.
+    record_locations: RecordLocations or None
+        locations of records in log files.
+    """
     def __init__(
             self,
             date,
             state: TaskSituationType or FamilySituationType,
             node_situation: NodeSituation,
-            records: typing.List[LogRecord],
+            records: typing.List[LogRecord or StatusRecord] or None,
     ):
         self.date = date
         self.state = state
         self.node_situation = node_situation
+        self.record_locations = None
+        self._records = None
         self.records = records
+
+    @property
+    def records(self) -> typing.List[LogRecord or StatusRecord] or None:
+        if self.record_locations is not None:
+            return self.record_locations.read()
+        return self._records
+
+    @records.setter
+    def records(self, records: typing.List[LogRecord or StatusRecord] or None):
+        self.record_locations = None
+        self._records = None
+        if records is None:
+            return
+        self.record_locations = RecordLocations.from_records(records)
+        if self.record_locations is None:
+            self._records = records
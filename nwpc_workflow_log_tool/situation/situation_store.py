@@ -0,0 +1,381 @@
+import os
+import json
+import contextlib
+import typing
+import sqlite3
+import datetime
+
+import pandas as pd
+from loguru import logger
+
+from nwpc_workflow_model.node_status import NodeStatus
+from nwpc_workflow_log_model.analytics.situation_type import (
+    FamilySituationType,
+    TaskSituationType
+)
+from nwpc_workflow_log_model.analytics.node_situation import (
+    NodeSituation,
+    SituationPeriodType,
+    TimePeriod,
+    TimePoint,
+)
+
+from nwpc_workflow_log_tool.util import get_cache_dir
+from .situation_calculator import SituationCalculator, get_date_list
+from .batch_calculator import BatchSituationCalculator
+from .cycle_window import CycleWindow, get_read_date_range
+from .situation_record import SituationRecord
+
+
+STORE_FILE_NAME = "situations.db"
+# Days within this number of days before the last record of the log are recomputed.
+DEFAULT_HORIZON_DAYS = 2
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS situation (
+    log_key TEXT NOT NULL,
+    node_path TEXT NOT NULL,
+    node_type TEXT NOT NULL,
+    options TEXT NOT NULL,
+    date TEXT NOT NULL,
+    state TEXT NOT NULL,
+    time_points TEXT NOT NULL,
+    time_periods TEXT NOT NULL,
+    PRIMARY KEY (log_key, node_path, node_type, options, date)
+)
+"""
+
+
+class SituationStore(object):
+    """
+    Persistent store of situations in SQLite, keyed by (log key, node path, node type, calculator options, date).
+
+    Only the final state, time points and time periods of each day are stored, records are not stored.
+    Mutable days are always recomputed and never stored, see ``is_immutable``.
+
+    Attributes
+    ----------
+    db_path: str
+        SQLite database file, default is ``situations.db`` in cache directory.
+    horizon_days: int
+        days before the last record of the log which are always treated as mutable.
+    """
+    def __init__(
+            self,
+            db_path: str = None,
+            horizon_days: int = DEFAULT_HORIZON_DAYS,
+    ):
+        if db_path is None:
+            db_path = os.path.join(get_cache_dir("situations"), STORE_FILE_NAME)
+        self.db_path = db_path
+        self.horizon_days = horizon_days
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        with self._connect() as connection:
+            connection.execute(SCHEMA)
+
+    def is_immutable(
+            self,
+            current_date: pd.Timestamp,
+            last_time: datetime.datetime or None,
+            include_next_day: bool = True,
+            window: CycleWindow = None,
+    ) -> bool:
+        """
+        Check whether the situation of ``current_date`` can be stored.
+
+        A day is immutable only when it is earlier than ``horizon_days`` before the last record of the log,
+        and all records it reads (see ``get_read_end``) are before the last record,
+        so a short horizon or a long ``window`` never stores situations computed from incomplete records.
+        If the last time of log is unknown, every day is mutable.
+        """
+        if last_time is None:
+            return False
+        if current_date.date() >= last_time.date() - datetime.timedelta(days=self.horizon_days):
+            return False
+        return get_read_end(current_date, include_next_day, window) <= pd.Timestamp(last_time)
+
+    def load(
+            self,
+            log_key: str,
+            node_path: str,
+            node_type: str,
+            options: str,
+            start_date: datetime.datetime,
+            end_date: datetime.datetime,
+    ) -> typing.Dict[pd.Timestamp, SituationRecord]:
+        """
+        Load stored situations in date range [start_date, end_date).
+        """
+        situation_type = FamilySituationType if node_type == "family" else TaskSituationType
+        with self._connect() as connection:
+            rows = connection.execute(
+                "SELECT date, state, time_points, time_periods FROM situation "
+                "WHERE log_key = ? AND node_path = ? AND node_type = ? AND options = ? AND date >= ? AND date < ?",
+                (
+                    log_key, node_path, node_type, options,
+                    pd.Timestamp(start_date).date().isoformat(), pd.Timestamp(end_date).date().isoformat(),
+                ),
+            ).fetchall()
+
+        situations = dict()
+        for date, state, time_points, time_periods in rows:
+            current_date = pd.Timestamp(date)
+            situations[current_date] = _to_situation_record(
+                current_date,
+                situation_type[state],
+                json.loads(time_points),
+                json.loads(time_periods),
+            )
+        return situations
+
+    def save(
+            self,
+            log_key: str,
+            node_path: str,
+            node_type: str,
+            options: str,
+            situations: typing.Iterable[SituationRecord],
+    ):
+        rows = [
+            (
+                log_key, node_path, node_type, options,
+                situation.date.date().isoformat(),
+                situation.state.name,
+                json.dumps([
+                    [p.status.value, _to_iso(p.time)]
+                    for p in situation.node_situation.time_points
+                ]),
+                json.dumps([
+                    [p.period_type.value, _to_iso(p.start_time), _to_iso(p.end_time)]
+                    for p in situation.node_situation.time_periods
+                ]),
+            )
+            for situation in situations
+        ]
+        with self._connect() as connection:
+            connection.executemany(
+                "INSERT OR REPLACE INTO situation VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+
+    def clear(self):
+        with self._connect() as connection:
+            connection.execute("DELETE FROM situation")
+
+    def get_situations(
+            self,
+            calculator: SituationCalculator,
+            node_path: str,
+            node_type: str,
+            start_date: datetime.datetime,
+            end_date: datetime.datetime,
+            log_key: str,
+            last_time: datetime.datetime or None,
+            get_records: typing.Callable[[datetime.datetime, datetime.datetime], typing.Iterable],
+            include_next_day: bool = True,
+            window: CycleWindow = None,
+    ) -> typing.List[SituationRecord]:
+        """
+        Same as ``SituationCalculator.get_situations``, but stored days are loaded from the store,
+        and only records for other days are read by ``get_records(start_date, stop_date)``.
+        Immutable days that are computed are saved into the store.
+
+        Parameters
+        ----------
+        calculator: SituationCalculator
+        node_path: str
+        node_type: str
+            ``task`` or ``family``
+        start_date: datetime.datetime
+        end_date: datetime.datetime
+        log_key: str
+            identity of the log, see ``LogSet.get_key``.
+        last_time: datetime.datetime or None
+            time of the last record of the log, see ``LogSet.last_time``.
+        get_records:
+            function to read records in date range [start_date, stop_date)
+        include_next_day: bool
+            See ``SituationCalculator.get_situations``.
+        window: CycleWindow
+            See ``SituationCalculator.get_situations``.
+
+        Returns
+        -------
+        typing.List[SituationRecord]
+        """
+        return self.get_node_situations(
+            BatchSituationCalculator(
+                {node_path: calculator},
+                executor=calculator.executor,
+                max_workers=calculator.max_workers,
+                chunk_size=calculator.chunk_size,
+            ),
+            {node_path: node_type},
+            start_date,
+            end_date,
+            log_key=log_key,
+            last_time=last_time,
+            get_records=get_records,
+            include_next_day=include_next_day,
+            window=window,
+        )[node_path]
+
+    def get_node_situations(
+            self,
+            calculator: BatchSituationCalculator,
+            node_types: typing.Dict[str, str],
+            start_date: datetime.datetime,
+            end_date: datetime.datetime,
+            log_key: str,
+            last_time: datetime.datetime or None,
+            get_records: typing.Callable[[datetime.datetime, datetime.datetime], typing.Iterable],
+            include_next_day: bool = True,
+            window: CycleWindow = None,
+    ) -> typing.Dict[str, typing.List[SituationRecord]]:
+        """
+        Batch version of ``get_situations``. Records of all nodes are read at most once,
+        for the date range covering missing days of all nodes.
+
+        Parameters
+        ----------
+        calculator: BatchSituationCalculator
+        node_types: typing.Dict[str, str]
+            node path => node type
+        """
+        dates = get_date_list(start_date, end_date)
+
+        node_options = dict()
+        node_situations = dict()
+        missing_dates = set()
+        for node_path, node_calculator in calculator.calculators.items():
+            node_options[node_path] = get_calculator_options(node_calculator, include_next_day, window)
+            situations = self.load(
+                log_key, node_path, node_types[node_path], node_options[node_path], start_date, end_date)
+            node_situations[node_path] = situations
+            missing_dates.update(d for d in dates if d not in situations)
+        logger.info(
+            "Loaded situations from situation store, {} days to compute",
+            len(missing_dates),
+        )
+
+        if len(missing_dates) > 0:
+            compute_start = min(missing_dates)
+            compute_end = max(missing_dates) + pd.Timedelta(days=1)
+            read_start, read_end = get_read_date_range(
+                compute_start, compute_end, include_next_day=include_next_day, window=window)
+            missing_calculator = BatchSituationCalculator(
+                {
+                    node_path: node_calculator
+                    for node_path, node_calculator in calculator.calculators.items()
+                    if len(node_situations[node_path]) < len(dates)
+                },
+                executor=calculator.executor,
+                max_workers=calculator.max_workers,
+                chunk_size=calculator.chunk_size,
+            )
+            computed = missing_calculator.get_situations(
+                records=get_records(read_start, read_end),
+                start_date=compute_start,
+                end_date=compute_end,
+                include_next_day=include_next_day,
+                window=window,
+            )
+            for node_path, situations in computed.items():
+                new_situations = [s for s in situations if s.date not in node_situations[node_path]]
+                for situation in new_situations:
+                    node_situations[node_path][situation.date] = situation
+                self.save(
+                    log_key, node_path, node_types[node_path], node_options[node_path],
+                    [s for s in new_situations if self.is_immutable(s.date, last_time, include_next_day, window)],
+                )
+
+        return {
+            node_path: [situations[d] for d in dates]
+            for node_path, situations in node_situations.items()
+        }
+
+    @contextlib.contextmanager
+    def _connect(self) -> typing.Iterator[sqlite3.Connection]:
+        connection = sqlite3.connect(self.db_path)
+        try:
+            with connection:
+                yield connection
+        finally:
+            connection.close()
+
+
+def get_calculator_options(
+        calculator: SituationCalculator,
+        include_next_day: bool = True,
+        window: CycleWindow = None,
+) -> str:
+    """
+    Get a string of calculator options which change the situations.
+    """
+    dfa_engine = calculator._dfa_engine
+    options = {
+        "dfa_engine": f"{dfa_engine.__module__}.{dfa_engine.__qualname__}",
+        "dfa_kwargs": calculator._dfa_kwargs,
+        "stop_states": [s.name for s in calculator._stop_states],
+        "include_next_day": include_next_day,
+    }
+    if window is not None:
+        options["window"] = window.to_dict()
+    return json.dumps(options, sort_keys=True)
+
+
+def get_read_end(
+        current_date: pd.Timestamp,
+        include_next_day: bool = True,
+        window: CycleWindow = None,
+) -> pd.Timestamp:
+    """
+    Get the end of the records read to calculate the situation of ``current_date``, see ``get_read_date_range``.
+    """
+    current_date = pd.Timestamp(current_date).normalize()
+    return pd.Timestamp(get_read_date_range(
+        current_date, current_date + pd.Timedelta(days=1), include_next_day=include_next_day, window=window)[1])
+
+
+def _to_iso(value: datetime.datetime or None) -> str or None:
+    if value is None:
+        return None
+    return value.isoformat()
+
+
+def _from_iso(value: str or None) -> datetime.datetime or None:
+    if value is None:
+        return None
+    # values are written by datetime.isoformat(), which omits microseconds when they are zero.
+    # datetime.fromisoformat is not used because it requires Python 3.7.
+    if "." in value:
+        return datetime.datetime.strptime(value, "%Y-%m-%dT%H:%M:%S.%f")
+    return datetime.datetime.strptime(value, "%Y-%m-%dT%H:%M:%S")
+
+
+def _to_situation_record(
+        current_date: pd.Timestamp,
+        state: TaskSituationType or FamilySituationType,
+        time_points: typing.List,
+        time_periods: typing.List,
+) -> SituationRecord:
+    node_situation = NodeSituation()
+    node_situation.situation = state
+    node_situation.time_points = [
+        TimePoint(status=NodeStatus(status), time=_from_iso(time))
+        for status, time in time_points
+    ]
+    node_situation.time_periods = [
+        TimePeriod(
+            period_type=SituationPeriodType(period_type),
+            start_time=_from_iso(start_time),
+            end_time=_from_iso(end_time),
+        )
+        for period_type, start_time, end_time in time_periods
+    ]
+    return SituationRecord(
+        date=current_date,
+        state=state,
+        node_situation=node_situation,
+        records=None,
+    )
@@ -0,0 +1,166 @@
+import typing
+import datetime
+
+import pandas as pd
+from loguru import logger
+
+from nwpc_workflow_log_model.log_record.ecflow.status_record import StatusChangeEntry
+from nwpc_workflow_log_model.analytics.situation_type import (
+    FamilySituationType,
+    TaskSituationType
+)
+from nwpc_workflow_log_model.analytics.node_situation import NodeSituation
+
+from nwpc_workflow_log_tool.log_file.date_seek import find_date_range_offsets
+from nwpc_workflow_log_tool.log_file.log_follower import LogFollower, DEFAULT_POLL_INTERVAL
+from nwpc_workflow_log_tool.log_record import StatusLineParser, StatusRecord
+from .situation_calculator import SituationCalculator
+from .situation_record import SituationRecord
+
+
+class SituationChange(object):
+    """
+    节点某天运行状态的一次变化
+
+    Attributes
+    ----------
+    node_path: str
+        节点路径
+    date: pd.Timestamp
+        日期
+    previous_state: TaskSituationType or FamilySituationType
+        变化前的运行状态
+    state: TaskSituationType or FamilySituationType
+        变化后的运行状态
+    node_situation: NodeSituation
+        变化后的节点运行状态，包括时间点和时间段
+    record: StatusRecord
+        引起变化的日志条目
+    """
+    def __init__(
+            self,
+            node_path: str,
+            date: pd.Timestamp,
+            previous_state: TaskSituationType or FamilySituationType,
+            state: TaskSituationType or FamilySituationType,
+            node_situation: NodeSituation,
+            record: StatusRecord,
+    ):
+        self.node_path = node_path
+        self.date = date
+        self.previous_state = previous_state
+        self.state = state
+        self.node_situation = node_situation
+        self.record = record
+
+
+class SituationWatcher(object):
+    """
+    跟踪不断增长的日志文件，实时更新节点每天的运行状态。
+
+    每个节点每天保留一个 DFA 实例，新增的节点状态变化日志条目直接输入到对应的 DFA 中，无需重新读取整个日志文件。
+    与 ``SituationCalculator.get_situations`` 相同，某天的 DFA 同时接收当天和第二天的日志条目，
+    进入停止状态后不再接收日志条目。
+
+    Attributes
+    ----------
+    calculators: typing.Dict[str, SituationCalculator]
+        节点路径到 ``SituationCalculator`` 的映射，使用其中的 DFA 类和停止状态
+    """
+    def __init__(
+            self,
+            calculators: typing.Dict[str, SituationCalculator],
+    ):
+        self.calculators = calculators
+        self._dfas = {node_path: dict() for node_path in calculators}
+
+    def feed(self, records: typing.Iterable) -> typing.List[SituationChange]:
+        """
+        输入按时间排序的日志条目，返回引起的运行状态变化。
+        """
+        changes = []
+        one_day = datetime.timedelta(days=1)
+        for record in records:
+            node_dfas = self._dfas.get(record.node_path)
+            if node_dfas is None:
+                continue
+            calculator = self.calculators[record.node_path]
+
+            record_date = record.date
+            if record_date not in node_dfas:
+                node_dfas[record_date] = calculator.create_dfa(pd.Timestamp(record_date))
+                for old_date in [d for d in node_dfas if d < record_date - one_day]:
+                    del node_dfas[old_date]
+
+            entry = StatusChangeEntry(record)
+            for current_date in (record_date - one_day, record_date):
+                dfa = node_dfas.get(current_date)
+                if dfa is None or calculator.is_stopped(dfa):
+                    continue
+                previous_state = dfa.state
+                dfa.trigger(
+                    entry.status.value,
+                    node_data=entry,
+                )
+                if dfa.state is not previous_state:
+                    changes.append(SituationChange(
+                        node_path=record.node_path,
+                        date=pd.Timestamp(current_date),
+                        previous_state=previous_state,
+                        state=dfa.state,
+                        node_situation=dfa.node_situation,
+                        record=record,
+                    ))
+        return changes
+
+    def get_situations(self, node_path: str) -> typing.List[SituationRecord]:
+        """
+        返回节点最近几天的运行状态。
+        """
+        return [
+            SituationRecord(
+                date=pd.Timestamp(current_date),
+                state=dfa.state,
+                node_situation=dfa.node_situation,
+                records=None,
+            )
+            for current_date, dfa in sorted(self._dfas[node_path].items(), key=lambda x: x[0])
+        ]
+
+    def watch(
+            self,
+            file_path: str,
+            start_date: datetime.datetime = None,
+            poll_interval: float = DEFAULT_POLL_INTERVAL,
+    ) -> typing.Iterator[SituationChange]:
+        """
+        跟踪日志文件，持续返回节点运行状态的变化。
+
+        Parameters
+        ----------
+        file_path: str
+            日志文件路径
+        start_date: datetime.datetime
+            从该日期的日志开始计算，默认为今天
+        poll_interval: float
+            没有新增日志时的等待时间，单位秒
+
+        Returns
+        -------
+        typing.Iterator[SituationChange]
+        """
+        if start_date is None:
+            start_date = datetime.datetime.combine(datetime.date.today(), datetime.time())
+        start_day = start_date.date() if isinstance(start_date, datetime.datetime) else start_date
+        start_offset, _ = find_date_range_offsets(file_path, start_date=start_date)
+        logger.info("watching {} from offset {}...", file_path, start_offset)
+
+        follower = LogFollower(file_path, start_offset=start_offset)
+        parser = StatusLineParser(log_file=file_path)
+        for lines in follower.follow(poll_interval=poll_interval):
+            records = []
+            for line_offset, line in lines:
+                record = parser.parse(line, line_offset)
+                if record is not None and record.date >= start_day:
+                    records.append(record)
+            yield from self.feed(records)
@@ -0,0 +1,90 @@
+import typing
+
+from nwpc_workflow_log_model.analytics.situation_type import (
+    FamilySituationType,
+    TaskSituationType
+)
+from nwpc_workflow_log_model.analytics.node_situation import NodeSituation, TimePoint
+
+from .dfa_table import (
+    ACTION_APPEND,
+    ACTION_RESET,
+    build_transition_table,
+    get_time_periods,
+    get_record_time,
+)
+
+
+class TableStatusChangeDFA(object):
+    """
+    Lightweight table-driven DFA with the same interface as ``TaskStatusChangeDFA`` and ``FamilyStatusChangeDFA``.
+
+    Transitions are precomputed as ``{state: {status value: (next state, action)}}`` for each ``ignore_aborted``,
+    so ``trigger`` is two dict lookups. Nothing is allocated for a status change except the time points it records.
+
+    ``node_data`` can be a ``StatusChangeEntry`` or a status record, so ``SituationCalculator`` does not
+    wrap records when ``accepts_records`` is set.
+
+    Attributes
+    ----------
+    name:
+        name of the DFA, usually the date
+    state: TaskSituationType or FamilySituationType
+        current state
+    node_situation: NodeSituation
+        time points and time periods
+    """
+    __slots__ = ("name", "state", "node_situation", "_transitions")
+
+    situation_type = None
+    accepts_records = True
+    _tables = None
+
+    def __init__(self, name, ignore_aborted: bool = False):
+        self.name = name
+        self.state = self.situation_type.Initial
+        self.node_situation = NodeSituation()
+        self._transitions = self._get_transitions(ignore_aborted)
+
+    def trigger(self, status: str, node_data=None):
+        next_state, action = self._transitions[self.state][status]
+        if action == ACTION_RESET:
+            self.node_situation = NodeSituation()
+        elif action == ACTION_APPEND:
+            self.node_situation.time_points.append(TimePoint(
+                status=node_data.status,
+                time=get_record_time(node_data),
+            ))
+        if next_state is not self.state:
+            self.state = next_state
+            self.node_situation.situation = next_state
+            if next_state is self.situation_type.Complete:
+                self.node_situation.time_periods = get_time_periods(self.node_situation.time_points)
+
+    @classmethod
+    def _get_transitions(cls, ignore_aborted: bool) -> typing.Dict:
+        if cls._tables is None:
+            cls._tables = dict()
+        transitions = cls._tables.get(ignore_aborted)
+        if transitions is None:
+            transitions = {state: dict() for state in cls.situation_type}
+            for (state, status), value in build_transition_table(cls.situation_type, ignore_aborted).items():
+                transitions[state][status.value] = value
+            cls._tables[ignore_aborted] = transitions
+        return transitions
+
+
+class TableTaskStatusChangeDFA(TableStatusChangeDFA):
+    """
+    Drop-in replacement of ``TaskStatusChangeDFA``.
+    """
+    __slots__ = ()
+    situation_type = TaskSituationType
+
+
+class TableFamilyStatusChangeDFA(TableStatusChangeDFA):
+    """
+    Drop-in replacement of ``FamilyStatusChangeDFA``, supports ``ignore_aborted``.
+    """
+    __slots__ = ()
+    situation_type = FamilySituationType
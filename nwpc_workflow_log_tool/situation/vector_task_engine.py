@@ -0,0 +1,280 @@
+import typing
+import datetime
+
+import numpy as np
+import pandas as pd
+from loguru import logger
+
+from nwpc_workflow_model.node_status import NodeStatus
+from nwpc_workflow_log_model.analytics.situation_type import TaskSituationType
+from nwpc_workflow_log_model.analytics.node_situation import NodeSituation, TimePoint
+
+from nwpc_workflow_log_tool.log_record import NodePathTable
+from .record_bucket import SECONDS_PER_DAY
+from .dfa_table import ACTION_APPEND, ACTION_RESET, build_transition_table, get_time_periods
+from .situation_calculator import get_date_list
+from .situation_record import SituationRecord
+
+
+# Statuses are encoded as their index in NodeStatus, the same as ``RecordCache``.
+STATUSES = list(NodeStatus)
+STATUS_CODES = {s: i for i, s in enumerate(STATUSES)}
+
+TASK_STATES = list(TaskSituationType)
+TASK_STATE_CODES = {s: i for i, s in enumerate(TASK_STATES)}
+
+
+def _build_task_table() -> typing.Tuple[np.ndarray, np.ndarray]:
+    """
+    Compile ``build_transition_table`` for tasks into lookup arrays indexed by (state code, status code).
+    """
+    transitions = np.empty((len(TASK_STATES), len(STATUSES)), dtype=np.int8)
+    actions = np.empty((len(TASK_STATES), len(STATUSES)), dtype=np.int8)
+    for (state, status), (next_state, action) in build_transition_table(TaskSituationType).items():
+        transitions[TASK_STATE_CODES[state], STATUS_CODES[status]] = TASK_STATE_CODES[next_state]
+        actions[TASK_STATE_CODES[state], STATUS_CODES[status]] = action
+    return transitions, actions
+
+
+TASK_TRANSITIONS, TASK_ACTIONS = _build_task_table()
+
+
+def advance_groups(
+        group_starts: np.ndarray,
+        group_lengths: np.ndarray,
+        status_codes: np.ndarray,
+        transitions: np.ndarray = TASK_TRANSITIONS,
+        actions: np.ndarray = TASK_ACTIONS,
+        stop_codes: typing.Iterable[int] = (TASK_STATE_CODES[TaskSituationType.Complete],),
+) -> typing.Tuple[np.ndarray, np.ndarray]:
+    """
+    Run one DFA for each group of records at once.
+
+    Records of a group are contiguous in ``status_codes``. In step ``k``, the ``k``-th record of every
+    group which is not stopped is consumed with one table lookup, so the number of Python steps is
+    the length of the longest group, not the number of records.
+
+    Returns
+    -------
+    typing.Tuple[np.ndarray, np.ndarray]
+        final state code of each group, action of each record (-1 for records not consumed).
+    """
+    states = np.zeros(len(group_starts), dtype=np.int8)
+    record_actions = np.full(len(status_codes), -1, dtype=np.int8)
+    is_stop = np.zeros(len(transitions), dtype=bool)
+    is_stop[list(stop_codes)] = True
+
+    running = np.arange(len(group_starts))
+    step = 0
+    while len(running) > 0:
+        running = running[group_lengths[running] > step]
+        if len(running) == 0:
+            break
+        positions = group_starts[running] + step
+        current_states = states[running]
+        current_statuses = status_codes[positions]
+        states[running] = transitions[current_states, current_statuses]
+        record_actions[positions] = actions[current_states, current_statuses]
+        running = running[~is_stop[states[running]]]
+        step += 1
+    return states, record_actions
+
+
+class VectorTaskSituationCalculator(object):
+    """
+    Calculate task situations for many nodes and days with NumPy arrays instead of one DFA per day.
+
+    Statuses are encoded as small integers and ``TaskStatusChangeDFA`` is encoded as lookup tables
+    (see ``build_transition_table``). All (node, day) groups are advanced together by ``advance_groups``.
+    Results are the same as ``SituationCalculator`` with ``TaskStatusChangeDFA``
+    on situation types and time points. ``SituationRecord.records`` is always None.
+
+    Attributes
+    ----------
+    stop_states: typing.Tuple[TaskSituationType]
+        states to stop calculating DFA
+    """
+    def __init__(
+            self,
+            stop_states: typing.Tuple = (TaskSituationType.Complete,),
+    ):
+        self.stop_states = stop_states
+
+    def get_situations(
+            self,
+            records: typing.Iterable,
+            node_path: str,
+            start_date: datetime.datetime,
+            end_date: datetime.datetime,
+            include_next_day: bool = True,
+    ) -> typing.List[SituationRecord]:
+        """
+        Same as ``SituationCalculator.get_situations``.
+        """
+        return self.get_node_situations(
+            records,
+            [node_path],
+            start_date,
+            end_date,
+            include_next_day=include_next_day,
+        )[node_path]
+
+    def get_node_situations(
+            self,
+            records: typing.Iterable,
+            node_paths: typing.List[str],
+            start_date: datetime.datetime,
+            end_date: datetime.datetime,
+            include_next_day: bool = True,
+    ) -> typing.Dict[str, typing.List[SituationRecord]]:
+        """
+        Get situations of many task nodes in date range [start_date, end_date), records of other nodes are ignored.
+        """
+        node_path_table = NodePathTable(node_paths)
+        node_ids = []
+        seconds = []
+        status_codes = []
+        for record in records:
+            node_path = record.node_path
+            if node_path not in node_path_table:
+                continue
+            record_time = record.time
+            node_ids.append(node_path_table.get_id(node_path))
+            seconds.append(
+                record.date.toordinal() * SECONDS_PER_DAY
+                + record_time.hour * 3600 + record_time.minute * 60 + record_time.second
+            )
+            status_codes.append(STATUS_CODES[record.status])
+
+        dates = get_date_list(start_date, end_date)
+        logger.info("Calculating task situations for {} records using arrays...", len(seconds))
+        states, points = self.evaluate(
+            np.array(node_ids, dtype=np.int32),
+            np.array(seconds, dtype=np.int64),
+            np.array(status_codes, dtype=np.int8),
+            node_count=len(node_path_table),
+            start_day=dates[0].date().toordinal() if len(dates) > 0 else 0,
+            day_count=len(dates),
+            include_next_day=include_next_day,
+        )
+        logger.info("Calculating task situations for {} records using arrays...Done", len(seconds))
+
+        point_groups, point_statuses, point_seconds = points
+        point_bounds = np.searchsorted(point_groups, np.arange(len(node_path_table) * len(dates) + 1))
+        result = dict()
+        for node_id, node_path in enumerate(node_path_table.paths):
+            situations = []
+            for day_index, current_date in enumerate(dates):
+                group = node_id * len(dates) + day_index
+                lo, hi = point_bounds[group], point_bounds[group + 1]
+                situations.append(_create_situation_record(
+                    current_date,
+                    TASK_STATES[states[group]],
+                    point_statuses[lo:hi],
+                    point_seconds[lo:hi],
+                ))
+            result[node_path] = situations
+        return result
+
+    def evaluate(
+            self,
+            node_ids: np.ndarray,
+            seconds: np.ndarray,
+            status_codes: np.ndarray,
+            node_count: int,
+            start_day: int,
+            day_count: int,
+            include_next_day: bool = True,
+    ) -> typing.Tuple[np.ndarray, typing.Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+        """
+        Evaluate situations from record columns in time order.
+
+        Parameters
+        ----------
+        node_ids: np.ndarray
+            node id of each record
+        seconds: np.ndarray
+            seconds since ``datetime.date.min`` of each record
+        status_codes: np.ndarray
+            status code of each record, see ``STATUS_CODES``
+        node_count: int
+        start_day: int
+            ordinal of the first day
+        day_count: int
+        include_next_day: bool
+            See ``SituationCalculator.get_situations``.
+
+        Returns
+        -------
+        typing.Tuple[np.ndarray, typing.Tuple[np.ndarray, np.ndarray, np.ndarray]]
+            state code of each group (``node_id * day_count + day_index``),
+            and (group, status code, seconds) of time points sorted by group.
+        """
+        record_count = len(seconds)
+        record_indexes = np.arange(record_count)
+        day_indexes = seconds // SECONDS_PER_DAY - start_day
+        if include_next_day:
+            record_indexes = np.concatenate([record_indexes, record_indexes])
+            day_indexes = np.concatenate([day_indexes, day_indexes - 1])
+        in_range = (day_indexes >= 0) & (day_indexes < day_count)
+        record_indexes = record_indexes[in_range]
+        groups = node_ids[record_indexes].astype(np.int64) * day_count + day_indexes[in_range]
+
+        # Sort by group and keep record order in each group. A combined unique key is much faster than lexsort.
+        if (node_count * day_count + 1) * (record_count + 1) < 2 ** 62:
+            order = np.argsort(groups * record_count + record_indexes)
+        else:
+            order = np.lexsort((record_indexes, groups))
+        record_indexes = record_indexes[order]
+        groups = groups[order]
+
+        is_start = np.ones(len(groups), dtype=bool)
+        is_start[1:] = groups[1:] != groups[:-1]
+        group_starts = np.flatnonzero(is_start)
+        group_lengths = np.diff(np.append(group_starts, len(groups)))
+
+        stop_codes = [TASK_STATE_CODES[s] for s in self.stop_states]
+        group_states, record_actions = advance_groups(
+            group_starts,
+            group_lengths,
+            status_codes[record_indexes],
+            stop_codes=stop_codes,
+        )
+
+        states = np.full(node_count * day_count, TASK_STATE_CODES[TaskSituationType.Initial], dtype=np.int8)
+        states[groups[group_starts]] = group_states
+
+        # Time points recorded before the last reset of a group are dropped.
+        epochs = np.cumsum(record_actions == ACTION_RESET)
+        group_ids = np.cumsum(is_start) - 1
+        last_epochs = epochs[group_starts + group_lengths - 1]
+        is_point = (record_actions == ACTION_APPEND) & (epochs == last_epochs[group_ids])
+        point_records = record_indexes[is_point]
+        points = (groups[is_point], status_codes[point_records], seconds[point_records])
+        return states, points
+
+
+def _create_situation_record(
+        current_date: pd.Timestamp,
+        state: TaskSituationType,
+        point_statuses: np.ndarray,
+        point_seconds: np.ndarray,
+) -> SituationRecord:
+    node_situation = NodeSituation()
+    node_situation.situation = state
+    node_situation.time_points = [
+        TimePoint(
+            status=STATUSES[status],
+            time=datetime.datetime.fromordinal(int(s) // SECONDS_PER_DAY) + datetime.timedelta(
+                seconds=int(s) % SECONDS_PER_DAY),
+        )
+        for status, s in zip(point_statuses, point_seconds)
+    ]
+    if state is TaskSituationType.Complete:
+        node_situation.time_periods = get_time_periods(node_situation.time_points)
+    return SituationRecord(
+        date=current_date,
+        state=state,
+        node_situation=node_situation,
+        records=None,
+    )
@@ -0,0 +1,3 @@
+from .histogram_sketch import HistogramSketch, DEFAULT_RESOLUTION, DEFAULT_QUANTILES, get_quantile_names, to_timedelta
+from .node_statistics import NodeStatistics, CLOCK_METRICS, get_clock_table
+from .rolling_statistics import RollingStatistics, ROLLING_STATISTICS, get_rolling_baseline
@@ -0,0 +1,189 @@
+import typing
+
+import numpy as np
+import pandas as pd
+
+
+DEFAULT_RESOLUTION = 1.0
+
+DEFAULT_QUANTILES = (0.5, 0.9, 0.99)
+
+
+class HistogramSketch(object):
+    """
+    固定分辨率的直方图，以有限的内存统计时间点（相对于日期的秒数）和时间段长度（秒数）。
+
+    数值按 ``resolution`` 秒分箱，只保存非空箱的计数，另外保存精确的个数、总和、最小值和最大值。
+    内存与非空箱的个数成正比，不超过 ``(最大值 - 最小值) / resolution + 1``，与数据的天数无关。
+    例如分辨率为 1 秒时，一个节点多年的开始时间通常只占用几百到几千个箱。
+
+    误差：
+
+    - ``count``，``mean``，``min`` 和 ``max`` 是精确值
+    - ``trim_mean`` 和 ``quantile`` 使用箱的中心值计算，与精确值的误差不超过 ``resolution / 2``。
+      ecflow 日志的时间精确到秒，默认分辨率为 1 秒时两者都是精确值，
+      与 ``scipy.stats.trim_mean`` 和 ``numpy.quantile`` 的结果相同。
+
+    两个分辨率相同的直方图可以通过 ``merge`` 合并，结果与使用全部数据构建的直方图相同，
+    可以由多个进程分别统计不同分区的数据后合并。
+
+    Attributes
+    ----------
+    resolution: float
+        分箱宽度，单位为秒
+    count: int
+        数值个数，不包括 NaN 和 NaT
+    total: float
+        数值总和
+    min: float
+    max: float
+    """
+    def __init__(self, resolution: float = DEFAULT_RESOLUTION):
+        if resolution <= 0:
+            raise ValueError(f"resolution must be positive: {resolution}")
+        self.resolution = resolution
+        self.count = 0
+        self.total = 0.0
+        self.min = np.nan
+        self.max = np.nan
+        self._bins = dict()
+        self._sorted = None
+
+    def add(self, value: float):
+        """
+        添加一个数值，单位为秒。
+        """
+        self.update(np.array([value], dtype=float))
+
+    def update(self, values: typing.Union[np.ndarray, pd.Series, pd.TimedeltaIndex]):
+        """
+        添加一组数值，``timedelta64`` 类型转为秒数，NaN 和 NaT 被忽略。
+        """
+        values = _to_seconds(values)
+        if len(values) == 0:
+            return
+        keys, counts = np.unique(np.round(values / self.resolution).astype(np.int64), return_counts=True)
+        bins = self._bins
+        for key, count in zip(keys.tolist(), counts.tolist()):
+            bins[key] = bins.get(key, 0) + count
+        self._sorted = None
+
+        self.count += len(values)
+        self.total += float(values.sum())
+        self.min = float(values.min()) if self.min != self.min else min(self.min, float(values.min()))
+        self.max = float(values.max()) if self.max != self.max else max(self.max, float(values.max()))
+
+    def merge(self, other: "HistogramSketch") -> "HistogramSketch":
+        """
+        将另一个直方图合并到当前直方图，返回当前直方图。
+        """
+        if other.resolution != self.resolution:
+            raise ValueError(f"resolution is not the same: {self.resolution} != {other.resolution}")
+        if other.count == 0:
+            return self
+        bins = self._bins
+        for key, count in other._bins.items():
+            bins[key] = bins.get(key, 0) + count
+        self._sorted = None
+
+        self.count += other.count
+        self.total += other.total
+        self.min = other.min if self.min != self.min else min(self.min, other.min)
+        self.max = other.max if self.max != self.max else max(self.max, other.max)
+        return self
+
+    def mean(self) -> float:
+        if self.count == 0:
+            return np.nan
+        return self.total / self.count
+
+    def trim_mean(self, ratio: float) -> float:
+        """
+        切尾均值，两侧各去掉 ``int(ratio * count)`` 个数值，与 ``scipy.stats.trim_mean`` 相同。
+        """
+        if self.count == 0:
+            return np.nan
+        lower = int(ratio * self.count)
+        upper = self.count - lower
+        if lower >= upper:
+            raise ValueError(f"ratio is too big: {ratio}")
+        values, cumulative = self._get_sorted()
+        # 每个箱的数值在排序后位于 [starts, cumulative)，计算其中在 [lower, upper) 内的个数
+        starts = cumulative - np.diff(cumulative, prepend=0)
+        counts = np.maximum(np.minimum(cumulative, upper) - np.maximum(starts, lower), 0)
+        return float((values * counts).sum() / (upper - lower))
+
+    def quantile(self, q: typing.Union[float, typing.Sequence[float]]) -> typing.Union[float, np.ndarray]:
+        """
+        分位数，使用线性插值，与 ``numpy.quantile`` 的默认方法相同。
+        """
+        scalar = np.ndim(q) == 0
+        q = np.atleast_1d(np.asarray(q, dtype=float))
+        if self.count == 0:
+            result = np.full(len(q), np.nan)
+        else:
+            values, cumulative = self._get_sorted()
+            position = q * (self.count - 1)
+            below = np.floor(position).astype(np.int64)
+            above = np.minimum(below + 1, self.count - 1)
+            low = values[np.searchsorted(cumulative, below, side="right")]
+            high = values[np.searchsorted(cumulative, above, side="right")]
+            result = low + (position - below) * (high - low)
+        return float(result[0]) if scalar else result
+
+    def summary(
+            self,
+            ratio: float = 0.25,
+            quantiles: typing.Sequence[float] = DEFAULT_QUANTILES,
+    ) -> typing.Dict[str, float]:
+        """
+        返回个数、均值、切尾均值和分位数，分位数的键为 ``p50`` 这样的名称。
+        """
+        result = {
+            "count": self.count,
+            "mean": self.mean(),
+            "trim_mean": self.trim_mean(ratio) if self.count > 0 else np.nan,
+        }
+        for name, value in zip(get_quantile_names(quantiles), np.atleast_1d(self.quantile(list(quantiles)))):
+            result[name] = float(value)
+        return result
+
+    def __len__(self):
+        return self.count
+
+    def __repr__(self):
+        return f"HistogramSketch(resolution={self.resolution}, count={self.count}, bins={len(self._bins)})"
+
+    def _get_sorted(self) -> typing.Tuple[np.ndarray, np.ndarray]:
+        """
+        返回按数值排序的箱中心值和累计个数。
+        """
+        if self._sorted is None:
+            keys = np.array(sorted(self._bins), dtype=np.int64)
+            counts = np.array([self._bins[key] for key in keys.tolist()], dtype=np.int64)
+            self._sorted = (keys * self.resolution, np.cumsum(counts))
+        return self._sorted
+
+
+def get_quantile_names(quantiles: typing.Sequence[float]) -> typing.List[str]:
+    """
+    分位数名称，例如 0.5 => ``p50``，0.999 => ``p99.9``。
+    """
+    return [f"p{q * 100:g}" for q in quantiles]
+
+
+def to_timedelta(seconds: float) -> pd.Timedelta:
+    """
+    将统计结果（秒数）转为 ``pd.Timedelta``，精确到微秒，NaN 转为 ``NaT``。
+    """
+    return pd.to_timedelta(seconds, unit="s").round("us")
+
+
+def _to_seconds(values) -> np.ndarray:
+    values = np.asarray(values)
+    if values.dtype.kind == "m":
+        values = values[~np.isnat(values)].astype("timedelta64[ns]").astype(np.int64) / 1e9
+    else:
+        values = values.astype(float)
+        values = values[~np.isnan(values)]
+    return values
@@ -0,0 +1,121 @@
+import typing
+
+import pandas as pd
+
+from .histogram_sketch import HistogramSketch, DEFAULT_RESOLUTION, DEFAULT_QUANTILES
+
+
+CLOCK_METRICS = ("start_clock", "end_clock", "duration")
+
+
+class NodeStatistics(object):
+    """
+    多个节点的运行时间统计，每个节点的每个指标对应一个 ``HistogramSketch``。
+
+    指标为节点开始时间（``start_clock``）、结束时间（``end_clock``）和运行时长（``duration``），
+    时间点为相对于日期零点的时间，只统计 ``time_period_in_all`` 不为空（运行状态为目标状态）的天。
+
+    表格可以分批添加，例如按月份或按日志文件，内存只与节点个数和直方图的箱数有关。
+    多个进程分别统计后可以使用 ``merge`` 合并，结果与一次统计全部数据相同。
+
+    Attributes
+    ----------
+    resolution: float
+        直方图的分箱宽度，单位为秒
+    sketches: typing.Dict[str, typing.Dict[str, HistogramSketch]]
+        节点路径 => 指标名称 => 直方图
+    """
+    def __init__(self, resolution: float = DEFAULT_RESOLUTION):
+        self.resolution = resolution
+        self.sketches = dict()
+
+    def update(self, table_data: pd.DataFrame):
+        """
+        添加 ``NodesTableProcessor`` 生成的长格式表格，行索引为 (``node_path``, ``date``)。
+        """
+        # 没有目标状态的节点也保留一行
+        for node_path in table_data.index.get_level_values("node_path").unique():
+            self.get_node(str(node_path))
+
+        clocks = get_clock_table(table_data[table_data["time_period_in_all"].notna()])
+        node_paths = clocks.index.get_level_values("node_path").astype(str)
+        for node_path, rows in clocks.groupby(node_paths, sort=False).indices.items():
+            self.update_node(node_path, clocks.iloc[rows])
+
+    def update_node(self, node_path: str, clocks: pd.DataFrame):
+        """
+        添加一个节点的数据，``clocks`` 的列为指标名称，值为 ``timedelta64`` 类型或秒数。
+        """
+        sketches = self.get_node(node_path)
+        for name in clocks.columns:
+            sketch = sketches.get(name)
+            if sketch is None:
+                sketch = sketches[name] = HistogramSketch(self.resolution)
+            sketch.update(clocks[name].values)
+
+    def get_node(self, node_path: str) -> typing.Dict[str, HistogramSketch]:
+        sketches = self.sketches.get(node_path)
+        if sketches is None:
+            sketches = self.sketches[node_path] = {
+                name: HistogramSketch(self.resolution) for name in CLOCK_METRICS
+            }
+        return sketches
+
+    def merge(self, other: "NodeStatistics") -> "NodeStatistics":
+        """
+        将另一个统计结果合并到当前统计结果，返回当前统计结果。
+        """
+        for node_path, other_sketches in other.sketches.items():
+            sketches = self.get_node(node_path)
+            for name, other_sketch in other_sketches.items():
+                sketch = sketches.get(name)
+                if sketch is None:
+                    sketch = sketches[name] = HistogramSketch(self.resolution)
+                sketch.merge(other_sketch)
+        return self
+
+    def get_summary(
+            self,
+            statistic: str = "trim_mean",
+            ratio: float = 0.25,
+            quantiles: typing.Sequence[float] = DEFAULT_QUANTILES,
+    ) -> pd.DataFrame:
+        """
+        返回每个节点一行的汇总表，列为 ``complete`` 天数和各个指标的统计量，统计量为时间段（``pd.Timedelta``）。
+
+        Parameters
+        ----------
+        statistic: str
+            统计量名称，见 ``HistogramSketch.summary``，例如 ``trim_mean``，``mean``，``p90``
+        ratio: float
+            切尾均值两侧各去掉的比例
+        quantiles: typing.Sequence[float]
+            分位数
+
+        Returns
+        -------
+        pd.DataFrame
+        """
+        rows = []
+        for node_path, sketches in self.sketches.items():
+            row = {"complete": sketches[CLOCK_METRICS[0]].count}
+            for name, sketch in sketches.items():
+                row[name] = sketch.summary(ratio, quantiles)[statistic]
+            rows.append(row)
+        summary = pd.DataFrame(rows, index=pd.Index(list(self.sketches), name="node_path"))
+        for name in summary.columns[1:]:
+            summary[name] = pd.to_timedelta(summary[name], unit="s")
+        return summary
+
+
+def get_clock_table(table_data: pd.DataFrame) -> pd.DataFrame:
+    """
+    从 ``NodesTableProcessor`` 生成的长格式表格中计算各个指标，行索引不变，列为 ``CLOCK_METRICS``。
+    开始时间和结束时间为相对于日期零点的时间段，不是目标状态的天为 ``NaT``。
+    """
+    dates = table_data.index.get_level_values("date").values
+    return pd.DataFrame({
+        "start_clock": table_data["time_period_in_all_start"].values - dates,
+        "end_clock": table_data["time_period_in_all_end"].values - dates,
+        "duration": table_data["time_period_in_all"].values,
+    }, index=table_data.index)
@@ -0,0 +1,243 @@
+import typing
+
+import numpy as np
+import pandas as pd
+
+from .node_statistics import get_clock_table
+
+
+ROLLING_STATISTICS = ("count", "trim_mean", "p25", "p50", "p75", "iqr")
+
+
+class RollingStatistics(object):
+    """
+    多个序列按天滑动窗口的顺序统计量：个数、切尾均值、四分位数和四分位距。
+
+    每个序列的值按大小排序后分配位置，用两个树状数组（Fenwick tree）分别保存窗口内每个位置的个数和数值。
+    窗口每滑动一天，只需要插入新的一天并删除移出窗口的一天（``O(log n)``），
+    第 k 小的值和最小的 k 个值之和通过在树状数组上二分查找得到（``O(log n)``），
+    不需要对每个窗口重新排序计算 ``trim_mean``。
+    所有序列使用二维数组同时计算，每天的插入、删除和查找都是对所有序列的 numpy 数组操作。
+
+    切尾均值与 ``scipy.stats.trim_mean`` 相同，分位数与 ``numpy.quantile`` 的线性插值相同。
+
+    Attributes
+    ----------
+    window: int
+        窗口天数
+    ratio: float
+        切尾均值两侧各去掉的比例
+    min_periods: int
+        窗口内有效值个数少于该值时结果为 NaN
+    include_current: bool
+        窗口是否包括当天。默认不包括，即当天的窗口为之前的 ``window`` 天，用于和当天的值比较。
+    """
+    def __init__(
+            self,
+            window: int,
+            ratio: float = 0.25,
+            min_periods: int = 1,
+            include_current: bool = False,
+    ):
+        if window < 1:
+            raise ValueError(f"window must be positive: {window}")
+        if not 0 <= ratio < 0.5:
+            raise ValueError(f"ratio must be in [0, 0.5): {ratio}")
+        self.window = window
+        self.ratio = ratio
+        self.min_periods = max(min_periods, 1)
+        self.include_current = include_current
+
+    def compute(self, values: np.ndarray) -> typing.Dict[str, np.ndarray]:
+        """
+        Parameters
+        ----------
+        values: np.ndarray
+            二维数组，每行为一个序列每天的值（秒数），缺失值为 NaN
+
+        Returns
+        -------
+        typing.Dict[str, np.ndarray]
+            统计量名称（见 ``ROLLING_STATISTICS``） => 与 ``values`` 形状相同的数组。
+            ``count`` 为窗口内有效值的个数，其它统计量在个数少于 ``min_periods`` 时为 NaN。
+        """
+        values = np.asarray(values, dtype=float)
+        series_count, day_count = values.shape
+        results = {name: np.full(values.shape, np.nan) for name in ROLLING_STATISTICS}
+        results["count"] = np.zeros(values.shape, dtype=np.int64)
+        if values.size == 0:
+            return results
+
+        # 每个值在所在序列中按大小排序后的位置，NaN 排在最后，相同的值位置不同
+        order = np.argsort(values, axis=1, kind="stable")
+        positions = np.empty_like(order)
+        np.put_along_axis(positions, order, np.arange(day_count)[np.newaxis, :], axis=1)
+        sorted_values = np.take_along_axis(values, order, axis=1)
+        valid = ~np.isnan(values)
+
+        tree = _FenwickTrees(series_count, day_count)
+        counts = np.zeros(series_count, dtype=np.int64)
+
+        def insert(day, sign):
+            mask = valid[:, day]
+            if mask.any():
+                rows = np.flatnonzero(mask)
+                tree.add(rows, positions[rows, day], sign, sign * values[rows, day])
+                counts[rows] += sign
+
+        for day in range(day_count):
+            if self.include_current:
+                insert(day, 1)
+                if day >= self.window:
+                    insert(day - self.window, -1)
+                self._query(day, tree, counts, sorted_values, results)
+            else:
+                self._query(day, tree, counts, sorted_values, results)
+                insert(day, 1)
+                if day >= self.window:
+                    insert(day - self.window, -1)
+        return results
+
+    def _query(
+            self,
+            day: int,
+            tree: "_FenwickTrees",
+            counts: np.ndarray,
+            sorted_values: np.ndarray,
+            results: typing.Dict[str, np.ndarray],
+    ):
+        results["count"][:, day] = counts
+        rows = np.flatnonzero(counts >= self.min_periods)
+        if len(rows) == 0:
+            return
+        n = counts[rows]
+        lower = (self.ratio * n).astype(np.int64)
+        upper = n - lower
+
+        # 需要查找的名次（从 1 开始）：切尾的上下界，以及三个分位数插值两侧的值
+        ranks = [upper, lower]
+        fractions = []
+        for q in (0.25, 0.5, 0.75):
+            position = q * (n - 1)
+            below = np.floor(position).astype(np.int64)
+            ranks.extend([below + 1, np.minimum(below + 2, n)])
+            fractions.append(position - below)
+        ranks = np.stack(ranks, axis=1)
+
+        kth_values, prefix_sums = tree.find(rows, np.maximum(ranks, 1), sorted_values, sum_count=2)
+        # 最小的 0 个值之和为 0
+        prefix_sums[:, 1] = np.where(lower > 0, prefix_sums[:, 1], 0.0)
+
+        results["trim_mean"][rows, day] = (prefix_sums[:, 0] - prefix_sums[:, 1]) / (upper - lower)
+        for i, (name, fraction) in enumerate(zip(("p25", "p50", "p75"), fractions)):
+            low, high = kth_values[:, 2 + 2 * i], kth_values[:, 3 + 2 * i]
+            results[name][rows, day] = low + fraction * (high - low)
+        results["iqr"][rows, day] = results["p75"][rows, day] - results["p25"][rows, day]
+
+
+class _FenwickTrees(object):
+    """
+    每个序列一个树状数组，保存每个位置的个数和数值，位置从 1 开始。
+
+    所有树状数组保存在一维数组中，第 ``row`` 个序列的位置 ``i`` 的下标为 ``i * series_count + row``，
+    查找时各序列访问的位置相近，内存访问比较集中。
+    """
+    def __init__(self, series_count: int, size: int):
+        self.size = size
+        self.series_count = series_count
+        self.counts = np.zeros((size + 1) * series_count, dtype=np.int64)
+        self.sums = np.zeros((size + 1) * series_count, dtype=float)
+        self.top = 1 << (size.bit_length() - 1)
+
+    def add(self, rows: np.ndarray, positions: np.ndarray, count: int, value: np.ndarray):
+        index = positions + 1
+        while len(index) > 0:
+            flat_index = index * self.series_count + rows
+            self.counts[flat_index] += count
+            self.sums[flat_index] += value
+            index = index + (index & -index)
+            mask = index <= self.size
+            rows, index, value = rows[mask], index[mask], value[mask]
+
+    def find(
+            self,
+            rows: np.ndarray,
+            ranks: np.ndarray,
+            sorted_values: np.ndarray,
+            sum_count: int,
+    ) -> typing.Tuple[np.ndarray, np.ndarray]:
+        """
+        查找每行 ``rows`` 中第 ``ranks`` 小的值，``ranks`` 的形状为 (len(rows), k)，
+        以及前 ``sum_count`` 列 ``ranks`` 对应的最小的 ``ranks`` 个值之和。
+        """
+        rows = rows[:, np.newaxis]
+        position = np.zeros(ranks.shape, dtype=np.int64)
+        remaining = ranks.copy()
+        total = np.zeros((ranks.shape[0], sum_count), dtype=float)
+        step = self.top
+        while step > 0:
+            index = position + step
+            # 超出范围的位置个数视为无穷大，不会被选中
+            flat_index = np.minimum(index, self.size) * self.series_count + rows
+            count = np.where(index <= self.size, self.counts[flat_index], remaining)
+            take = count < remaining
+            position = np.where(take, index, position)
+            remaining = np.where(take, remaining - count, remaining)
+            total += np.where(take[:, :sum_count], self.sums[flat_index[:, :sum_count]], 0.0)
+            step >>= 1
+        # 第 k 小的值位于 position + 1，对应排序后数组的下标 position
+        kth_values = sorted_values[rows, position]
+        return kth_values, total + kth_values[:, :sum_count]
+
+
+def get_rolling_baseline(
+        table_data: pd.DataFrame,
+        metric: str = "end_clock",
+        window: int = 30,
+        ratio: float = 0.25,
+        min_periods: int = 1,
+) -> pd.DataFrame:
+    """
+    计算每个节点每天之前 ``window`` 天的基线。
+
+    Parameters
+    ----------
+    table_data: pd.DataFrame
+        ``NodesTableProcessor`` 生成的长格式表格，行索引为 (``node_path``, ``date``)
+    metric: str
+        指标名称，见 ``CLOCK_METRICS``
+    window: int
+        窗口天数，缺少的日期按缺失值处理
+    ratio: float
+        切尾均值两侧各去掉的比例
+    min_periods: int
+        窗口内有效值个数少于该值时基线为 NaT
+
+    Returns
+    -------
+    pd.DataFrame
+        行索引为 (``node_path``, ``date``)，每个节点每天一行。
+        列为当天的值 ``metric``，窗口内的有效天数 ``count``，基线 ``trim_mean``，``p25``，``p50``，``p75``，``iqr``，
+        以及当天的值与切尾均值的差 ``deviation``，除 ``count`` 外均为 ``timedelta64[ns]``。
+    """
+    series = get_clock_table(table_data)[metric]
+    series = series[~series.index.duplicated(keep="last")]
+    node_paths = series.index.get_level_values("node_path").unique()
+    dates = series.index.get_level_values("date")
+    if len(series) > 0:
+        dates = pd.date_range(dates.min(), dates.max(), freq="D")
+    values = series.unstack("date").reindex(index=node_paths, columns=dates)
+    timedeltas = values.to_numpy(dtype="timedelta64[ns]")
+    seconds = np.where(np.isnat(timedeltas), np.nan, timedeltas.astype(np.int64) / 1e9)
+
+    results = RollingStatistics(window, ratio=ratio, min_periods=min_periods).compute(seconds)
+
+    index = pd.MultiIndex.from_product([node_paths, dates], names=["node_path", "date"])
+    baseline = pd.DataFrame({metric: timedeltas.ravel()}, index=index)
+    for name in ROLLING_STATISTICS:
+        if name == "count":
+            baseline[name] = results[name].ravel()
+        else:
+            baseline[name] = pd.to_timedelta(results[name].ravel(), unit="s").round("s")
+    baseline["deviation"] = baseline[metric] - baseline["trim_mean"]
+    return baseline
@@ -1,5 +1,6 @@
 from typing import List
 import datetime
+import os
 
 from nwpc_workflow_log_model.log_record import LogRecord
 
@@ -22,3 +23,15 @@ def generate_later_than_time(current_date: datetime.date, earliest_time: datetim
 def print_records(records: List[LogRecord]):
     for r in records:
         print(r.log_record)
+
+
+def get_cache_dir(name: str) -> str:
+    """
+    返回缓存目录，默认位于 ``~/.cache/nwpc_workflow_log_tool`` 下，
+    可以通过环境变量 ``NWPC_WORKFLOW_LOG_TOOL_CACHE_DIR`` 修改。
+    """
+    cache_root = os.environ.get(
+        "NWPC_WORKFLOW_LOG_TOOL_CACHE_DIR",
+        os.path.join(os.path.expanduser("~"), ".cache", "nwpc_workflow_log_tool"),
+    )
+    return os.path.join(cache_root, name)
@@ -39,7 +39,7 @@ setup(
 
     keywords='nwpc workflow log model',
 
-    packages=find_packages(exclude=['docs', 'tests', "legacy"]),
+    packages=find_packages(exclude=['docs', 'tests', 'tests.*', "legacy"]),
 
     install_requires=[
         "pyyaml",
@@ -56,6 +56,7 @@ setup(
 
     extras_require={
         'test': ['pytest'],
+        'arrow': ['pyarrow'],
         'cov': ['pytest-cov', 'codecov']
     },
 
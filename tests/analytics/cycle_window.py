@@ -0,0 +1,147 @@
+import datetime
+
+import click
+import pandas as pd
+
+from nwpc_workflow_model.node_status import NodeStatus
+from nwpc_workflow_log_model.analytics.situation_type import TaskSituationType
+
+from nwpc_workflow_log_tool.log_record import StatusRecord
+from nwpc_workflow_log_tool.situation import CycleWindow
+from nwpc_workflow_log_tool.situation.cycle_window import get_read_date_range
+from nwpc_workflow_log_tool.situation.analytics import create_situation_calculator
+from nwpc_workflow_log_tool.situation.record_bucket import SECONDS_PER_DAY
+from nwpc_workflow_log_tool.cli.node import get_cycle_window
+
+
+NODE_PATH = "/gmf/18/up"
+START_DATE = datetime.datetime(2020, 5, 1)
+
+
+def get_seconds(value):
+    return value.toordinal() * SECONDS_PER_DAY + value.hour * 3600 + value.minute * 60 + value.second
+
+
+def generate_cycle_records(start_date, days):
+    """
+    Generate records of an 18 UTC cycle which starts before midnight and completes after midnight every day.
+    """
+    records = []
+    for day in range(days):
+        current_date = start_date + datetime.timedelta(days=day)
+        for status, delta in (
+            (NodeStatus.submitted, datetime.timedelta(hours=23, minutes=20)),
+            (NodeStatus.active, datetime.timedelta(hours=23, minutes=21)),
+            (NodeStatus.complete, datetime.timedelta(hours=24, minutes=44, seconds=day)),
+        ):
+            record_time = current_date + delta
+            records.append(StatusRecord(
+                date=record_time.date(),
+                time=record_time.time(),
+                node_path=NODE_PATH,
+                status=status,
+            ))
+    return records
+
+
+def test_window_over_midnight():
+    window = CycleWindow(datetime.timedelta(hours=15), datetime.timedelta(hours=30))
+    current_date = datetime.date(2020, 5, 1)
+    assert window.get_range(current_date) == (
+        get_seconds(datetime.datetime(2020, 5, 1, 15)),
+        get_seconds(datetime.datetime(2020, 5, 2, 21)),
+    )
+    # records from the start of the first window to the end of the last window
+    assert window.get_date_range(datetime.datetime(2020, 5, 1), datetime.datetime(2020, 5, 4)) == (
+        datetime.datetime(2020, 5, 1),
+        datetime.datetime(2020, 5, 5),
+    )
+
+    # negative start reads records of the previous day
+    window = CycleWindow(datetime.timedelta(hours=-2), datetime.timedelta(hours=26))
+    assert window.get_range(current_date) == (
+        get_seconds(datetime.datetime(2020, 4, 30, 22)),
+        get_seconds(datetime.datetime(2020, 5, 2)),
+    )
+    assert window.get_date_range(datetime.datetime(2020, 5, 1), datetime.datetime(2020, 5, 4)) == (
+        datetime.datetime(2020, 4, 30),
+        datetime.datetime(2020, 5, 4),
+    )
+
+
+def test_situations_over_midnight():
+    records = generate_cycle_records(START_DATE, 5)
+    end_date = START_DATE + pd.Timedelta(days=4)
+    calculator, _ = create_situation_calculator("task")
+
+    # every window contains one whole cycle, from submitted before midnight to complete after midnight
+    window = CycleWindow(datetime.timedelta(hours=15), datetime.timedelta(hours=30))
+    situations = calculator.get_situations(records, NODE_PATH, START_DATE, end_date, window=window)
+    assert len(situations) == 4
+    for day, situation in enumerate(situations):
+        assert situation.state is TaskSituationType.Complete
+        assert situation.node_situation.time_points[-1].time == datetime.datetime(2020, 5, 2 + day, 0, 44, day)
+
+    # complete after midnight is out of the window of the day
+    situations = calculator.get_situations(records, NODE_PATH, START_DATE, end_date, include_next_day=False)
+    assert all(s.state is not TaskSituationType.Complete for s in situations)
+
+
+def test_from_options():
+    current_date = datetime.date(2020, 5, 1)
+    day_start = get_seconds(datetime.datetime(2020, 5, 1))
+
+    # default window is the day and the next day
+    window = CycleWindow.from_options()
+    assert window.to_dict() == CycleWindow().to_dict()
+    assert window.get_range(current_date) == (day_start, day_start + 2 * SECONDS_PER_DAY)
+
+    window = CycleWindow.from_options(include_next_day=False)
+    assert window.get_range(current_date) == (day_start, day_start + SECONDS_PER_DAY)
+
+    window = CycleWindow.from_options(earliest_time=datetime.time(15, 30))
+    assert window.get_range(current_date) == (day_start + 15 * 3600 + 30 * 60, day_start + 2 * SECONDS_PER_DAY)
+    window = CycleWindow.from_options(include_next_day=False, earliest_time=datetime.time(15))
+    assert window.get_range(current_date) == (day_start + 15 * 3600, day_start + SECONDS_PER_DAY)
+
+    assert get_read_date_range(datetime.datetime(2020, 5, 1), datetime.datetime(2020, 5, 4)) == (
+        datetime.datetime(2020, 5, 1),
+        datetime.datetime(2020, 5, 5),
+    )
+    assert get_read_date_range(
+        datetime.datetime(2020, 5, 1), datetime.datetime(2020, 5, 4), include_next_day=False,
+    ) == (
+        datetime.datetime(2020, 5, 1),
+        datetime.datetime(2020, 5, 4),
+    )
+
+
+def test_cycle_window_option():
+    assert get_cycle_window(None, None) is None
+
+    # default duration is until the end of the next day
+    window = get_cycle_window("15:00", None)
+    assert window.start == datetime.timedelta(hours=15)
+    assert window.duration == datetime.timedelta(hours=33)
+    window = get_cycle_window("15:00:30", None)
+    assert window.duration == datetime.timedelta(hours=33) - datetime.timedelta(seconds=30)
+    window = get_cycle_window(None, 30)
+    assert window.start == datetime.timedelta(0)
+    assert window.duration == datetime.timedelta(hours=30)
+    window = get_cycle_window("15:00", 30)
+    assert window.to_dict() == CycleWindow(datetime.timedelta(hours=15), datetime.timedelta(hours=30)).to_dict()
+
+    for cycle_start, cycle_duration in (("15", None), ("25:00", None), (None, 0), ("15:00", -1)):
+        try:
+            get_cycle_window(cycle_start, cycle_duration)
+        except click.BadParameter:
+            pass
+        else:
+            raise AssertionError(f"{cycle_start} {cycle_duration} should be invalid")
+
+
+if __name__ == "__main__":
+    test_window_over_midnight()
+    test_situations_over_midnight()
+    test_from_options()
+    test_cycle_window_option()
@@ -0,0 +1,37 @@
+import random
+import datetime
+
+from nwpc_workflow_model.node_status import NodeStatus
+
+from nwpc_workflow_log_tool.log_record import StatusRecord
+
+
+def generate_records(node_paths, start_date, days, seed=0):
+    """
+    Generate random status records: mostly normal runs, with reruns, aborts and random statuses.
+    """
+    rng = random.Random(seed)
+    statuses = [NodeStatus.queued, NodeStatus.submitted, NodeStatus.active, NodeStatus.complete, NodeStatus.aborted]
+    records = []
+    for day in range(days):
+        current_date = start_date + datetime.timedelta(days=day)
+        events = []
+        for node_path in node_paths:
+            seconds = rng.randrange(0, 20 * 3600)
+            if rng.random() < 0.7:
+                sequence = [NodeStatus.queued, NodeStatus.submitted, NodeStatus.active, NodeStatus.complete]
+                if rng.random() < 0.2:
+                    sequence[3:3] = [NodeStatus.aborted, NodeStatus.queued, NodeStatus.submitted, NodeStatus.active]
+            else:
+                sequence = [rng.choice(statuses) for _ in range(rng.randrange(0, 8))]
+            for status in sequence:
+                seconds = min(seconds + rng.randrange(1, 3600), 24 * 3600 - 1)
+                events.append((seconds, node_path, status))
+        for seconds, node_path, status in sorted(events, key=lambda x: x[0]):
+            records.append(StatusRecord(
+                date=current_date.date(),
+                time=datetime.time(seconds // 3600, seconds // 60 % 60, seconds % 60),
+                node_path=node_path,
+                status=status,
+            ))
+    return records
@@ -0,0 +1,260 @@
+import os
+import datetime
+import tempfile
+
+import pandas as pd
+
+from nwpc_workflow_model.node_status import NodeStatus
+from nwpc_workflow_log_model.analytics.situation_type import TaskSituationType
+
+from nwpc_workflow_log_tool.log_record import StatusRecord
+from nwpc_workflow_log_tool.log_file import LogSet
+from nwpc_workflow_log_tool.situation import SituationStore, CycleWindow
+from nwpc_workflow_log_tool.situation.situation_store import get_calculator_options
+from nwpc_workflow_log_tool.situation.analytics import (
+    create_situation_calculator,
+    calculate_situations,
+    iter_log_records,
+)
+
+from tests.log_file.logs import get_log_lines, write_log
+
+
+NODE_PATH = "/gmf/18/up"
+START_DATE = datetime.datetime(2020, 5, 1)
+DAYS = 20
+
+
+def generate_midnight_records(start_date, days, node_path=NODE_PATH, seconds=0):
+    """
+    Generate records of a task which starts before midnight and completes after midnight every other day.
+    """
+    records = []
+    for day in range(0, days, 2):
+        current_date = start_date + datetime.timedelta(days=day)
+        for status, delta in (
+            (NodeStatus.submitted, datetime.timedelta(hours=23, minutes=20)),
+            (NodeStatus.active, datetime.timedelta(hours=23, minutes=21, seconds=seconds)),
+            (NodeStatus.complete, datetime.timedelta(hours=24, minutes=44, seconds=day)),
+        ):
+            record_time = current_date + delta
+            records.append(StatusRecord(
+                date=record_time.date(),
+                time=record_time.time(),
+                node_path=node_path,
+                status=status,
+            ))
+    return sorted(records, key=lambda r: (r.date, r.time))
+
+
+def get_situation_keys(situations):
+    return [
+        (
+            s.date,
+            s.state,
+            [(p.status, p.time) for p in s.node_situation.time_points],
+            [(p.period_type, p.start_time, p.end_time) for p in s.node_situation.time_periods],
+        )
+        for s in situations
+    ]
+
+
+def get_situations(file_path, start_date, stop_date, store=None, window=None):
+    calculator, _ = create_situation_calculator("task")
+    return list(calculate_situations(
+        calculator,
+        file_path,
+        NODE_PATH,
+        start_date,
+        stop_date,
+        store=store,
+        node_type="task",
+        window=window,
+    ))
+
+
+def get_stored_dates(store, file_path, window=None):
+    calculator, _ = create_situation_calculator("task")
+    options = get_calculator_options(calculator, window=window)
+    log_key = LogSet([file_path]).get_key()
+    return sorted(store.load(log_key, NODE_PATH, "task", options, START_DATE, START_DATE + pd.Timedelta(days=DAYS)))
+
+
+def test_cached_equals_uncached():
+    with tempfile.TemporaryDirectory() as temp_dir:
+        file_path = os.path.join(temp_dir, "ecflow.log")
+        write_log(file_path, get_log_lines(generate_midnight_records(START_DATE, DAYS)))
+        store = SituationStore(os.path.join(temp_dir, "situations.db"))
+
+        queries = [
+            (datetime.datetime(2020, 5, 9), datetime.datetime(2020, 5, 12)),
+            (datetime.datetime(2020, 5, 1), datetime.datetime(2020, 5, 10)),
+            (datetime.datetime(2020, 5, 5), datetime.datetime(2020, 5, 15)),
+            (datetime.datetime(2020, 5, 11), datetime.datetime(2020, 5, 12)),
+            (datetime.datetime(2020, 5, 1), datetime.datetime(2020, 5, 22)),
+        ]
+        for window in (None, CycleWindow(datetime.timedelta(hours=15), datetime.timedelta(hours=30))):
+            for start_date, stop_date in queries:
+                expected = get_situations(file_path, start_date, stop_date, window=window)
+                # the last day of the range reads records after midnight too
+                if (stop_date - START_DATE).days % 2 == 1 and stop_date <= START_DATE + pd.Timedelta(days=DAYS):
+                    assert expected[-1].state is TaskSituationType.Complete
+                for _ in range(2):
+                    actual = get_situations(file_path, start_date, stop_date, store=store, window=window)
+                    assert get_situation_keys(actual) == get_situation_keys(expected), f"{start_date} {stop_date}"
+
+
+def test_round_trip():
+    with tempfile.TemporaryDirectory() as temp_dir:
+        store = SituationStore(os.path.join(temp_dir, "situations.db"))
+        calculator, _ = create_situation_calculator("task")
+        records = generate_midnight_records(START_DATE, 5, seconds=0)
+        situations = calculator.get_situations(records, NODE_PATH, START_DATE, START_DATE + pd.Timedelta(days=4))
+        # times with microseconds are written without losing precision
+        situations[2].node_situation.time_points[0].time = datetime.datetime(2020, 5, 3, 23, 21, 0, 120)
+        assert len(situations[0].node_situation.time_points) > 0
+        assert len(situations[0].node_situation.time_periods) > 0
+
+        store.save("key", NODE_PATH, "task", "options", situations)
+        loaded = store.load("key", NODE_PATH, "task", "options", START_DATE, START_DATE + pd.Timedelta(days=4))
+        assert get_situation_keys(loaded[d] for d in sorted(loaded)) == get_situation_keys(situations)
+
+        # date range is [start_date, end_date)
+        loaded = store.load(
+            "key", NODE_PATH, "task", "options", START_DATE + pd.Timedelta(days=1), START_DATE + pd.Timedelta(days=3))
+        assert sorted(loaded) == [pd.Timestamp(2020, 5, 2), pd.Timestamp(2020, 5, 3)]
+        assert store.load("key", NODE_PATH, "task", "other", START_DATE, START_DATE + pd.Timedelta(days=4)) == {}
+        assert store.load("key", NODE_PATH, "family", "options", START_DATE, START_DATE + pd.Timedelta(days=4)) == {}
+
+        store.clear()
+        assert store.load("key", NODE_PATH, "task", "options", START_DATE, START_DATE + pd.Timedelta(days=4)) == {}
+
+
+def test_partial_range():
+    with tempfile.TemporaryDirectory() as temp_dir:
+        file_path = os.path.join(temp_dir, "ecflow.log")
+        write_log(file_path, get_log_lines(generate_midnight_records(START_DATE, DAYS)))
+        store = SituationStore(os.path.join(temp_dir, "situations.db"))
+        log_set = LogSet([file_path])
+        read_ranges = []
+
+        def get_records(start_date, stop_date):
+            read_ranges.append((start_date, stop_date))
+            return iter_log_records(file_path, NODE_PATH, start_date, stop_date)
+
+        def get_situations_from_store(start_date, stop_date):
+            calculator, _ = create_situation_calculator("task")
+            return store.get_situations(
+                calculator, NODE_PATH, "task", start_date, stop_date,
+                log_key=log_set.get_key(),
+                last_time=log_set.last_time,
+                get_records=get_records,
+            )
+
+        situations = get_situations_from_store(datetime.datetime(2020, 5, 1), datetime.datetime(2020, 5, 10))
+        assert read_ranges == [(datetime.datetime(2020, 5, 1), datetime.datetime(2020, 5, 11))]
+        assert get_situation_keys(situations) == get_situation_keys(
+            get_situations(file_path, datetime.datetime(2020, 5, 1), datetime.datetime(2020, 5, 10)))
+
+        # only days which are not stored are read
+        read_ranges.clear()
+        situations = get_situations_from_store(datetime.datetime(2020, 5, 5), datetime.datetime(2020, 5, 15))
+        assert read_ranges == [(datetime.datetime(2020, 5, 10), datetime.datetime(2020, 5, 16))]
+        assert get_situation_keys(situations) == get_situation_keys(
+            get_situations(file_path, datetime.datetime(2020, 5, 5), datetime.datetime(2020, 5, 15)))
+
+        # all days are stored
+        read_ranges.clear()
+        situations = get_situations_from_store(datetime.datetime(2020, 5, 1), datetime.datetime(2020, 5, 15))
+        assert read_ranges == []
+        assert len(situations) == 14
+
+        # days near the end of the log are never stored, so they are always read
+        situations = get_situations_from_store(datetime.datetime(2020, 5, 15), datetime.datetime(2020, 5, 22))
+        assert read_ranges == [(datetime.datetime(2020, 5, 15), datetime.datetime(2020, 5, 23))]
+        read_ranges.clear()
+        get_situations_from_store(datetime.datetime(2020, 5, 15), datetime.datetime(2020, 5, 22))
+        assert read_ranges == [(datetime.datetime(2020, 5, 18), datetime.datetime(2020, 5, 23))]
+        assert get_situation_keys(situations) == get_situation_keys(
+            get_situations(file_path, datetime.datetime(2020, 5, 15), datetime.datetime(2020, 5, 22)))
+
+
+def test_is_immutable():
+    store = SituationStore(":memory:", horizon_days=2)
+    last_time = datetime.datetime(2020, 5, 20, 12)
+
+    def is_immutable(day, **kwargs):
+        return store.is_immutable(pd.Timestamp(2020, 5, day), last_time, **kwargs)
+
+    assert is_immutable(17)
+    assert not is_immutable(18)
+    assert not is_immutable(19)
+    assert not store.is_immutable(pd.Timestamp(2020, 5, 1), None)
+
+    store.horizon_days = 0
+    # 2020-05-18 reads records until 2020-05-20 00:00, before the last record
+    assert is_immutable(18)
+    assert not is_immutable(19)
+    assert is_immutable(19, include_next_day=False)
+    assert not is_immutable(20, include_next_day=False)
+
+    # 2020-05-17 reads records until 2020-05-18 21:00
+    window = CycleWindow(datetime.timedelta(hours=15), datetime.timedelta(hours=30))
+    assert is_immutable(18, window=window)
+    assert not is_immutable(19, window=window)
+    # 2020-05-17 reads records until 2020-05-20 08:00, after the end of 2020-05-20
+    window = CycleWindow(datetime.timedelta(0), datetime.timedelta(hours=80))
+    assert is_immutable(16, window=window)
+    assert not is_immutable(17, window=window)
+
+
+def test_stored_dates():
+    with tempfile.TemporaryDirectory() as temp_dir:
+        file_path = os.path.join(temp_dir, "ecflow.log")
+        # the last record is 2020-05-20 00:44:18
+        write_log(file_path, get_log_lines(generate_midnight_records(START_DATE, DAYS)))
+
+        # days before 2020-05-18
+        store = SituationStore(os.path.join(temp_dir, "situations.db"), horizon_days=2)
+        get_situations(file_path, START_DATE, START_DATE + pd.Timedelta(days=DAYS), store=store)
+        assert get_stored_dates(store, file_path)[-1] == pd.Timestamp(2020, 5, 17)
+        assert len(get_stored_dates(store, file_path)) == 17
+
+        # days which read records until 2020-05-20 00:00
+        store = SituationStore(os.path.join(temp_dir, "situations_0.db"), horizon_days=0)
+        get_situations(file_path, START_DATE, START_DATE + pd.Timedelta(days=DAYS), store=store)
+        assert get_stored_dates(store, file_path)[-1] == pd.Timestamp(2020, 5, 18)
+
+
+def test_log_key_changed():
+    with tempfile.TemporaryDirectory() as temp_dir:
+        file_path = os.path.join(temp_dir, "ecflow.log")
+        store = SituationStore(os.path.join(temp_dir, "situations.db"))
+        write_log(file_path, get_log_lines(generate_midnight_records(START_DATE, DAYS)))
+        old_key = LogSet([file_path]).get_key()
+        old_situations = get_situations(file_path, START_DATE, datetime.datetime(2020, 5, 10), store=store)
+        assert len(get_stored_dates(store, file_path)) == 9
+
+        # the log file is replaced by another log with different first line and times
+        write_log(file_path, ["MSG:[00:00:00 1.5.2020] --restore_from_checkpt"] + get_log_lines(
+            generate_midnight_records(START_DATE, DAYS, seconds=30)))
+        assert LogSet([file_path]).get_key() != old_key
+        assert get_stored_dates(store, file_path) == []
+
+        expected = get_situations(file_path, START_DATE, datetime.datetime(2020, 5, 10))
+        actual = get_situations(file_path, START_DATE, datetime.datetime(2020, 5, 10), store=store)
+        assert get_situation_keys(actual) == get_situation_keys(expected)
+        assert get_situation_keys(actual) != get_situation_keys(old_situations)
+
+        # appending to the log keeps the key and stored situations
+        write_log(file_path, get_log_lines(generate_midnight_records(datetime.datetime(2020, 5, 21), 5)), mode="a")
+        assert len(get_stored_dates(store, file_path)) == 9
+
+
+if __name__ == "__main__":
+    test_cached_equals_uncached()
+    test_round_trip()
+    test_partial_range()
+    test_is_immutable()
+    test_stored_dates()
+    test_log_key_changed()
@@ -0,0 +1,73 @@
+import time
+import datetime
+
+from nwpc_workflow_log_model.analytics.situation_type import FamilySituationType, TaskSituationType
+from nwpc_workflow_log_model.analytics.task_status_change_dfa import TaskStatusChangeDFA
+from nwpc_workflow_log_model.analytics.family_status_change_dfa import FamilyStatusChangeDFA
+
+from nwpc_workflow_log_tool.situation import (
+    SituationCalculator,
+    TableTaskStatusChangeDFA,
+    TableFamilyStatusChangeDFA,
+)
+
+from tests.analytics.records import generate_records
+
+
+def get_situation_keys(situations):
+    return [
+        (
+            s.date,
+            s.state.value,
+            [(p.status, p.time) for p in s.node_situation.time_points],
+            [(p.period_type, p.start_time, p.end_time) for p in s.node_situation.time_periods],
+        )
+        for s in situations
+    ]
+
+
+def check_dfa(dfa_engine, table_dfa_engine, stop_states, table_stop_states, dfa_kwargs=None):
+    node_paths = [f"/suite/00/node_{i}" for i in range(20)]
+    start_date = datetime.datetime(2020, 1, 1)
+    end_date = datetime.datetime(2020, 3, 1)
+    records = generate_records(node_paths, start_date, 61)
+
+    calculator = SituationCalculator(dfa_engine, stop_states, dfa_kwargs)
+    table_calculator = SituationCalculator(table_dfa_engine, table_stop_states, dfa_kwargs)
+
+    for node_path in node_paths:
+        start_time = time.time()
+        expected = calculator.get_situations(records, node_path, start_date, end_date)
+        seconds = time.time() - start_time
+
+        start_time = time.time()
+        actual = table_calculator.get_situations(records, node_path, start_date, end_date)
+        table_seconds = time.time() - start_time
+
+        assert get_situation_keys(expected) == get_situation_keys(actual), node_path
+    print(f"{table_dfa_engine.__name__}: speedup {seconds / table_seconds:.2f} for the last node")
+
+
+def test_table_task_dfa():
+    check_dfa(
+        TaskStatusChangeDFA,
+        TableTaskStatusChangeDFA,
+        (TaskSituationType.Complete,),
+        (TaskSituationType.Complete,),
+    )
+
+
+def test_table_family_dfa():
+    for ignore_aborted in (False, True):
+        check_dfa(
+            FamilyStatusChangeDFA,
+            TableFamilyStatusChangeDFA,
+            (FamilySituationType.Complete, FamilySituationType.Error),
+            (FamilySituationType.Complete, FamilySituationType.Error),
+            dfa_kwargs={"ignore_aborted": ignore_aborted},
+        )
+
+
+if __name__ == "__main__":
+    test_table_task_dfa()
+    test_table_family_dfa()
@@ -0,0 +1,62 @@
+import time
+import datetime
+
+import numpy as np
+
+from nwpc_workflow_model.node_status import NodeStatus
+from nwpc_workflow_log_model.analytics.situation_type import TaskSituationType
+from nwpc_workflow_log_model.analytics.task_status_change_dfa import TaskStatusChangeDFA
+
+from nwpc_workflow_log_tool.situation import SituationCalculator
+from nwpc_workflow_log_tool.situation.vector_task_engine import VectorTaskSituationCalculator
+
+from tests.analytics.records import generate_records
+
+
+def test_vector_task_engine():
+    node_paths = [f"/suite/00/task_{i}" for i in range(20)]
+    start_date = datetime.datetime(2020, 1, 1)
+    end_date = datetime.datetime(2020, 3, 1)
+    records = generate_records(node_paths, start_date, 61)
+
+    calculator = SituationCalculator(
+        dfa_engine=TaskStatusChangeDFA,
+        stop_states=(TaskSituationType.Complete,),
+    )
+    vector_calculator = VectorTaskSituationCalculator()
+    node_situations = vector_calculator.get_node_situations(records, node_paths, start_date, end_date)
+
+    for node_path in node_paths:
+        expected = calculator.get_situations(records, node_path, start_date, end_date)
+        actual = node_situations[node_path]
+        assert len(expected) == len(actual)
+        for e, a in zip(expected, actual):
+            assert e.date == a.date
+            assert e.state is a.state, f"{node_path} {e.date}: {e.state} != {a.state}"
+            assert [(p.status, p.time) for p in e.node_situation.time_points] == \
+                   [(p.status, p.time) for p in a.node_situation.time_points], f"{node_path} {e.date}"
+
+
+def test_vector_task_engine_speed():
+    count = 5000000
+    node_count = 1000
+    rng = np.random.default_rng(0)
+    start_day = datetime.date(2020, 1, 1).toordinal()
+    node_ids = rng.integers(0, node_count, count).astype(np.int32)
+    seconds = np.sort(rng.integers(start_day * 86400, (start_day + 365) * 86400, count))
+    status_codes = rng.integers(0, len(NodeStatus), count).astype(np.int8)
+
+    start_time = time.time()
+    VectorTaskSituationCalculator().evaluate(
+        node_ids, seconds, status_codes,
+        node_count=node_count,
+        start_day=start_day,
+        day_count=365,
+    )
+    seconds_used = time.time() - start_time
+    print(f"VectorTaskSituationCalculator: {count / seconds_used:.0f} records/s")
+
+
+if __name__ == "__main__":
+    test_vector_task_engine()
+    test_vector_task_engine_speed()
@@ -0,0 +1,33 @@
+import time
+import tracemalloc
+
+import numpy as np
+from scipy import stats
+
+from nwpc_workflow_log_tool.statistics import HistogramSketch
+
+
+def test_histogram_sketch():
+    # 100 年的开始时间，精确到秒
+    rng = np.random.default_rng(0)
+    values = np.round(rng.normal(4.5 * 3600, 1800, 36500))
+    parts = np.array_split(values, 100)
+
+    start = time.perf_counter()
+    tracemalloc.start()
+    sketch = HistogramSketch()
+    for part in parts:
+        part_sketch = HistogramSketch()
+        part_sketch.update(part)
+        sketch.merge(part_sketch)
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"HistogramSketch: {time.perf_counter() - start:.3f}s, {size / 1024:.1f} KiB, {sketch}")
+
+    quantiles = [0.5, 0.9, 0.99]
+    print(f"trim_mean: {sketch.trim_mean(0.25)} {stats.trim_mean(values, 0.25)}")
+    print(f"quantile: {sketch.quantile(quantiles)} {np.quantile(values, quantiles)}")
+
+
+if __name__ == "__main__":
+    test_histogram_sketch()
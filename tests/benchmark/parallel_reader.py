@@ -0,0 +1,27 @@
+import time
+from datetime import datetime
+
+from nwpc_workflow_log_tool.log_file import get_record_list, get_record_list_parallel
+
+
+def test_parallel_reader():
+    log_file = "./dist/log/grapes_meso_3km.log"
+    node_path = "/grapes_meso_3km_v4_4/00/model/fcst"
+    start_date = datetime(2020, 1, 1)
+    stop_date = datetime(2020, 7, 1)
+
+    start_time = time.time()
+    serial_records = get_record_list(log_file, node_path, start_date, stop_date)
+    serial_seconds = time.time() - start_time
+    print(f"jobs=serial: {serial_seconds:.2f}s, {len(serial_records)} records")
+
+    for jobs in (1, 2, 4, 8, 16, 32):
+        start_time = time.time()
+        records = get_record_list_parallel(log_file, node_path, start_date, stop_date, jobs=jobs)
+        seconds = time.time() - start_time
+        print(f"jobs={jobs}: {seconds:.2f}s, speedup {serial_seconds / seconds:.2f}, {len(records)} records")
+        assert [r.log_record for r in records] == [r.log_record for r in serial_records]
+
+
+if __name__ == "__main__":
+    test_parallel_reader()
@@ -0,0 +1,29 @@
+import time
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+from nwpc_workflow_log_tool.statistics import RollingStatistics
+
+
+def test_rolling_statistics():
+    # 100 个节点 10 年的结束时间，精确到秒
+    rng = np.random.default_rng(0)
+    values = np.round(rng.normal(4.5 * 3600, 1800, (100, 3650)))
+    window = 30
+
+    start = time.perf_counter()
+    results = RollingStatistics(window, include_current=True).compute(values)
+    print(f"RollingStatistics: {time.perf_counter() - start:.3f}s")
+
+    start = time.perf_counter()
+    trim_means = pd.DataFrame(values.T).rolling(window, min_periods=1).apply(
+        lambda x: stats.trim_mean(x, 0.25), raw=True,
+    ).to_numpy().T
+    print(f"pandas rolling with scipy.stats.trim_mean: {time.perf_counter() - start:.3f}s")
+    print(f"max difference: {np.nanmax(np.abs(results['trim_mean'] - trim_means))}")
+
+
+if __name__ == "__main__":
+    test_rolling_statistics()
@@ -0,0 +1,39 @@
+import time
+
+from nwpc_workflow_log_model.log_record.ecflow import EcflowLogParser, StatusLogRecord
+
+from nwpc_workflow_log_tool.log_record import StatusLineParser
+
+
+def test_status_parser():
+    log_file = "./dist/log/grapes_meso_3km.log"
+    with open(log_file, "rb") as f:
+        lines = f.read().splitlines()
+
+    start_time = time.time()
+    parser = EcflowLogParser()
+    records = []
+    for line in lines:
+        record = parser.parse(line.decode("utf-8", errors="replace"))
+        if isinstance(record, StatusLogRecord):
+            records.append(record)
+    seconds = time.time() - start_time
+    print(f"EcflowLogParser: {len(lines) / seconds:.0f} lines/s, {len(records)} status records")
+
+    start_time = time.time()
+    status_parser = StatusLineParser()
+    status_records = []
+    for line in lines:
+        record = status_parser.parse(line)
+        if record is not None:
+            status_records.append(record)
+    fast_seconds = time.time() - start_time
+    print(f"StatusLineParser: {len(lines) / fast_seconds:.0f} lines/s, {len(status_records)} status records")
+    print(f"speedup: {seconds / fast_seconds:.2f}")
+
+    assert [(r.date, r.time, r.node_path, r.status) for r in records] == \
+           [(r.date, r.time, r.node_path, r.status) for r in status_records]
+
+
+if __name__ == "__main__":
+    test_status_parser()
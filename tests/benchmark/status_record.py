@@ -0,0 +1,38 @@
+import tracemalloc
+
+from nwpc_workflow_log_model.log_record.ecflow import EcflowLogParser, StatusLogRecord
+
+from nwpc_workflow_log_tool.log_record import StatusLineParser
+
+
+def test_status_record_memory():
+    log_file = "./dist/log/grapes_meso_3km.log"
+    with open(log_file, "rb") as f:
+        lines = f.read().splitlines()
+
+    tracemalloc.start()
+    parser = EcflowLogParser()
+    records = []
+    for line in lines:
+        record = parser.parse(line.decode("utf-8", errors="replace"))
+        if isinstance(record, StatusLogRecord):
+            records.append(record)
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"StatusLogRecord: {size / len(records):.1f} bytes/record, {len(records)} records")
+    del records
+
+    tracemalloc.start()
+    status_parser = StatusLineParser()
+    status_records = []
+    for line in lines:
+        record = status_parser.parse(line)
+        if record is not None:
+            status_records.append(record)
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"StatusRecord: {size / len(status_records):.1f} bytes/record, {len(status_records)} records")
+
+
+if __name__ == "__main__":
+    test_status_record_memory()
@@ -0,0 +1,145 @@
+import os
+import datetime
+import tempfile
+
+from nwpc_workflow_log_tool.log_file.date_seek import (
+    seek_date,
+    find_date_range_offsets,
+    DEFAULT_BLOCK_SIZE,
+)
+
+from tests.log_file.logs import generate_log, get_line_offsets
+
+
+NODE_PATHS = [f"/suite/00/task_{i}" for i in range(40)]
+DAYS = 120
+START_DATE = datetime.datetime(2020, 1, 1)
+
+
+def check_range(file_path, lines, start_date, stop_date, margin):
+    """
+    Check that the byte range returned by ``find_date_range_offsets`` contains every line in the date range.
+    """
+    file_size = os.path.getsize(file_path)
+    start_offset, stop_offset = find_date_range_offsets(file_path, start_date, stop_date, margin=margin)
+    if stop_offset is None:
+        stop_offset = file_size
+
+    line_starts = {offset for offset, _, _ in lines}
+    assert start_offset == 0 or start_offset in line_starts
+    assert stop_offset == file_size or stop_offset in line_starts
+
+    for offset, line_date, line in lines:
+        if start_date is not None and line_date < start_date.date():
+            continue
+        if stop_date is not None and line_date >= stop_date.date():
+            continue
+        assert start_offset <= offset and offset + len(line) <= stop_offset, f"{line_date} {offset}"
+    return start_offset, stop_offset
+
+
+def test_every_day():
+    with tempfile.TemporaryDirectory() as temp_dir:
+        file_path = os.path.join(temp_dir, "ecflow.log")
+        generate_log(file_path, NODE_PATHS, START_DATE, DAYS)
+        assert os.path.getsize(file_path) > 2 * 1024 * 1024
+        lines = get_line_offsets(file_path)
+
+        for margin in (0, 1024 * 1024):
+            for day in range(0, DAYS + 1, 3):
+                current_date = START_DATE + datetime.timedelta(days=day)
+                check_range(file_path, lines, current_date, current_date + datetime.timedelta(days=1), margin)
+                check_range(file_path, lines, current_date, None, margin)
+                check_range(file_path, lines, None, current_date, margin)
+
+
+def test_day_boundary_inside_block():
+    with tempfile.TemporaryDirectory() as temp_dir:
+        file_path = os.path.join(temp_dir, "ecflow.log")
+        generate_log(file_path, NODE_PATHS, START_DATE, DAYS)
+        lines = get_line_offsets(file_path)
+        target_date = datetime.date(2020, 1, 31)
+        first_offset = next(offset for offset, line_date, _ in lines if line_date == target_date)
+
+        with open(file_path, "rb") as f:
+            low = seek_date(f, target_date, os.path.getsize(file_path))
+        # the bisection stops at a block which contains the first line of the day, not at the line itself
+        assert low <= first_offset < low + DEFAULT_BLOCK_SIZE
+        assert low != first_offset
+
+        start_offset, _ = check_range(
+            file_path,
+            lines,
+            datetime.datetime(2020, 1, 31),
+            datetime.datetime(2020, 2, 1),
+            margin=0,
+        )
+        assert first_offset - start_offset < DEFAULT_BLOCK_SIZE
+
+
+def test_small_file():
+    with tempfile.TemporaryDirectory() as temp_dir:
+        file_path = os.path.join(temp_dir, "ecflow.log")
+        generate_log(file_path, NODE_PATHS[:2], START_DATE, 5)
+        assert os.path.getsize(file_path) < DEFAULT_BLOCK_SIZE
+
+        # several day boundaries inside one block: the whole file is read
+        assert find_date_range_offsets(
+            file_path, datetime.datetime(2020, 1, 3), datetime.datetime(2020, 1, 4), margin=0,
+        ) == (0, None)
+
+
+def test_date_out_of_file():
+    with tempfile.TemporaryDirectory() as temp_dir:
+        file_path = os.path.join(temp_dir, "ecflow.log")
+        generate_log(file_path, NODE_PATHS, START_DATE, DAYS)
+        file_size = os.path.getsize(file_path)
+        lines = get_line_offsets(file_path)
+
+        for margin in (0, 1024 * 1024):
+            # before the first line
+            start_offset, stop_offset = check_range(
+                file_path, lines, datetime.datetime(2019, 12, 1), datetime.datetime(2020, 1, 2), margin,
+            )
+            assert start_offset == 0
+            start_offset, stop_offset = find_date_range_offsets(
+                file_path, datetime.datetime(2019, 12, 1), datetime.datetime(2019, 12, 2), margin=margin,
+            )
+            assert start_offset == 0
+            assert stop_offset is not None and stop_offset <= DEFAULT_BLOCK_SIZE + margin + 1024
+
+            # after the last line
+            start_offset, stop_offset = find_date_range_offsets(
+                file_path, datetime.datetime(2020, 6, 1), datetime.datetime(2020, 6, 2), margin=margin,
+            )
+            assert stop_offset is None
+            assert start_offset >= file_size - DEFAULT_BLOCK_SIZE - margin - 1024
+            check_range(file_path, lines, datetime.datetime(2020, 4, 29), datetime.datetime(2020, 6, 1), margin)
+
+
+def test_no_trailing_newline():
+    with tempfile.TemporaryDirectory() as temp_dir:
+        file_path = os.path.join(temp_dir, "ecflow.log")
+        generate_log(file_path, NODE_PATHS, START_DATE, DAYS, trailing_newline=False)
+        lines = get_line_offsets(file_path)
+        last_offset, last_date, last_line = lines[-1]
+        assert not last_line.endswith(b"\n")
+
+        for margin in (0, 1024 * 1024):
+            start_offset, stop_offset = check_range(
+                file_path,
+                lines,
+                datetime.datetime.combine(last_date, datetime.time()),
+                None,
+                margin,
+            )
+            assert start_offset <= last_offset
+            assert stop_offset == os.path.getsize(file_path)
+
+
+if __name__ == "__main__":
+    test_every_day()
+    test_day_boundary_inside_block()
+    test_small_file()
+    test_date_out_of_file()
+    test_no_trailing_newline()
@@ -0,0 +1,199 @@
+import os
+import datetime
+import tempfile
+
+from nwpc_workflow_log_tool.log_file import build_index, load_index, iter_records
+from nwpc_workflow_log_tool.log_file.log_index import LogIndex, get_index_path
+
+from tests.log_file.logs import generate_log, get_log_lines, get_line_offsets, write_log
+from tests.analytics.records import generate_records
+
+
+NODE_PATHS = [f"/suite/{hour}/task_{i}" for hour in ("00", "12") for i in range(10)]
+START_DATE = datetime.datetime(2020, 1, 1)
+BLOCK_SIZE = 16 * 1024
+
+QUERIES = [
+    ("/suite/00/task_1", None, None, False),
+    ("/suite/00/task_1", datetime.datetime(2020, 1, 10), datetime.datetime(2020, 1, 12), False),
+    ("/suite/12/task_9", datetime.datetime(2020, 1, 25), None, False),
+    ("/suite/12", datetime.datetime(2020, 1, 5), datetime.datetime(2020, 1, 8), True),
+    ("/suite", None, datetime.datetime(2020, 1, 3), True),
+]
+
+
+def get_keys(records):
+    return [r.log_record for r in records]
+
+
+def check_records(file_path):
+    """
+    Check that records read with the index are the same as records read without it.
+    """
+    assert load_index(file_path) is not None
+    count = 0
+    for node_path, start_date, stop_date, include_children in QUERIES:
+        for status_only in (True, False):
+            expected = list(iter_records(
+                file_path, node_path, start_date, stop_date,
+                include_children=include_children,
+                status_only=status_only,
+                use_index=False,
+            ))
+            actual = list(iter_records(
+                file_path, node_path, start_date, stop_date,
+                include_children=include_children,
+                status_only=status_only,
+            ))
+            assert get_keys(actual) == get_keys(expected), f"{node_path} {start_date} {stop_date} {status_only}"
+            count += len(expected)
+    assert count > 0
+
+
+def check_index(file_path, index):
+    """
+    Check blocks and days of the index against the log file.
+    """
+    lines = get_line_offsets(file_path)
+    line_starts = {offset for offset, _, _ in lines}
+    assert index.blocks == sorted(set(index.blocks))
+    assert all(block in line_starts for block in index.blocks)
+
+    expected_days = dict()
+    for offset, line_date, line in lines:
+        if offset >= index.tail_offset:
+            break
+        if line_date is None:
+            continue
+        day_range = expected_days.setdefault(line_date.isoformat(), [offset, offset + len(line)])
+        day_range[1] = offset + len(line)
+    for day, day_range in expected_days.items():
+        assert index.days[day][0] == day_range[0]
+        assert index.days[day][1] >= day_range[1]
+    assert index.day_keys == sorted(index.days)
+
+
+def test_date_range_offsets():
+    with tempfile.TemporaryDirectory() as temp_dir:
+        file_path = os.path.join(temp_dir, "ecflow.log")
+        generate_log(file_path, NODE_PATHS, START_DATE, 30)
+        build_index(file_path, block_size=BLOCK_SIZE)
+
+        index = LogIndex.load(get_index_path(file_path))
+        check_index(file_path, index)
+        days = sorted(index.days)
+        for start_day in range(-1, 32):
+            for stop_day in range(start_day, 32, 4):
+                start_date = START_DATE + datetime.timedelta(days=start_day)
+                stop_date = START_DATE + datetime.timedelta(days=stop_day)
+                selected = [day for day in days if start_date.date().isoformat() <= day < stop_date.date().isoformat()]
+                expected = None
+                if selected:
+                    expected = (
+                        min(index.days[day][0] for day in selected),
+                        max(index.days[day][1] for day in selected),
+                    )
+                assert index.get_date_range_offsets(start_date, stop_date) == expected
+        assert index.get_date_range_offsets() == (0, max(d[1] for d in index.days.values()))
+
+
+def test_read_with_index():
+    with tempfile.TemporaryDirectory() as temp_dir:
+        file_path = os.path.join(temp_dir, "ecflow.log")
+        generate_log(file_path, NODE_PATHS, START_DATE, 30)
+        build_index(file_path, block_size=BLOCK_SIZE)
+        check_records(file_path)
+
+
+def test_message_lines():
+    with tempfile.TemporaryDirectory() as temp_dir:
+        file_path = os.path.join(temp_dir, "ecflow.log")
+        records = generate_records(NODE_PATHS, START_DATE, 30)
+        lines = get_log_lines(records)
+        # a node which only appears in MSG lines is not in the index
+        node_path = "/suite/00/message_only"
+        for i in range(100, len(lines), 200):
+            stamp = lines[i][4:lines[i].index("]") + 1]
+            lines.insert(i, f"MSG:{stamp} --alter change variable VAR 1 {node_path}")
+        write_log(file_path, lines)
+        index = build_index(file_path, block_size=BLOCK_SIZE)
+        assert node_path not in index.nodes
+
+        records = list(iter_records(file_path, node_path, START_DATE, datetime.datetime(2020, 1, 20)))
+        expected = list(iter_records(file_path, node_path, START_DATE, datetime.datetime(2020, 1, 20), use_index=False))
+        assert len(expected) > 10
+        assert get_keys(records) == get_keys(expected)
+
+
+def test_append():
+    with tempfile.TemporaryDirectory() as temp_dir:
+        file_path = os.path.join(temp_dir, "ecflow.log")
+        records = generate_records(NODE_PATHS, START_DATE, 30)
+        lines = get_log_lines(records)
+        content = ("\n".join(lines) + "\n").encode("utf-8")
+
+        # the log ends in the middle of a line at first, and then grows several times
+        stops = [len(content) // 3 + 17, len(content) // 2, len(content) * 3 // 4 + 5, len(content)]
+        written = 0
+        for stop in stops:
+            with open(file_path, "ab") as f:
+                f.write(content[written:stop])
+            written = stop
+
+            index = build_index(file_path, block_size=BLOCK_SIZE)
+            assert index.fingerprint.size == stop
+            assert load_index(file_path) is not None
+            check_index(file_path, index)
+            check_records(file_path)
+
+        rebuilt_index = build_index(file_path, index_path=file_path + ".rebuilt", rebuild=True)
+        assert sorted(index.nodes) == sorted(rebuilt_index.nodes)
+        assert index.days.keys() == rebuilt_index.days.keys()
+
+
+def test_truncate():
+    with tempfile.TemporaryDirectory() as temp_dir:
+        file_path = os.path.join(temp_dir, "ecflow.log")
+        generate_log(file_path, NODE_PATHS, START_DATE, 30)
+        old_index = build_index(file_path, block_size=BLOCK_SIZE)
+
+        generate_log(file_path, NODE_PATHS, START_DATE, 20)
+        assert os.path.getsize(file_path) < old_index.fingerprint.size
+        assert load_index(file_path) is None
+
+        index = build_index(file_path, block_size=BLOCK_SIZE)
+        assert index.fingerprint.size == os.path.getsize(file_path)
+        assert max(index.days) == "2020-01-20"
+        check_index(file_path, index)
+        check_records(file_path)
+
+
+def test_rewrite():
+    with tempfile.TemporaryDirectory() as temp_dir:
+        file_path = os.path.join(temp_dir, "ecflow.log")
+        records = generate_records(NODE_PATHS, START_DATE, 30)
+        lines = get_log_lines(records)
+        write_log(file_path, lines)
+        old_index = build_index(file_path, block_size=BLOCK_SIZE)
+
+        # rewrite the log with the same size and first line, but different node names
+        lines = lines[:1] + [line.replace("task_1", "task_x") for line in lines[1:]]
+        write_log(file_path, lines)
+        stat = os.stat(file_path)
+        os.utime(file_path, (stat.st_atime, old_index.fingerprint.mtime + 10))
+        assert os.path.getsize(file_path) == old_index.fingerprint.size
+        assert load_index(file_path) is None
+
+        index = build_index(file_path, block_size=BLOCK_SIZE)
+        assert "/suite/00/task_x" in index.nodes
+        assert "/suite/00/task_1" not in index.nodes
+        check_records(file_path)
+
+
+if __name__ == "__main__":
+    test_date_range_offsets()
+    test_read_with_index()
+    test_message_lines()
+    test_append()
+    test_truncate()
+    test_rewrite()
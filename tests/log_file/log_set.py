@@ -0,0 +1,131 @@
+import os
+import gzip
+import datetime
+import tempfile
+
+from nwpc_workflow_log_tool.log_file import LogSet, expand_log_files, select_log_files
+
+from tests.log_file.logs import get_log_lines, write_log
+from tests.analytics.records import generate_records
+
+
+NODE_PATHS = ["/suite/00/task_0", "/suite/00/task_1"]
+
+
+def write_days(file_path, start_date, days):
+    """
+    Write a log file with records from ``start_date`` for ``days`` days. Files ending with .gz are compressed.
+    """
+    records = generate_records(NODE_PATHS, start_date, days)
+    # the first and the last records in the file are on the first and the last day
+    records = [r for r in records if r.time < datetime.time(20)]
+    if file_path.endswith(".gz"):
+        with gzip.open(file_path, "wt") as f:
+            f.write("\n".join(get_log_lines(records)) + "\n")
+    else:
+        write_log(file_path, get_log_lines(records))
+
+
+def get_names(file_paths):
+    return [os.path.basename(p) for p in file_paths]
+
+
+def test_rotated_files():
+    with tempfile.TemporaryDirectory() as temp_dir:
+        # names are not in time order: log.2.gz is the oldest
+        write_days(os.path.join(temp_dir, "ecflow.log.2.gz"), datetime.datetime(2020, 1, 1), 31)
+        write_days(os.path.join(temp_dir, "ecflow.log.1.gz"), datetime.datetime(2020, 2, 1), 29)
+        write_days(os.path.join(temp_dir, "ecflow.log"), datetime.datetime(2020, 3, 1), 31)
+
+        log_set = LogSet(expand_log_files(os.path.join(temp_dir, "ecflow.log*")))
+        assert get_names(info.file_path for info in log_set.files) == ["ecflow.log.2.gz", "ecflow.log.1.gz", "ecflow.log"]
+        assert log_set.files[0].first_time.date() == datetime.date(2020, 1, 1)
+        assert log_set.files[0].last_time is None
+        assert log_set.files[2].last_time.date() == datetime.date(2020, 3, 31)
+        assert log_set.last_time == log_set.files[2].last_time
+
+        def select(start_date, stop_date):
+            return get_names(log_set.select(start_date, stop_date))
+
+        assert select(None, None) == ["ecflow.log.2.gz", "ecflow.log.1.gz", "ecflow.log"]
+        assert select(datetime.datetime(2020, 1, 10), datetime.datetime(2020, 1, 20)) == ["ecflow.log.2.gz"]
+        # last time of a compressed file is bounded by the first time of the next file
+        assert select(datetime.datetime(2020, 2, 10), datetime.datetime(2020, 2, 20)) == ["ecflow.log.1.gz"]
+        assert select(datetime.datetime(2020, 1, 31), datetime.datetime(2020, 2, 2)) == \
+               ["ecflow.log.2.gz", "ecflow.log.1.gz"]
+        assert select(datetime.datetime(2020, 3, 5), None) == ["ecflow.log"]
+        assert select(None, datetime.datetime(2020, 1, 1)) == []
+        assert select(datetime.datetime(2020, 4, 1), None) == []
+
+
+def test_last_compressed_file():
+    with tempfile.TemporaryDirectory() as temp_dir:
+        write_days(os.path.join(temp_dir, "ecflow.log.1"), datetime.datetime(2020, 1, 1), 31)
+        write_days(os.path.join(temp_dir, "ecflow.log.gz"), datetime.datetime(2020, 2, 1), 29)
+        log_set = LogSet([os.path.join(temp_dir, "ecflow.log.gz"), os.path.join(temp_dir, "ecflow.log.1")])
+        assert log_set.last_time is None
+
+        # last time of the last compressed file is unknown, it is never skipped by start date
+        assert get_names(log_set.select(datetime.datetime(2021, 1, 1), None)) == ["ecflow.log.gz"]
+        assert get_names(log_set.select(datetime.datetime(2020, 1, 5), datetime.datetime(2020, 1, 6))) == \
+               ["ecflow.log.1"]
+
+
+def test_overlapping_files():
+    with tempfile.TemporaryDirectory() as temp_dir:
+        write_days(os.path.join(temp_dir, "a.log"), datetime.datetime(2020, 1, 1), 60)
+        write_days(os.path.join(temp_dir, "b.log"), datetime.datetime(2020, 1, 20), 10)
+        write_days(os.path.join(temp_dir, "c.log"), datetime.datetime(2020, 2, 20), 20)
+        file_paths = [os.path.join(temp_dir, name) for name in ("c.log", "b.log", "a.log")]
+
+        def select(start_date, stop_date):
+            return get_names(select_log_files(file_paths, start_date, stop_date))
+
+        assert select(None, None) == ["a.log", "b.log", "c.log"]
+        assert select(datetime.datetime(2020, 1, 22), datetime.datetime(2020, 1, 23)) == ["a.log", "b.log"]
+        assert select(datetime.datetime(2020, 2, 5), datetime.datetime(2020, 2, 10)) == ["a.log"]
+        assert select(datetime.datetime(2020, 2, 25), datetime.datetime(2020, 2, 26)) == ["a.log", "c.log"]
+        assert select(datetime.datetime(2020, 3, 5), None) == ["c.log"]
+
+
+def test_unknown_time():
+    with tempfile.TemporaryDirectory() as temp_dir:
+        write_days(os.path.join(temp_dir, "a.log"), datetime.datetime(2020, 1, 1), 10)
+        with open(os.path.join(temp_dir, "empty.log"), "w") as f:
+            f.write("no time stamp\n")
+        file_paths = [os.path.join(temp_dir, name) for name in ("empty.log", "a.log")]
+
+        # files without time stamps are put at the end and never skipped
+        log_set = LogSet(file_paths)
+        assert get_names(info.file_path for info in log_set.files) == ["a.log", "empty.log"]
+        assert get_names(log_set.select(datetime.datetime(2020, 3, 1), None)) == ["empty.log"]
+        assert get_names(log_set.select(None, datetime.datetime(2019, 3, 1))) == ["empty.log"]
+
+
+def test_expand_log_files():
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for name in ("ecflow.log", "ecflow.log.2.gz", "ecflow.log.1.gz", "ecflow.log.index.json", "other.log"):
+            with open(os.path.join(temp_dir, name), "w"):
+                pass
+
+        pattern = os.path.join(temp_dir, "ecflow.log*")
+        # glob matches are sorted by name, index files are ignored
+        assert get_names(expand_log_files(pattern)) == ["ecflow.log", "ecflow.log.1.gz", "ecflow.log.2.gz"]
+        # duplicated paths are removed, keeping the first one
+        assert get_names(expand_log_files([
+            os.path.join(temp_dir, "other.log"),
+            pattern,
+            os.path.join(temp_dir, "ecflow.log"),
+        ])) == ["other.log", "ecflow.log", "ecflow.log.1.gz", "ecflow.log.2.gz"]
+        # patterns without matches are kept for a clear error when opening them
+        missing = os.path.join(temp_dir, "missing*.log")
+        assert expand_log_files(missing) == [missing]
+        assert select_log_files(os.path.join(temp_dir, "other.log")) == [os.path.join(temp_dir, "other.log")]
+
+
+if __name__ == "__main__":
+    test_rotated_files()
+    test_last_compressed_file()
+    test_overlapping_files()
+    test_unknown_time()
+    test_expand_log_files()
@@ -0,0 +1,52 @@
+import datetime
+
+from tests.analytics.records import generate_records
+
+
+def get_log_lines(records, with_messages=True):
+    """
+    Convert status records to ecflow log lines. Each LOG line is followed by a MSG line of the same node if required.
+    """
+    lines = []
+    for record in records:
+        log_line = record.log_record
+        lines.append(log_line)
+        if with_messages:
+            stamp = log_line[4:log_line.index("]") + 1]
+            lines.append(f"MSG:{stamp} chd:{record.status.value} {record.node_path}")
+    return lines
+
+
+def write_log(file_path, lines, trailing_newline=True, mode="w"):
+    with open(file_path, mode) as f:
+        f.write("\n".join(lines))
+        if trailing_newline:
+            f.write("\n")
+
+
+def generate_log(file_path, node_paths, start_date, days, seed=0, with_messages=True, trailing_newline=True):
+    """
+    Write a log file of random status records (see ``generate_records``) and return the records.
+    """
+    records = generate_records(node_paths, start_date, days, seed=seed)
+    write_log(file_path, get_log_lines(records, with_messages), trailing_newline=trailing_newline)
+    return records
+
+
+def get_line_offsets(file_path):
+    """
+    Return a list of (offset, date, line) for every line in the log file. Date is None for an incomplete line.
+    """
+    result = []
+    offset = 0
+    with open(file_path, "rb") as f:
+        for line in f:
+            try:
+                stamp = line[line.index(b" ") + 1:line.index(b"]")]
+                day, month, year = stamp.split(b".")
+                line_date = datetime.date(int(year), int(month), int(day))
+            except ValueError:
+                line_date = None
+            result.append((offset, line_date, line))
+            offset += len(line)
+    return result
@@ -0,0 +1,154 @@
+import os
+import gzip
+import shutil
+import datetime
+import tempfile
+
+from nwpc_workflow_log_tool.log_file import RecordCache, iter_records
+from nwpc_workflow_log_tool.log_file.record_cache import META_FILE_NAME
+
+from tests.log_file.logs import get_log_lines, write_log
+from tests.analytics.records import generate_records
+
+
+NODE_PATHS = [f"/suite/{hour}/task_{i}" for hour in ("00", "12") for i in range(10)]
+START_DATE = datetime.datetime(2020, 1, 1)
+CHUNK_SIZE = 16 * 1024
+
+QUERIES = [
+    (None, None, None, False),
+    ("/suite/00/task_1", None, None, False),
+    ("/suite/00/task_1", datetime.datetime(2020, 1, 10), datetime.datetime(2020, 1, 12), False),
+    ("/suite/12", datetime.datetime(2020, 1, 5), datetime.datetime(2020, 1, 8), True),
+    ("/suite/12/task_9", datetime.datetime(2020, 1, 25), None, False),
+]
+
+
+def get_keys(records):
+    return [(r.date, r.time, r.node_path, r.status, r.line_offset) for r in records]
+
+
+def check_cache(file_path, cache_dir, queries=QUERIES):
+    """
+    Update the cache and check that records read from it are the same as records read from the log file.
+    """
+    cache = RecordCache(file_path, cache_dir=cache_dir)
+    cache.update(chunk_size=CHUNK_SIZE)
+    for node_path, start_date, stop_date, include_children in queries:
+        expected = list(iter_records(
+            file_path,
+            node_path if node_path is not None else "/suite",
+            start_date,
+            stop_date,
+            include_children=True if node_path is None else include_children,
+            use_index=False,
+            status_only=True,
+        ))
+        actual = cache.load(start_date, stop_date, node_path=node_path, include_children=include_children)
+        assert len(expected) > 0
+        assert get_keys(actual) == get_keys(expected), f"{node_path} {start_date} {stop_date}"
+    return cache
+
+
+def test_cache():
+    with tempfile.TemporaryDirectory() as temp_dir:
+        file_path = os.path.join(temp_dir, "ecflow.log")
+        write_log(file_path, get_log_lines(generate_records(NODE_PATHS, START_DATE, 30)))
+        cache = check_cache(file_path, os.path.join(temp_dir, "cache"))
+        assert len(cache.days) == 30
+
+        # loaded from the cache directory without parsing the log file again
+        cache = RecordCache(file_path, cache_dir=os.path.join(temp_dir, "cache"))
+        assert cache.parsed_offset == os.path.getsize(file_path)
+        check_cache(file_path, os.path.join(temp_dir, "cache"))
+
+
+def test_append():
+    with tempfile.TemporaryDirectory() as temp_dir:
+        file_path = os.path.join(temp_dir, "ecflow.log")
+        cache_dir = os.path.join(temp_dir, "cache")
+        lines = get_log_lines(generate_records(NODE_PATHS, START_DATE, 30))
+        content = ("\n".join(lines) + "\n").encode("utf-8")
+
+        # the log ends in the middle of a line at first, and then grows several times
+        written = 0
+        for stop in (len(content) // 3 + 17, len(content) // 2, len(content) * 3 // 4 + 5, len(content)):
+            with open(file_path, "ab") as f:
+                f.write(content[written:stop])
+            written = stop
+            cache = check_cache(file_path, cache_dir, QUERIES[:3])
+            assert cache.fingerprint.size == stop
+
+
+def test_no_trailing_newline():
+    with tempfile.TemporaryDirectory() as temp_dir:
+        records = generate_records(NODE_PATHS, START_DATE, 30)
+        last_record = records[-1]
+        last_day = datetime.datetime.combine(last_record.date, datetime.time())
+        queries = QUERIES + [(last_record.node_path, last_day, None, False)]
+
+        file_path = os.path.join(temp_dir, "ecflow.log")
+        write_log(file_path, get_log_lines(records, with_messages=False), trailing_newline=False)
+        cache = check_cache(file_path, os.path.join(temp_dir, "cache"), queries)
+        assert cache.parsed_offset < os.path.getsize(file_path)
+        assert cache.load(last_day, node_path=last_record.node_path)[-1].log_record == last_record.log_record
+
+        # the last line of a compressed log file is cached
+        gzip_path = file_path + ".gz"
+        with open(file_path, "rb") as f, gzip.open(gzip_path, "wb") as g:
+            shutil.copyfileobj(f, g)
+        cache = check_cache(gzip_path, os.path.join(temp_dir, "cache"), queries)
+        assert cache.parsed_offset == os.path.getsize(file_path)
+
+
+def test_rewrite():
+    with tempfile.TemporaryDirectory() as temp_dir:
+        file_path = os.path.join(temp_dir, "ecflow.log")
+        cache_dir = os.path.join(temp_dir, "cache")
+        lines = get_log_lines(generate_records(NODE_PATHS, START_DATE, 30))
+        write_log(file_path, lines)
+        old_cache = check_cache(file_path, cache_dir)
+
+        # same size and first line, but different content
+        lines = lines[:1] + [line.replace("task_1", "task_x") for line in lines[1:]]
+        write_log(file_path, lines)
+        stat = os.stat(file_path)
+        os.utime(file_path, (stat.st_atime, old_cache.fingerprint.mtime + 10))
+        assert stat.st_size == old_cache.fingerprint.size
+        cache = check_cache(file_path, cache_dir, [q for q in QUERIES if q[0] != "/suite/00/task_1"])
+        assert cache.load(node_path="/suite/00/task_1") == []
+        assert len(cache.load(node_path="/suite/00/task_x")) > 0
+
+        # truncated
+        lines = get_log_lines(generate_records(NODE_PATHS, START_DATE, 20))
+        write_log(file_path, lines)
+        cache = check_cache(file_path, cache_dir, QUERIES[:3])
+        assert len(cache.days) == 20
+
+
+def test_interrupted_update():
+    with tempfile.TemporaryDirectory() as temp_dir:
+        file_path = os.path.join(temp_dir, "ecflow.log")
+        cache_dir = os.path.join(temp_dir, "cache")
+        lines = get_log_lines(generate_records(NODE_PATHS, START_DATE, 30))
+        middle = len(lines) // 2
+        write_log(file_path, lines[:middle])
+        cache = check_cache(file_path, cache_dir, QUERIES[:3])
+        meta_path = os.path.join(cache.cache_path, META_FILE_NAME)
+        shutil.copy(meta_path, meta_path + ".old")
+
+        # partitions are written but the update stops before meta.json is written
+        write_log(file_path, lines[middle:], mode="a")
+        check_cache(file_path, cache_dir, QUERIES[:3])
+        os.replace(meta_path + ".old", meta_path)
+
+        cache = check_cache(file_path, cache_dir)
+        assert not any(name.endswith(".tmp") for name in os.listdir(cache.cache_path))
+
+
+if __name__ == "__main__":
+    test_cache()
+    test_append()
+    test_no_trailing_newline()
+    test_rewrite()
+    test_interrupted_update()
@@ -0,0 +1,69 @@
+import os
+import gzip
+import random
+import shutil
+import datetime
+import tempfile
+
+from nwpc_workflow_log_tool.log_file import RecordLocations, iter_records
+
+from tests.log_file.logs import generate_log
+
+
+NODE_PATHS = [f"/suite/{hour}/task_{i}" for hour in ("00", "12") for i in range(10)]
+START_DATE = datetime.datetime(2020, 1, 1)
+
+
+def get_keys(records):
+    return [(r.log_file, r.line_offset, r.log_record) for r in records]
+
+
+def read_status_records(file_path):
+    return list(iter_records(file_path, "/suite", include_children=True, use_index=False, status_only=True))
+
+
+def check_locations(records):
+    """
+    Check that records read from locations are the same as the original records, in the same order.
+    """
+    locations = RecordLocations.from_records(records)
+    assert len(locations) == len(records)
+    assert get_keys(locations.read()) == get_keys(records)
+
+
+def test_read():
+    with tempfile.TemporaryDirectory() as temp_dir:
+        file_path = os.path.join(temp_dir, "ecflow.log")
+        generate_log(file_path, NODE_PATHS, START_DATE, 30)
+        gzip_path = file_path + ".gz"
+        with open(file_path, "rb") as f, gzip.open(gzip_path, "wb") as g:
+            shutil.copyfileobj(f, g)
+
+        for current_path in (file_path, gzip_path):
+            records = read_status_records(current_path)
+            assert len(records) > 0
+            check_locations(records)
+            check_locations([r for r in records if r.node_path == "/suite/12/task_3"])
+
+            # records are not in file order, and some records are repeated
+            shuffled = records[::7] + records[::5]
+            random.Random(0).shuffle(shuffled)
+            check_locations(shuffled)
+
+        # several runs of different files
+        check_locations(read_status_records(gzip_path)[:100] + read_status_records(file_path)[:100])
+
+
+def test_no_location():
+    with tempfile.TemporaryDirectory() as temp_dir:
+        file_path = os.path.join(temp_dir, "ecflow.log")
+        generate_log(file_path, NODE_PATHS, START_DATE, 1)
+        records = read_status_records(file_path)
+        records[3].line_offset = None
+        assert RecordLocations.from_records(records) is None
+        assert len(RecordLocations.from_records([]).read()) == 0
+
+
+if __name__ == "__main__":
+    test_read()
+    test_no_location()